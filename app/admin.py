@@ -1,8 +1,12 @@
 import streamlit as st
 import os
 import sqlite3
+import time
 import pandas as pd
+from contextlib import closing
 from datetime import datetime
+from pathlib import Path
+from module import metrics
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR,"data", "alarmni_sustav.db")
@@ -20,6 +24,10 @@ STAVKE = [
     "data/alarmni_sustav.db",
     "static"]
 
+HEARTBEAT_STALE_S = 60  # servis bez zapisa metrika dulje od ovoga ne radi
+OSVJEZI_S = 5  # s između osvježavanja nadzorne ploče
+TIME_FMT = "%Y-%m-%d %H:%M:%S"
+
 # -------------- Help functions --------------
 
 def provjeri_postojanje(putanja, stavke):
@@ -36,6 +44,107 @@ def provjeri_postojanje(putanja, stavke):
     return rezultati
 
 
+def trajanje(s: float | None) -> str:
+    """Sekunde kao kratki tekst (12 s, 4 min, 3 h, 2 d)."""
+    if s is None:
+        return "—"
+    for granica, jedinica in ((86400, "d"), (3600, "h"), (60, "min")):
+        if s >= granica:
+            return f"{s / granica:.0f} {jedinica}"
+    return f"{s:.0f} s"
+
+
+def mb(b: int) -> str:
+    return f"{b / 1024 / 1024:.1f} MB"
+
+
+def aktivni_alarmi() -> tuple[int | None, float | None]:
+    """(broj nepotvrđenih alarma, starost najstarijeg u s) - indeks potvrda, vrijeme.
+
+    Samo za čitanje: ne stvara bazu koje nema i ne čeka pisce; (None, None) ako
+    se baza ne može pročitati.
+    """
+    if not os.path.exists(DB_PATH):
+        return None, None
+    try:
+        with closing(sqlite3.connect(f"{Path(DB_PATH).as_uri()}?mode=ro", uri=True, timeout=1)) as conn:
+            broj, najstariji = conn.execute(
+                "SELECT COUNT(*), MIN(vrijeme) FROM alarms WHERE potvrda = 0"
+            ).fetchone()
+    except sqlite3.Error:
+        return None, None
+    if not najstariji:
+        return broj, None
+    try:
+        return broj, time.time() - datetime.strptime(najstariji, TIME_FMT).timestamp()
+    except ValueError:
+        return broj, None
+
+
+def servis(col, naziv: str, m: dict | None) -> None:
+    """Naslov servisa sa starošću heartbeata."""
+    if m is None:
+        col.markdown(f"**{naziv}** ❔ nema metrika")
+    elif m["starost"] > HEARTBEAT_STALE_S:
+        col.markdown(f"**{naziv}** ❌ heartbeat prije {trajanje(m['starost'])}")
+    else:
+        col.markdown(f"**{naziv}** ✅ heartbeat prije {trajanje(m['starost'])}")
+
+
+@st.fragment(run_every=OSVJEZI_S)
+def nadzorna_ploca():
+    """Metrike iz data/metrics i stat() baze; servisi se ne ispituju izravno."""
+    sve = metrics.procitaj_sve()
+    sc, ki, en = sve.get("scanner"), sve.get("kiosk"), sve.get("engine")
+
+    c1, c2, c3 = st.columns(3)
+    servis(c1, "📡 Scanner", sc)
+    if sc:
+        p = sc["poll_ms"]
+        c1.metric("Čitanje centrale p50 / p95", f"{p['p50']:.0f} / {p['p95']:.0f} ms")
+        c1.caption(
+            f"Prijavljen: {'da' if sc['prijavljen'] else 'ne'} · aktivnih zona: {sc['aktivnih']} · "
+            f"greške: {sc['broj_gresaka']}"
+        )
+        if sc["zadnja_greska"]:
+            c1.caption(f"⚠️ {sc['zadnja_greska']} (prije {trajanje(time.time() - sc['zadnja_greska_vrijeme'])})")
+
+    servis(c2, "📱 Kiosk", ki)
+    if ki:
+        c2.metric("Ciklus p95 / lag p99", f"{ki['ciklus_ms']['p95']:.0f} / {ki['lag_ms']['p99']:.0f} ms")
+        c2.caption(
+            f"Tableta: {ki['pretplatnici']} (klijenata {ki['klijenti']}) · "
+            f"zadnji ciklus prije {trajanje(ki['zadnji_ciklus_prije_s'])} · greške: {ki['broj_gresaka']}"
+        )
+        if ki["razlozi"]:
+            c2.caption(f"⚠️ {', '.join(ki['razlozi'])}")
+
+    servis(c3, "⚙️ Engine", en)
+    if en:
+        c3.metric("Transakcija p50 / p95", f"{en['commit_ms']['p50']:.0f} / {en['commit_ms']['p95']:.0f} ms")
+        c3.caption(
+            f"Naredbi: {en['naredbi']} u {en['skupina']} skupina · u redu: {en['u_redu']} · "
+            f"aktivnih: {en['aktivnih']}"
+        )
+
+    st.markdown("---")
+    baza = metrics.stanje_datoteka(DB_PATH)
+    lock = sum(m.get("lock_cekanja", 0) for m in sve.values())
+    backup = metrics.zadnji_backup()
+    broj, najstariji = aktivni_alarmi()
+
+    d = st.columns(6)
+    d[0].metric("🗄️ Baza", mb(baza["db_bytes"]))
+    d[1].metric("📝 WAL", mb(baza["wal_bytes"]))
+    d[2].metric("⏳ Čeka checkpoint", f"{baza['wal_okviri']} str.", help="Okviri u WAL datoteci (gornja granica)")
+    d[3].metric("🔒 Čekanja na lock", lock, help="Greške 'database is locked' od pokretanja servisa")
+    d[4].metric("💾 Zadnji backup", trajanje(time.time() - backup[1]) if backup else "nikad")
+    d[5].metric("🚨 Aktivni alarmi", "—" if broj is None else broj, help=f"Najstariji čeka {trajanje(najstariji)}" if najstariji else None)
+    if najstariji is not None:
+        st.caption(f"Najstariji nepotvrđeni alarm čeka {trajanje(najstariji)}.")
+    st.caption(f"Osvježeno {datetime.now():%H:%M:%S} (svakih {OSVJEZI_S} s).")
+
+
 # Streamlit app configuration
 st.set_page_config(
     page_title="Administracija sustava narukvica",
@@ -71,6 +180,12 @@ st.markdown(f"""
 
 st.markdown("---")
 
+# stranice importaju DB_PATH iz ovog modula; ploča se crta samo kad je admin.py glavna skripta
+if __name__ == "__main__":
+    st.markdown("<span style='font-size:1.2em;'>⚡ <b>Performanse</b></span>", unsafe_allow_html=True)
+    nadzorna_ploca()
+    st.markdown("---")
+
 rezultati = provjeri_postojanje(MAPA, STAVKE)
 cols = st.columns(3)  # 3 kolone
 
@@ -4,6 +4,7 @@ import sqlite3
 import pandas as pd
 from datetime import datetime
 from admin import DB_PATH
+from module.pickers import picker
 import time
 
 # ------------------ Postavke sučelja ------------------
@@ -287,11 +288,12 @@ with tab_sim:
     else:
         st.markdown("Ručno upravljanje jednom zonom")
 
-        selected_zone_id = st.selectbox(
+        selected_zone_id = picker(
             "Odaberi zonu",
-            options=df_zone["zone_id"].tolist(),
-            format_func=lambda zid: f"{df_zone[df_zone['zone_id']==zid]['zone_naziv'].iloc[0]} ID {zid}",
+            df_zone,
+            "{zone_naziv} ID {zone_id}",
             key="sel_zone",
+            id_col="zone_id",
         )
 
         if st.button(
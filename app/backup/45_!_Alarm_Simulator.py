@@ -4,6 +4,7 @@ import pandas as pd
 import random
 from datetime import datetime, date, timedelta
 from admin import DB_PATH
+from module.pickers import picker
 
 st.set_page_config(
     page_title="Alarm Simulator",
@@ -304,10 +305,10 @@ with tab2:
         st.markdown("#### 🛠️ Upravljanje")
 
         # Single alarm selector for both operations
-        selected_alarm_id = st.selectbox(
+        selected_alarm_id = picker(
             "Odaberi alarm:",
-            options=df_aktivni["id"].tolist(),
-            format_func=lambda x: f"{df_aktivni[df_aktivni['id']==x]['zone_name'].iloc[0]} - {df_aktivni[df_aktivni['id']==x]['korisnik'].iloc[0]}",
+            df_aktivni,
+            "{zone_name} - {korisnik}",
             key="shared_alarm_selector",
         )
 
@@ -325,16 +326,16 @@ with tab2:
 
             osoblje_df = get_aktivno_osoblje()
             if not osoblje_df.empty:
-                selected_osoblje_id = st.selectbox(
+                selected_osoblje_id = picker(
                     "Odaberi osoblje:",
-                    options=osoblje_df["id"].tolist(),
-                    format_func=lambda x: f"{osoblje_df[osoblje_df['id']==x]['ime'].iloc[0]} ({osoblje_df[osoblje_df['id']==x]['sifra'].iloc[0]})",
+                    osoblje_df,
+                    "{ime} ({sifra})",
                     key="osoblje_selector",
                 )
 
-                selected_osoblje_ime = osoblje_df[
-                    osoblje_df["id"] == selected_osoblje_id
-                ]["ime"].iloc[0]
+                selected_osoblje_ime = dict(zip(osoblje_df["id"], osoblje_df["ime"])).get(
+                    selected_osoblje_id
+                )
 
                 if st.button("✅ Potvrdi Alarm", type="primary", width="stretch"):
                     if confirm_alarm(selected_alarm_id, selected_osoblje_ime):
@@ -0,0 +1,471 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from multiprocessing.connection import Connection, Listener
+
+from module.cooldown import CooldownTracker, cooldown_until, ensure_cooldown_columns, get_cooldown_s
+from module.db_changes import ensure_change_triggers
+from module.engine_client import ENGINE_ADDRESS, ENGINE_COMMIT_BUDGET, ENGINE_ROK, engine_authkey
+from module import metrics
+from module.zone_journal import append_transitions, IZVOR_CENTRALA, IZVOR_KIOSK
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "data", "alarmni_sustav.db")
+TIME_FMT = "%Y-%m-%d %H:%M:%S"
+
+# ------------------ POSTAVKE ------------------
+GROUP_COMMIT_MAX = 200  # najviše naredbi u jednoj transakciji
+GROUP_COMMIT_WAIT = 0.02  # sekunde skupljanja naredbi prije commita
+RECONCILE_INTERVAL = 1.0  # sekunde između provjera tuđih upisa u bazu
+ODGOVOR_TIMEOUT = ENGINE_ROK + ENGINE_COMMIT_BUDGET  # s koliko veza čeka rezultat naredbe
+PONAVLJANJA_FLUSH = 30.0  # sekunde između upisa brojača spojenih aktivacija
+
+
+# ------------------ STANJE ------------------
+class AlarmEngine:
+    """Jedini pisac životnog ciklusa alarma (zona -> alarm -> potvrda).
+
+    Stanje zona i aktivnih alarma drži u memoriji, naredbe primjenjuje u
+    skupinama (jedna transakcija po skupini) i tek nakon commita odgovara
+    pozivateljima. Promjene se objavljuju kroz comm['gen_alarms'] (trigger).
+
+    Ponovljene aktivacije zone koja već ima aktivan alarm se spajaju u taj
+    alarm (alarms.ponavljanja), a one unutar cooldowna nakon potvrde se
+    potiskuju i na isteku roka podižu jedan odgođeni alarm.
+    """
+
+    def __init__(self, db_path: str = DB_PATH) -> None:
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        self.conn.execute(f"PRAGMA busy_timeout = {int(ENGINE_COMMIT_BUDGET * 1000)}")
+        ensure_change_triggers(self.conn)
+        ensure_cooldown_columns(self.conn)
+        self.zone: dict[int, int] = {}  # zone_id -> alarm_status
+        self.aktivni: dict[int, int] = {}  # zone_id -> id nepotvrđenog alarma
+        self.cooldown = CooldownTracker()
+        self.cooldown_s = get_cooldown_s(self.conn)
+        self._ponavljanja: dict[int, int] = {}  # alarm_id -> spojene aktivacije (još neupisane)
+        self._zadnji_flush = time.monotonic()
+        self._data_version = -1
+        self.uskladi()
+
+    # --- učitavanje / usklađivanje s bazom ---
+    def _ucitaj(self) -> None:
+        self.zone = {}
+        for zid, status, rok in self.conn.execute(
+            "SELECT id, alarm_status, cooldown_until_epoch FROM zone"
+        ):
+            self.zone[zid] = status
+            if rok and rok > time.time():
+                self.cooldown.zapocni(zid, int(rok))  # isti rok ne briše brojač potisnutih
+        self.cooldown_s = get_cooldown_s(self.conn)
+        self.aktivni = {
+            zid: aid
+            for aid, zid in self.conn.execute(
+                "SELECT id, zone_id FROM alarms WHERE potvrda = 0 ORDER BY id"
+            )
+        }
+
+    def _data_version_sad(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def uskladi(self) -> int:
+        """Ponovno učitaj stanje i kreiraj alarme za zone u alarmu bez aktivnog alarma.
+
+        Pokriva pisce koji još mijenjaju zone izravno (stari simulatori, ručni SQL).
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            novi = self._uskladi_u_transakciji()
+            self._commit()
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return novi
+
+    def _commit(self) -> None:
+        """COMMIT uz bilježenje data_version prije njega.
+
+        Dok transakcija drži zaključavanje nitko drugi ne može commitati, a
+        vlastiti commit ne mijenja data_version ove konekcije; čitanje nakon
+        COMMIT-a bi kao viđen označilo i tuđi upis koji stigne između.
+        """
+        dv = self._data_version_sad()
+        self.conn.execute("COMMIT")
+        self._data_version = dv
+
+    def _uskladi_u_transakciji(self) -> int:
+        self._ucitaj()
+        return self._kreiraj_alarme([z for z, s in self.zone.items() if s == 1])
+
+    def _snimka(self) -> tuple:
+        """Stanje koje postoji samo u memoriji (neupisani brojači, cooldown)."""
+        return dict(self._ponavljanja), self.cooldown.snimka()
+
+    def _vrati(self, snimka: tuple) -> None:
+        """Vrati _snimka() nakon ROLLBACK-a; zone i aktivni se ponovno čitaju iz baze."""
+        ponavljanja, cooldown = snimka
+        self._ponavljanja = dict(ponavljanja)
+        self.cooldown.vrati(cooldown)
+        self._data_version = -1
+
+    def tudji_upis(self) -> bool:
+        """True ako je netko drugi commitao u bazu od zadnjeg usklađivanja."""
+        return self._data_version_sad() != self._data_version
+
+    # --- prijelazi ---
+    def _kreiraj_alarme(self, zone_ids: list[int], ponavljanja: dict[int, int] | None = None) -> int:
+        """Za zone u alarmu bez aktivnog alarma dodaj red u alarms (unutar transakcije)."""
+        kandidati = [z for z in zone_ids if z not in self.aktivni]
+        if not kandidati:
+            return 0
+        now_txt = datetime.now().strftime(TIME_FMT)
+        oznake = ",".join("?" * len(kandidati))
+        rows = self.conn.execute(
+            f"""
+            SELECT z.id, z.naziv, k.ime, k.soba
+            FROM zone z
+            LEFT JOIN korisnici k ON k.id = z.korisnik_id
+            WHERE z.id IN ({oznake})
+            """,
+            kandidati,
+        ).fetchall()
+        for zid, naziv, korisnik, soba in rows:
+            cur = self.conn.execute(
+                """
+                INSERT INTO alarms (zone_id, zone_name, vrijeme, potvrda, korisnik, soba, ponavljanja)
+                VALUES (?, ?, ?, 0, ?, ?, ?)
+                """,
+                (
+                    int(zid),
+                    str(naziv),
+                    now_txt,
+                    None if korisnik is None else str(korisnik),
+                    None if soba is None else str(soba),
+                    int(ponavljanja.get(zid, 0)) if ponavljanja else 0,
+                ),
+            )
+            self.aktivni[int(zid)] = cur.lastrowid
+        return len(rows)
+
+    def _zone_alarm(self, n: dict) -> dict:
+        """Postavi status zona (1 = alarm s centrale/simulatora, 0 = reset)."""
+        status = int(n["status"])
+        izvor = int(n["izvor"])
+        now_txt = datetime.now().strftime(TIME_FMT)
+        nazivi = {int(k): v for k, v in (n.get("nazivi") or {}).items()}
+        if nazivi:
+            self.conn.executemany(
+                "INSERT INTO zone (id, naziv) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET naziv=excluded.naziv WHERE naziv IS NOT excluded.naziv",
+                list(nazivi.items()),
+            )
+            for zid in nazivi:
+                self.zone.setdefault(zid, 0)
+
+        if n.get("zone_ids") is None:  # sve zone
+            zone_ids = [z for z, s in self.zone.items() if s != status]
+        else:
+            zone_ids = [int(z) for z in n["zone_ids"] if int(z) in self.zone]
+
+        spojeno = potisnuto = 0
+        if status == 1:
+            sad = time.time()
+            nove = []
+            for z in zone_ids:
+                if self.zone.get(z) == 1 and z in self.aktivni:
+                    # zona već alarmira: spoji u postojeći alarm, bez upisa
+                    aid = self.aktivni[z]
+                    self._ponavljanja[aid] = self._ponavljanja.get(aid, 0) + 1
+                    spojeno += 1
+                elif self.cooldown.aktivan(z, sad):
+                    # nedavno potvrđena zona: broji se, alarm dolazi na isteku roka
+                    self.cooldown.potisni(z)
+                    potisnuto += 1
+                else:
+                    nove.append(z)
+            zone_ids = nove
+            self.conn.executemany(
+                "UPDATE zone SET alarm_status = 1, last_alarm_time = ?, last_updated = ? WHERE id = ?",
+                [(now_txt, now_txt, z) for z in zone_ids],
+            )
+        else:
+            self.conn.executemany(
+                "UPDATE zone SET alarm_status = 0, last_updated = ? WHERE id = ?",
+                [(now_txt, z) for z in zone_ids],
+            )
+        promijenjene = [z for z in zone_ids if self.zone.get(z) != status]
+        append_transitions(self.conn, promijenjene, status, izvor)
+        for z in zone_ids:
+            self.zone[z] = status
+        novih = self._kreiraj_alarme(zone_ids) if status == 1 else 0
+        return {
+            "ok": True,
+            "zona": len(zone_ids),
+            "promijenjeno": len(promijenjene),
+            "novih_alarma": novih,
+            "spojeno": spojeno,
+            "potisnuto": potisnuto,
+        }
+
+    def _potvrdi(self, n: dict) -> dict:
+        """Potvrdi alarm (samo ako je još nepotvrđen) i resetiraj njegovu zonu."""
+        alarm_id = int(n["alarm_id"])
+        now_txt = datetime.now().strftime(TIME_FMT)
+        cur = self.conn.execute(
+            """
+            UPDATE alarms SET potvrda = 1, osoblje = ?, vrijemePotvrde = ?
+            WHERE id = ? AND potvrda = 0
+            """,
+            (n["osoblje"], now_txt, alarm_id),
+        )
+        if cur.rowcount != 1:
+            row = self.conn.execute(
+                "SELECT osoblje FROM alarms WHERE id = ?", (alarm_id,)
+            ).fetchone()
+            return {"ok": True, "pobjeda": False, "osoblje": row[0] if row else None}
+
+        zone_id = next((z for z, a in self.aktivni.items() if a == alarm_id), None)
+        if zone_id is None:
+            row = self.conn.execute("SELECT zone_id FROM alarms WHERE id = ?", (alarm_id,)).fetchone()
+            zone_id = row[0] if row else None
+        self._upisi_ponavljanja([alarm_id])
+        if zone_id is not None:
+            self.aktivni.pop(zone_id, None)
+            self._zone_alarm(
+                {"zone_ids": [zone_id], "status": 0, "izvor": n.get("izvor", IZVOR_KIOSK)}
+            )
+            if self.cooldown_s > 0:
+                rok, rok_txt = cooldown_until(self.cooldown_s)
+                self.conn.execute(
+                    "UPDATE zone SET cooldown_until_epoch = ?, cooldown_until = ? WHERE id = ?",
+                    (rok, rok_txt, zone_id),
+                )
+                self.cooldown.zapocni(zone_id, rok)
+        return {"ok": True, "pobjeda": True, "osoblje": n["osoblje"], "zone_id": zone_id}
+
+    # --- brojači i rokovi ---
+    def _upisi_ponavljanja(self, alarm_ids: list[int] | None = None) -> None:
+        """Upiši spojene aktivacije (sve ili samo za zadane alarme) unutar transakcije."""
+        ids = list(self._ponavljanja) if alarm_ids is None else [a for a in alarm_ids if a in self._ponavljanja]
+        if not ids:
+            return
+        self.conn.executemany(
+            "UPDATE alarms SET ponavljanja = COALESCE(ponavljanja, 0) + ? WHERE id = ?",
+            [(self._ponavljanja.pop(a), a) for a in ids],
+        )
+
+    def odradi_rokove(self) -> int:
+        """Istekli cooldowni + periodični upis brojača; vrati broj odgođenih alarma."""
+        rok = self.cooldown.sljedeci_rok()
+        flush = self._ponavljanja and time.monotonic() - self._zadnji_flush >= PONAVLJANJA_FLUSH
+        if (rok is None or rok > time.time()) and not flush:
+            return 0
+        snimka = self._snimka()  # istekli() i upis brojača ih skidaju prije COMMIT-a
+        odgodeni = {z: n for z, n in self.cooldown.istekli() if n > 0}
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.tudji_upis():
+                self._uskladi_u_transakciji()
+            self._upisi_ponavljanja()
+            if odgodeni:
+                # prva potisnuta aktivacija postaje alarm, ostale su ponavljanja
+                zone_ids = [z for z in odgodeni if z in self.zone]
+                now_txt = datetime.now().strftime(TIME_FMT)
+                self.conn.executemany(
+                    "UPDATE zone SET alarm_status = 1, last_alarm_time = ?, last_updated = ? WHERE id = ?",
+                    [(now_txt, now_txt, z) for z in zone_ids],
+                )
+                append_transitions(self.conn, [z for z in zone_ids if self.zone.get(z) != 1], 1, IZVOR_CENTRALA)
+                for z in zone_ids:
+                    self.zone[z] = 1
+                self._kreiraj_alarme(zone_ids, {z: odgodeni[z] - 1 for z in zone_ids})
+            self._commit()
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            self._vrati(snimka)  # rokovi i brojači čekaju sljedeći pokušaj
+            raise
+        self._zadnji_flush = time.monotonic()
+        return len(odgodeni)
+
+    def timeout(self) -> float:
+        """Koliko glavna petlja smije čekati na naredbu (do najbližeg roka)."""
+        rok = self.cooldown.sljedeci_rok()
+        if rok is None:
+            return RECONCILE_INTERVAL
+        return max(0.05, min(RECONCILE_INTERVAL, rok - time.time()))
+
+    NAREDBE = {"zone_alarm": _zone_alarm, "potvrdi": _potvrdi}
+
+    def primijeni(self, skupina: list[tuple[dict, queue.Queue]]) -> None:
+        """Primijeni skupinu naredbi u jednoj transakciji pa odgovori svima."""
+        odgovori = []
+        pocetak = self._snimka()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # provjera unutar transakcije: nakon zaključavanja nitko drugi ne piše
+            if self.tudji_upis():
+                self._uskladi_u_transakciji()
+            ponovno_ucitaj = False
+            for naredba, odgovor in skupina:
+                fn = self.NAREDBE.get(naredba.get("cmd"))
+                if naredba.get("_rok", float("inf")) < time.monotonic():
+                    # veza je klijentu već javila timeout; kasna primjena bi se
+                    # mogla sudariti s njegovim ponovnim pokušajem
+                    odgovori.append((odgovor, {"ok": False, "greska": "naredba je istekla u redu"}))
+                    continue
+                if fn is None:
+                    odgovori.append((odgovor, {"ok": False, "greska": f"nepoznata naredba {naredba.get('cmd')!r}"}))
+                    continue
+                snimka = self._snimka()
+                self.conn.execute("SAVEPOINT naredba")
+                try:
+                    odgovori.append((odgovor, fn(self, naredba)))
+                    self.conn.execute("RELEASE naredba")
+                except (sqlite3.Error, KeyError, TypeError, ValueError) as e:
+                    self.conn.execute("ROLLBACK TO naredba")
+                    self.conn.execute("RELEASE naredba")
+                    self._vrati(snimka)
+                    ponovno_ucitaj = True  # zone i aktivni su možda ispred baze
+                    odgovori.append((odgovor, {"ok": False, "greska": str(e)}))
+            self._commit()
+            if ponovno_ucitaj:
+                self._data_version = -1  # sljedeća provjera ponovno učitava stanje
+        except Exception as e:
+            self.conn.execute("ROLLBACK")
+            self._vrati(pocetak)
+            self.uskladi()  # memorija je možda ispred baze
+            odgovori = [(o, {"ok": False, "greska": str(e)}) for _, o in skupina]
+        for odgovor, rezultat in odgovori:
+            odgovor.put(rezultat)
+
+
+# ------------------ VEZE ------------------
+def _posluzi_vezu(conn: Connection, ulaz: queue.Queue) -> None:
+    """Jedna veza klijenta: primi naredbu, stavi je u red, vrati rezultat."""
+    try:
+        while True:
+            naredba = conn.recv()
+            if naredba.get("cmd") == "ping":
+                # provjera dostupnosti ne čeka red ni zaključavanje baze
+                conn.send({"ok": True})
+                continue
+            # novi red po naredbi: zakašnjeli odgovor ne može zalutati u sljedeću
+            odgovor: queue.Queue = queue.Queue(maxsize=1)
+            naredba["_rok"] = time.monotonic() + ENGINE_ROK
+            ulaz.put((naredba, odgovor))
+            try:
+                conn.send(odgovor.get(timeout=ODGOVOR_TIMEOUT))
+            except queue.Empty:
+                conn.send({"ok": False, "greska": "timeout"})
+    except (EOFError, OSError):
+        pass
+    finally:
+        conn.close()
+
+
+def _prihvacaj(listener: Listener, ulaz: queue.Queue) -> None:
+    while True:
+        try:
+            conn = listener.accept()
+        except Exception as e:  # npr. krivi authkey
+            print(f"[engine] Odbijena veza: {e}")
+            continue
+        threading.Thread(target=_posluzi_vezu, args=(conn, ulaz), daemon=True).start()
+
+
+# ------------------ METRIKE ------------------
+class EngineMetrike:
+    """Brojači i trajanja transakcija za data/metrics/engine.json."""
+
+    def __init__(self) -> None:
+        self.commit_ms = metrics.Mjerenja()
+        self.naredbi = 0
+        self.skupina = 0
+        self.lock_cekanja = 0
+        self.greske_baze = 0
+        self._zapisano = 0.0
+
+    def greska(self, e: sqlite3.Error) -> None:
+        self.greske_baze += 1
+        if metrics.je_zakljucano(e):
+            self.lock_cekanja += 1
+
+    def zapisi(self, engine: "AlarmEngine", ulaz: queue.Queue) -> None:
+        if time.monotonic() - self._zapisano < metrics.METRIKE_INTERVAL:
+            return
+        self._zapisano = time.monotonic()
+        try:
+            metrics.zapisi(
+                "engine",
+                {
+                    "commit_ms": self.commit_ms.sazetak(),
+                    "naredbi": self.naredbi,
+                    "skupina": self.skupina,
+                    "u_redu": ulaz.qsize(),
+                    "aktivnih": len(engine.aktivni),
+                    "lock_cekanja": self.lock_cekanja,
+                    "greske_baze": self.greske_baze,
+                },
+            )
+        except OSError as e:
+            print(f"[engine] Upozorenje: metrike nisu zapisane: {e}")
+
+
+# ------------------ GLAVNA PETLJA ------------------
+def main():
+    engine = AlarmEngine(DB_PATH)
+    ulaz: queue.Queue = queue.Queue()
+    listener = Listener(ENGINE_ADDRESS, authkey=engine_authkey())
+    threading.Thread(target=_prihvacaj, args=(listener, ulaz), daemon=True).start()
+    print(f"[engine] ✅ Sluša na {ENGINE_ADDRESS[0]}:{ENGINE_ADDRESS[1]}, aktivnih alarma: {len(engine.aktivni)}")
+    mjere = EngineMetrike()
+
+    while True:
+        mjere.zapisi(engine, ulaz)
+        try:
+            prva = ulaz.get(timeout=engine.timeout())
+        except queue.Empty:
+            try:
+                odgodeni = engine.odradi_rokove()
+                if odgodeni:
+                    print(f"[engine] Istekao cooldown, odgođenih alarma: {odgodeni}")
+                if engine.tudji_upis():
+                    novi = engine.uskladi()
+                    if novi:
+                        print(f"[engine] Usklađeno s bazom, novih alarma: {novi}")
+            except sqlite3.Error as e:
+                print(f"[engine] ❌ Greška usklađivanja: {e}")
+                mjere.greska(e)
+            continue
+
+        # group commit: pričekaj kratko da se skupi više naredbi
+        skupina = [prva]
+        rok = time.monotonic() + GROUP_COMMIT_WAIT
+        while len(skupina) < GROUP_COMMIT_MAX:
+            ostalo = rok - time.monotonic()
+            if ostalo <= 0:
+                break
+            try:
+                skupina.append(ulaz.get(timeout=ostalo))
+            except queue.Empty:
+                break
+        t0 = time.perf_counter()
+        try:
+            engine.primijeni(skupina)
+            engine.odradi_rokove()
+            mjere.commit_ms.dodaj((time.perf_counter() - t0) * 1000)
+            mjere.naredbi += len(skupina)
+            mjere.skupina += 1
+        except sqlite3.Error as e:
+            print(f"[engine] ❌ Greška baze: {e}")
+            mjere.greska(e)
+            for _, odgovor in skupina:
+                if odgovor.empty():
+                    odgovor.put({"ok": False, "greska": str(e)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""Generator sintetičke baze za mjerenje performansi na većem opsegu.
+
+Primjeri:
+    python gen_dataset.py --out data/bench_10x.db --skala 10
+    python gen_dataset.py --out data/bench.db --zone 5000 --alarmi 3000000 --seed 7
+
+Ista kombinacija argumenata i seeda uvijek daje istu bazu (osim vremena
+"sada" od kojeg se broje dani, vidi --do).
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from module.config import TIME_FMT, ensure_table
+from module.cooldown import ensure_cooldown_columns
+from module.db_changes import PRACENE_TABLICE, ensure_change_triggers
+from module.response_times import SMJENE, smjena_po_satu
+from module.zone_groups import GRUPE_INDEXI
+from module.zone_journal import IZVOR_CENTRALA, IZVOR_KIOSK, JOURNAL_KEEP_DAYS, ensure_journal
+
+# ------------------ POSTAVKE ------------------
+BAZA = {  # današnja veličina doma; --skala množi ove brojeve
+    "zone": 120,
+    "korisnici": 100,
+    "osoblje": 25,
+    "alarmi": 20000,
+}
+DANI = 365  # koliko dana unatrag sežu alarmi
+CHUNK = 100_000  # redaka po executemany
+KRILA = ("A", "B", "C", "D")
+KATOVA = 4
+ZONA_PO_STANICI = 30
+
+# relativna učestalost alarma po satu (jutarnja njega, obroci, večer, noćni WC)
+DNEVNI_PROFIL = np.array(
+    [3, 2, 2, 2, 2, 3, 5, 9, 10, 8, 6, 6, 8, 7, 5, 5, 6, 7, 9, 9, 7, 6, 5, 4],
+    dtype=float,
+)
+POTVRDA_MEDIJAN_S = 90  # medijan čekanja na potvrdu (lognormalna raspodjela)
+POTVRDA_SIGMA = 0.9
+NOCNI_FAKTOR = 1.6  # noću je manje osoblja pa se čeka dulje
+POTVRDA_MAX_S = 2 * 3600
+FLAPPING_UDIO = 0.1  # udio alarma koji dolazi iz zona koje "trepere"
+FLAPPING_ZONA = 0.02  # udio zona koje trepere
+FLAPPING_RAZMAK_S = 60  # prosječni razmak ponovljenih alarma u naletu
+FLAPPING_NALET = 6  # prosječna duljina naleta
+
+# isti indeksi kao INDEX_DEFS u 9_!_SqlLite (alarmi) i zone_groups (grupe)
+INDEKSI = [
+    "CREATE INDEX IF NOT EXISTS ix_alarms_potvrda_vrijeme ON alarms(potvrda, vrijeme DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_alarms_zone_time ON alarms(zone_id, vrijeme DESC)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_alarms_active_per_zone ON alarms(zone_id) WHERE potvrda=0",
+    "CREATE INDEX IF NOT EXISTS ix_zone_alarm_status ON zone(alarm_status)",
+    "CREATE INDEX IF NOT EXISTS ix_zone_cooldown ON zone(cooldown_until)",
+    "CREATE INDEX IF NOT EXISTS ix_zone_korisnik_id ON zone(korisnik_id)",
+    "CREATE INDEX IF NOT EXISTS ix_osoblje_sifra_aktivna ON osoblje(sifra, aktivna)",
+    *GRUPE_INDEXI.values(),
+]
+
+
+# ------------------ POMOĆNE ------------------
+def _u_tekst(t: np.ndarray) -> np.ndarray:
+    """datetime64[s] -> TIME_FMT tekst (vektorizirano)."""
+    return np.char.replace(np.datetime_as_string(t, unit="s"), "T", " ")
+
+
+def _epoch(t: np.ndarray) -> np.ndarray:
+    """Lokalno datetime64[s] (kao TIME_FMT u bazi) -> Unix epoch, uz ljetno vrijeme.
+
+    Pomak lokalne zone se računa mktime-om jednom po satu (prijelazi su na
+    puni sat), a ne po alarmu.
+    """
+    naivno = t.astype(int)
+    sati, inv = np.unique(naivno // 3600, return_inverse=True)
+    pomak = np.array(
+        [time.mktime((datetime(1970, 1, 1) + timedelta(hours=h)).timetuple()) - h * 3600 for h in sati.tolist()],
+        dtype=np.int64,
+    )
+    return naivno + pomak[inv]
+
+
+def _upisi(conn: sqlite3.Connection, sql: str, stupci: list) -> int:
+    """executemany u komadima po CHUNK redaka iz stupaca (numpy ili liste)."""
+    n = len(stupci[0])
+    for i in range(0, n, CHUNK):
+        conn.executemany(sql, zip(*(s[i : i + CHUNK].tolist() for s in stupci)))
+    return n
+
+
+def _vremena(rng: np.random.Generator, n: int, od: np.datetime64, kraj: np.datetime64) -> np.ndarray:
+    """n trenutaka u [od, kraj] po DNEVNI_PROFIL (od je ponoć).
+
+    Bira se sat razdoblja s težinom profila; zadnji, nepotpuni sat ima težinu
+    razmjernu svom dijelu prije `kraj`, pa zadnji dan prati profil do `kraj`.
+    """
+    ukupno = int((kraj - od).astype(int)) + 1  # sekundi u razdoblju
+    pocetak = np.arange(0, ukupno, 3600)
+    duljina = np.minimum(3600, ukupno - pocetak)
+    tezine = DNEVNI_PROFIL[(pocetak // 3600) % 24] * duljina
+    sat = rng.choice(len(pocetak), n, p=tezine / tezine.sum())
+    sekunda = pocetak[sat] + (rng.random(n) * duljina[sat]).astype(int)
+    return od + sekunda.astype("timedelta64[s]")
+
+
+# ------------------ GENERIRANJE ------------------
+def generiraj_zone_i_korisnike(rng: np.random.Generator, broj_zona: int, broj_korisnika: int):
+    """Zone s krilom/katom/stanicom; korisnici na slučajnim zonama (jedan po zoni)."""
+    ids = np.arange(1, broj_zona + 1)
+    krilo = np.array(KRILA)[(ids - 1) * len(KRILA) // broj_zona]
+    kat = ((ids - 1) // ZONA_PO_STANICI) % KATOVA
+    stanica = np.char.add("S", ((ids - 1) // ZONA_PO_STANICI + 1).astype(str))
+    naziv = np.char.add("Narukvica ", np.char.zfill(ids.astype(str), 5))
+
+    zauzete = np.sort(rng.choice(ids, size=broj_korisnika, replace=False))
+    kid = np.arange(1, broj_korisnika + 1)
+    ime = np.char.add("Štićenik ", np.char.zfill(kid.astype(str), 5))
+    z = zauzete - 1
+    soba = np.char.add(
+        np.char.add(krilo[z], kat[z].astype(str)),
+        np.char.zfill((z % ZONA_PO_STANICI + 1).astype(str), 2),
+    )
+    korisnik_zone = np.zeros(broj_zona, dtype=object)
+    korisnik_zone[:] = None
+    korisnik_zone[z] = kid
+    zone = {
+        "id": ids,
+        "naziv": naziv,
+        "korisnik_id": korisnik_zone,
+        "krilo": krilo,
+        "kat": kat.astype(str),
+        "stanica": stanica,
+    }
+    korisnici = {"id": kid, "ime": ime, "soba": soba, "zona": zauzete}
+    return zone, korisnici
+
+
+def generiraj_osoblje(rng: np.random.Generator, broj: int) -> dict:
+    """Osoblje s jedinstvenim 4-znamenkastim PIN-om, raspoređeno po smjenama."""
+    if broj > 10000:
+        raise SystemExit("Najviše 10000 osoba (PIN ima 4 znamenke).")
+    ids = np.arange(1, broj + 1)
+    return {
+        "id": ids,
+        "ime": np.char.add("Djelatnik ", np.char.zfill(ids.astype(str), 4)),
+        "sifra": np.char.zfill(rng.choice(10000, broj, replace=False).astype(str), 4),
+        "aktivna": (rng.random(broj) < 0.9).astype(int),
+        "smjena": ids % len(SMJENE),  # indeks u SMJENE
+    }
+
+
+def generiraj_alarme(
+    rng: np.random.Generator,
+    broj: int,
+    dani: int,
+    do: datetime,
+    zone: dict,
+    korisnici: dict,
+    osoblje: dict,
+) -> dict:
+    """Alarmi kroz `dani` dana do `do`, sortirani po vremenu.
+
+    Zone imaju različitu učestalost (gama raspodjela), dio zona "treperi"
+    (naleti alarma u razmaku od ~minute), a čekanje na potvrdu je lognormalno
+    i dulje noću. Potvrđuje osoba iz smjene u kojoj je alarm nastao.
+    """
+    # dani počinju u ponoć (profil je po satu dana); zadnji dan završava u `do`
+    od = np.datetime64((do - timedelta(days=dani - 1)).date(), "s")
+    kraj = np.datetime64(do, "s")
+    zauzete = korisnici["zona"]
+
+    # obični alarmi: zone s korisnikom, različito "aktivni" štićenici
+    broj_flap = int(broj * FLAPPING_UDIO)
+    tezine = rng.gamma(0.8, size=len(zauzete))
+    zona = rng.choice(zauzete, broj - broj_flap, p=tezine / tezine.sum())
+    vrijeme = _vremena(rng, len(zona), od, kraj)
+
+    # naleti iz zona koje trepere: početak po profilu, razmaci eksponencijalni
+    treperi = np.zeros(len(zona), bool)
+    if broj_flap:
+        flap_zone = rng.choice(zauzete, max(1, int(len(zauzete) * FLAPPING_ZONA)), replace=False)
+        duljine = rng.poisson(FLAPPING_NALET - 1, broj_flap // FLAPPING_NALET + 1) + 1
+        duljine = duljine[np.cumsum(duljine) <= broj_flap]
+        if broj_flap > duljine.sum():
+            duljine = np.r_[duljine, broj_flap - duljine.sum()]
+        pomak = rng.exponential(FLAPPING_RAZMAK_S, broj_flap)
+        prvi = np.r_[0, np.cumsum(duljine)[:-1]]  # prvi alarm naleta nema pomak
+        pomak[prvi] = 0
+        pomak = (np.cumsum(pomak) - np.repeat(np.cumsum(pomak)[prvi], duljine)).astype(int)
+        # nalet koji bi završio iza `kraj` dobiva novi početak
+        trajanje = pomak[np.cumsum(duljine) - 1].astype("timedelta64[s]")
+        pocetak = _vremena(rng, len(duljine), od, kraj)
+        preko = pocetak + trajanje > kraj
+        for _ in range(100):
+            if not preko.any():
+                break
+            pocetak[preko] = _vremena(rng, int(preko.sum()), od, kraj)
+            preko = pocetak + trajanje > kraj
+        else:  # nalet dulji od gotovo cijelog razdoblja (vrlo mali --dani)
+            pocetak[preko] = np.maximum(od, kraj - trajanje[preko])
+        zona = np.r_[zona, np.repeat(rng.choice(flap_zone, len(duljine)), duljine)]
+        vrijeme = np.r_[vrijeme, np.repeat(pocetak, duljine) + pomak.astype("timedelta64[s]")]
+        treperi = np.r_[treperi, np.ones(broj_flap, bool)]
+
+    red = np.argsort(vrijeme, kind="stable")
+    zona, vrijeme, treperi = zona[red], vrijeme[red], treperi[red]
+    n = len(zona)
+
+    # čekanje na potvrdu: lognormalno, noću dulje, lažni (treperi) kratko
+    sat = (vrijeme - vrijeme.astype("datetime64[D]")).astype(int) // 3600
+    smjena_idx = {naziv: i for i, (naziv, _, _) in enumerate(SMJENE)}
+    smjena_sata = np.array([smjena_idx.get(naziv, 0) for naziv in smjena_po_satu()])
+    smjena = smjena_sata[sat]
+    noc = smjena == len(SMJENE) - 1  # zadnja u SMJENE je noćna
+    cekanje = rng.lognormal(np.log(POTVRDA_MEDIJAN_S), POTVRDA_SIGMA, n)
+    cekanje = np.where(noc, cekanje * NOCNI_FAKTOR, cekanje)
+    cekanje = np.where(treperi, cekanje / 4, cekanje)
+    cekanje = np.clip(cekanje, 3, POTVRDA_MAX_S).astype("timedelta64[s]")
+
+    # potvrđuje aktivna osoba iz smjene alarma
+    aktivni = osoblje["aktivna"] == 1
+    po_smjeni = [osoblje["ime"][aktivni & (osoblje["smjena"] == i)] for i in range(len(SMJENE))]
+    potvrdio = np.empty(n, dtype=object)
+    for i, imena in enumerate(po_smjeni):
+        maska = smjena == i
+        izvor = imena if len(imena) else osoblje["ime"]
+        potvrdio[maska] = rng.choice(izvor, int(maska.sum()))
+
+    k = np.searchsorted(zauzete, zona)  # zona -> indeks korisnika (zauzete su sortirane)
+    return {
+        "zone_id": zona,
+        "zone_name": zone["naziv"][zona - 1],
+        "vrijeme": vrijeme,
+        "vrijemePotvrde": vrijeme + cekanje,
+        "korisnik": korisnici["ime"][k],
+        "soba": korisnici["soba"][k],
+        "osoblje": potvrdio,
+        "ponavljanja": np.where(treperi, rng.poisson(1.5, n), 0),
+    }
+
+
+# ------------------ UPIS ------------------
+def upisi_bazu(
+    putanja: str,
+    zone: dict,
+    korisnici: dict,
+    osoblje: dict,
+    alarmi: dict,
+    aktivnih: int,
+    indeksi: bool,
+    do: datetime,
+) -> dict[str, float]:
+    """Skupni upis uz brze PRAGMA postavke; na kraju indeksi, ANALYZE i WAL."""
+    trajanja = {}
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(putanja, isolation_level=None)
+    try:
+        # baza se puni od nule: bez journala i fsynca, ništa se ne može izgubiti
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -262144")  # 256 MB
+        for t in ("osoblje", "korisnici", "zone", "alarms", "comm"):
+            ensure_table(conn, t)
+        ensure_cooldown_columns(conn)
+        ensure_journal(conn)
+
+        conn.execute("BEGIN")
+        _upisi(conn, "INSERT INTO osoblje (id, ime, sifra, aktivna) VALUES (?, ?, ?, ?)",
+               [osoblje["id"], osoblje["ime"], osoblje["sifra"], osoblje["aktivna"]])
+        _upisi(conn, "INSERT INTO korisnici (id, ime, soba) VALUES (?, ?, ?)",
+               [korisnici["id"], korisnici["ime"], korisnici["soba"]])
+        _upisi(conn, "INSERT INTO zone (id, naziv, korisnik_id, krilo, kat, stanica) VALUES (?, ?, ?, ?, ?, ?)",
+               [zone["id"], zone["naziv"], zone["korisnik_id"], zone["krilo"], zone["kat"], zone["stanica"]])
+        conn.execute("COMMIT")
+        trajanja["zone_korisnici_osoblje"] = time.perf_counter() - t0
+
+        # zadnjih `aktivnih` alarma (različite zone) ostaje nepotvrđeno
+        n = len(alarmi["vrijeme"])
+        potvrda = np.ones(n, dtype=int)
+        _, zadnji = np.unique(alarmi["zone_id"][::-1], return_index=True)
+        otvoreni = np.sort(n - 1 - zadnji)[-aktivnih:] if aktivnih else np.array([], dtype=int)
+        potvrda[otvoreni] = 0
+        vrijeme = _u_tekst(alarmi["vrijeme"])
+        potvrde = _u_tekst(alarmi["vrijemePotvrde"]).astype(object)
+        potvrde[otvoreni] = None
+        osoba = alarmi["osoblje"].copy()
+        osoba[otvoreni] = None
+
+        t1 = time.perf_counter()
+        conn.execute("BEGIN")
+        _upisi(
+            conn,
+            "INSERT INTO alarms (zone_id, zone_name, vrijeme, potvrda, vrijemePotvrde, korisnik, soba, osoblje, ponavljanja) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [alarmi["zone_id"], alarmi["zone_name"], vrijeme, potvrda, potvrde,
+             alarmi["korisnik"], alarmi["soba"], osoba, alarmi["ponavljanja"]],
+        )
+        conn.executemany(
+            "UPDATE zone SET alarm_status = 1, last_alarm_time = ? WHERE id = ?",
+            [(vrijeme[i], int(alarmi["zone_id"][i])) for i in otvoreni],
+        )
+
+        # journal: detaljni prijelazi samo za zadnjih JOURNAL_KEEP_DAYS dana (ostalo je sažeto)
+        granica = np.datetime64(do - timedelta(days=JOURNAL_KEEP_DAYS), "s")
+        u_journalu = np.flatnonzero(alarmi["vrijeme"] >= granica)
+        zatvoreni = u_journalu[potvrda[u_journalu] == 1]
+        ts_on = _epoch(alarmi["vrijeme"][u_journalu])
+        ts_off = _epoch(alarmi["vrijemePotvrde"][zatvoreni])
+        _upisi(
+            conn,
+            "INSERT INTO zone_journal (ts, zone_id, status, izvor) VALUES (?, ?, ?, ?)",
+            [
+                np.r_[ts_on, ts_off],
+                np.r_[alarmi["zone_id"][u_journalu], alarmi["zone_id"][zatvoreni]],
+                np.r_[np.ones(len(ts_on), int), np.zeros(len(ts_off), int)],
+                np.r_[np.full(len(ts_on), IZVOR_CENTRALA), np.full(len(ts_off), IZVOR_KIOSK)],
+            ],
+        )
+        conn.execute("COMMIT")
+        trajanja["alarmi_journal"] = time.perf_counter() - t1
+
+        t2 = time.perf_counter()
+        if indeksi:
+            for sql in INDEKSI:
+                conn.execute(sql)
+        ensure_change_triggers(conn)
+        conn.executemany(
+            "INSERT INTO comm(key, value) VALUES(?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            [(f"gen_{t}",) for t in PRACENE_TABLICE],
+        )
+        conn.execute("ANALYZE")
+        trajanja["indeksi_analyze"] = time.perf_counter() - t2
+    finally:
+        conn.close()
+
+    # normalan način rada kao u produkciji (WAL), nova konekcija bez EXCLUSIVE
+    with sqlite3.connect(putanja) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+    trajanja["ukupno"] = time.perf_counter() - t0
+    return trajanja
+
+
+# ------------------ CLI ------------------
+def main():
+    p = argparse.ArgumentParser(description="Generira sintetičku bazu alarmnog sustava za mjerenje performansi.")
+    p.add_argument("--out", required=True, help="putanja nove baze (npr. data/bench_10x.db)")
+    p.add_argument("--skala", type=float, default=1.0, help="množitelj današnje veličine (10 = 10×)")
+    p.add_argument("--zone", type=int, help=f"broj zona (zadano {BAZA['zone']} × skala)")
+    p.add_argument("--korisnici", type=int, help=f"broj štićenika (zadano {BAZA['korisnici']} × skala)")
+    p.add_argument("--osoblje", type=int, help=f"broj osoblja (zadano {BAZA['osoblje']} × skala)")
+    p.add_argument("--alarmi", type=int, help=f"broj alarma (zadano {BAZA['alarmi']} × skala)")
+    p.add_argument("--dani", type=int, default=DANI, help="koliko dana unatrag sežu alarmi")
+    p.add_argument("--aktivni", type=int, default=5, help="nepotvrđenih alarma na kraju")
+    p.add_argument("--do", help=f"kraj razdoblja ({TIME_FMT.replace('%', '%%')}); zadano sada")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--bez-indeksa", action="store_true", help="ne kreiraj indekse (mjerenje bez njih)")
+    p.add_argument("--force", action="store_true", help="prepiši postojeću datoteku")
+    a = p.parse_args()
+
+    velicina = {k: getattr(a, k) or max(1, round(v * a.skala)) for k, v in BAZA.items()}
+    if velicina["korisnici"] > velicina["zone"]:
+        p.error("Korisnika ne može biti više nego zona (jedna narukvica po korisniku).")
+    if os.path.exists(a.out):
+        if not a.force:
+            p.error(f"{a.out} već postoji (--force za prepisivanje).")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(a.out + suffix):
+                os.remove(a.out + suffix)
+    os.makedirs(os.path.dirname(os.path.abspath(a.out)), exist_ok=True)
+    do = datetime.strptime(a.do, TIME_FMT) if a.do else datetime.now().replace(microsecond=0)
+
+    print(f"[gen] {velicina} kroz {a.dani} dana do {do:{TIME_FMT}}, seed {a.seed}")
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(a.seed)
+    zone, korisnici = generiraj_zone_i_korisnike(rng, velicina["zone"], velicina["korisnici"])
+    osoblje = generiraj_osoblje(rng, velicina["osoblje"])
+    alarmi = generiraj_alarme(rng, velicina["alarmi"], a.dani, do, zone, korisnici, osoblje)
+    print(f"[gen] Generirano u {time.perf_counter() - t0:.1f} s, upisujem u {a.out}…")
+
+    trajanja = upisi_bazu(a.out, zone, korisnici, osoblje, alarmi, a.aktivni, not a.bez_indeksa, do)
+    n = len(alarmi["vrijeme"])
+    print(
+        f"[gen] ✅ {n} alarma ({n / trajanja['alarmi_journal']:.0f}/s), "
+        + ", ".join(f"{k}: {v:.1f} s" for k, v in trajanja.items())
+    )
+    print(f"[gen] Veličina: {os.path.getsize(a.out) / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,34 @@
 import os
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import secrets
 import sqlite3
-from nicegui import ui
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+from nicegui import ui, app, background_tasks, Client
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
 from datetime import datetime
+from module.zone_journal import append_transitions, IZVOR_KIOSK
+from module.db_changes import data_version, ensure_change_triggers, get_generation
+from module import engine_client, metrics
+from module.cooldown import cooldown_until, ensure_cooldown_columns, get_cooldown_s
+from module.static_assets import STATIC_DIR, asset_url, data_uri, register_asset_routes
+from module.zone_groups import (
+    DEFAULT_NASLOV,
+    Grupe,
+    ensure_group_columns,
+    get_kiosk_postavke,
+    grupe_opis,
+    grupe_sql,
+    parse_grupe,
+)
 
 
 # ------------------ CONFIG ------------------
@@ -9,7 +36,20 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "data", "alarmni_sustav.db")
 PIN = int(4)  # broj znamenki PIN-a
 REFRESH_INTERVAL = 5  # sekunde između osvježavanja aktivnih alarma
+GEN_INTERVAL = 1  # sekunde između provjera generacije alarma (objava promjena)
+API_HUB_TTL = 60  # s koliko hub grupe bez kioska živi nakon zadnjeg API/SSE zahtjeva
+STORM_ON = 12  # storm mode: vidi storm_aktivan()
+STORM_OFF = 8
+STORM_RENDER_INTERVAL = 2  # sekunde: u storm modu najviše jedno crtanje po intervalu
 TIME_FMT = "%Y-%m-%d %H:%M:%S"
+INLINE_AUDIO = True  # mali zvuk (<= 16 kB) ugradi u stranicu kao data: URI
+DB_WORKERS = 2  # najviše istovremenih SQLite poziva izvan event loopa
+LAG_INTERVAL = 0.5  # sekunde između mjerenja kašnjenja event loopa
+LAG_WARN_MS = 250  # kašnjenje iznad kojeg se ispisuje upozorenje
+HEALTH_MAX_AGE = 3 * REFRESH_INTERVAL  # s bez uspješnog ciklusa -> /health vraća 503
+HEALTH_MAX_LAG_MS = 2000  # kašnjenje event loopa iznad kojeg kiosk nije zdrav
+SSE_HEARTBEAT = 15  # sekunde između keep-alive komentara u SSE streamu
+SSE_QUEUE = 100  # najviše neposlanih diffova po SSE potrošaču (sporiji se odspaja)
 
 #------------------ SOUND FILE ------------------
 def get_config_value(key: str, default=None):
@@ -25,52 +65,151 @@ def get_config_value(key: str, default=None):
         pass
     return default
 
-s_file = get_config_value("sound_file", os.path.join(BASE_DIR, "static", "alarm_3_short.wav"))
-SOUND_FILE=os.path.join(BASE_DIR, "static", s_file)
+DEFAULT_SOUND = os.path.join(BASE_DIR, "static", "alarm_3_short.wav")
+
+
+def get_sound_file() -> str:
+    """Putanja zvuka alarma iz comm['sound_file'] (mijenja se na stranici Ton alarma)."""
+    return os.path.join(BASE_DIR, "static", get_config_value("sound_file", DEFAULT_SOUND))
+
+
+SOUND_FILE = get_sound_file()  # početna vrijednost; hub dalje prati promjene
+
+
+# ------------------ STATIČKE DATOTEKE ------------------
+# /assets/<ime>.<hash>.<ext> s trajnim cacheom: tablet nakon reloada ili
+# reconnecta ne skida zvuk ponovno, pa prvi alarm ne čeka na mrežu.
+register_asset_routes(app)
+
+
+def sound_url(putanja: str) -> str:
+    """URL zvuka s otiskom ili izvorna putanja (Fully playSound ne prima data: URI)."""
+    if os.path.dirname(os.path.abspath(putanja)) == STATIC_DIR:
+        return asset_url(os.path.basename(putanja)) or putanja
+    return putanja
 
 
+def sound_src(putanja: str) -> str:
+    """Izvor za <audio>: data: URI za mali zvuk, inače isto što i sound_url."""
+    if INLINE_AUDIO and os.path.dirname(os.path.abspath(putanja)) == STATIC_DIR:
+        src = data_uri(os.path.basename(putanja))
+        if src:
+            return src
+    return sound_url(putanja)
+
+
+
+# ------------------ ASYNC PRISTUP BAZI ------------------
+# Sav blokirajući SQLite rad ide u mali ograničeni pool dretvi, tako da čekanje
+# na zaključanu bazu ne zaustavlja websocket, zvuk i sat ostalih tableta.
+_db_pool = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="kiosk-db")
+
+
+async def u_bazi(fn: Callable, *args, **kwargs):
+    """Izvrši blokirajuću funkciju baze u poolu i vrati rezultat (await)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_pool, partial(fn, *args, **kwargs))
+
+
+# ------------------ OSOBLJE (PIN CACHE) ------------------
+class OsobljeCache:
+    """Memorijski indeks aktivnog osoblja za provjeru PIN-a bez pristupa bazi.
+
+    PIN-ovi se čuvaju samo kao HMAC-SHA256 s nasumičnom solju procesa, u dictu
+    hash -> (id, ime). Indeks se ponovno učitava kad se promijeni generacija
+    tablice osoblje (comm['gen_osoblje'], održavaju je triggeri).
+    """
+
+    def __init__(self) -> None:
+        self._sol = secrets.token_bytes(16)
+        self._po_hashu: dict[str, tuple[int, str]] = {}
+        self._generacija: int | None = None
+
+    def _hash(self, pin: str) -> str:
+        return hmac.new(self._sol, pin.encode(), hashlib.sha256).hexdigest()
+
+    def ucitaj(self) -> None:
+        """Učitaj sve aktivne djelatnike i zapamti generaciju tablice."""
+        with sqlite3.connect(DB_PATH) as conn:
+            ensure_change_triggers(conn)
+            gen = get_generation(conn, "osoblje")
+            rows = conn.execute(
+                "SELECT id, ime, sifra FROM osoblje WHERE aktivna = 1"
+            ).fetchall()
+        self._po_hashu = {
+            self._hash(str(sifra)): (int(oid), ime)
+            for oid, ime, sifra in rows
+            if sifra is not None
+        }
+        self._generacija = gen
+
+    def osvjezi_ako_treba(self) -> bool:
+        """Jedan upit po primarnom ključu comm; ponovno učitaj ako se osoblje mijenjalo."""
+        with sqlite3.connect(DB_PATH) as conn:
+            gen = get_generation(conn, "osoblje")
+        if gen != self._generacija:
+            self.ucitaj()
+            return True
+        return False
+
+    def provjeri(self, pin: str) -> tuple[int, str] | None:
+        return self._po_hashu.get(self._hash(pin))
+
+
+osoblje_cache = OsobljeCache()
+
 
 # ------------------ BAZA ------------------
 def validiraj_osoblje(pin: str) -> tuple[int, str] | None:
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.cursor()
-        if len(pin) != PIN or not pin.isdigit():
-            return None
-        cur.execute(
-            """
-            SELECT id, ime FROM osoblje
-            WHERE sifra = ? AND aktivna = 1""",
-            (pin,),
-        )
-        return cur.fetchone()
+    """Vrati (id, ime) aktivnog djelatnika za PIN ili None (provjera iz memorije)."""
+    if len(pin) != PIN or not pin.isdigit():
+        return None
+    osoba = osoblje_cache.provjeri(pin)
+    if osoba is None:
+        # promašaj: djelatnik je možda upravo dodan, a poller još nije osvježio indeks
+        try:
+            if osoblje_cache.osvjezi_ako_treba():
+                osoba = osoblje_cache.provjeri(pin)
+        except sqlite3.Error as e:
+            print(f"[kiosk] Osvježavanje osoblja nije uspjelo: {e}")
+    return osoba
+
 
+def potvrdi_alarm(alarm_id: int, zone_id: int, osoblje_ime: str) -> tuple[bool, str | None]:
+    """Potvrdi alarm i resetiraj zonu u jednoj transakciji (compare-and-set na potvrda=0).
 
-def potvrdi_alarm(alarm_id: int, osoblje_ime: str) -> None:
-    """Stavi db.alarms.potvrda=1 za zadani alarm_id i zabilježi osoblje_ime i vrijemePotvrde."""
+    Vrati (True, osoblje_ime) ako je ovaj poziv potvrdio alarm, a (False, tko)
+    ako ga je netko već potvrdio; tada se zona ne dira.
+    """
+    now_txt = datetime.now().strftime(TIME_FMT)
     with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.execute(
             """
             UPDATE alarms SET
             potvrda = 1, osoblje = ?, vrijemePotvrde = ?
-            WHERE id = ?""",
-            (osoblje_ime, datetime.now().strftime(TIME_FMT), alarm_id),
+            WHERE id = ? AND potvrda = 0""",
+            (osoblje_ime, now_txt, alarm_id),
         )
-        conn.commit()
-
-
-def reset_zone_alarm(zone_id: int) -> None:
-    """Postavi db.zone.alarm_status=0 i last_updated=now() za zadani zone_id."""
-    with sqlite3.connect(DB_PATH) as conn:
+        if cur.rowcount != 1:
+            row = conn.execute("SELECT osoblje FROM alarms WHERE id = ?", (alarm_id,)).fetchone()
+            conn.rollback()
+            return False, (row[0] if row else None)
+        rok, rok_txt = cooldown_until(get_cooldown_s(conn))
         conn.execute(
             """
             UPDATE zone SET
                 alarm_status = 0,
-                last_updated = ?
+                last_updated = ?,
+                cooldown_until_epoch = ?,
+                cooldown_until = ?
             WHERE id = ?
             """,
-            (datetime.now().strftime(TIME_FMT), zone_id),
+            (now_txt, rok, rok_txt, zone_id),
         )
+        append_transitions(conn, [zone_id], 0, IZVOR_KIOSK)
         conn.commit()
+    return True, osoblje_ime
 
 
 def get_zadnji_potvrdjeni_alarm_korisnika(korisnik: str) -> dict | None:
@@ -94,21 +233,45 @@ def get_zadnji_potvrdjeni_alarm_korisnika(korisnik: str) -> dict | None:
         return None
 
 
-def get_aktivni_alarmi() -> list[dict]:
-    """isčitaj iz db.alarms sve aktivne (potvrda=0) i vrati ih kao listu dict-ova."""
+def get_aktivni_alarmi(grupe: Grupe = ()) -> list[dict]:
+    """isčitaj iz db.alarms sve aktivne (potvrda=0) i vrati ih kao listu dict-ova.
+
+    Uz grupe se čitaju samo alarmi zona tih grupa: CROSS JOIN drži zone kao
+    vanjsku petlju (indeks grupe, pa alarm po zone_id), pa cijena upita ovisi
+    o broju zona stanice, a ne o cijeloj ustanovi.
+    """
     with sqlite3.connect(DB_PATH) as conn:
         conn.row_factory = sqlite3.Row
-        rows = conn.execute(
+        if not grupe:
+            rows = conn.execute(
+                """
+                SELECT id, zone_id, zone_name, vrijeme, korisnik, soba
+                FROM alarms
+                WHERE potvrda = 0
+                ORDER BY vrijeme DESC
             """
-            SELECT id, zone_id, zone_name, vrijeme, korisnik, soba
-            FROM alarms
-            WHERE potvrda = 0
-            ORDER BY vrijeme DESC
-        """
-        ).fetchall()
+            ).fetchall()
+        else:
+            uvjet, params = grupe_sql(grupe)
+            rows = conn.execute(
+                f"""
+                SELECT a.id, a.zone_id, a.zone_name, a.vrijeme, a.korisnik, a.soba
+                FROM zone z
+                CROSS JOIN alarms a ON a.zone_id = z.id AND a.potvrda = 0
+                WHERE {uvjet}
+                ORDER BY a.vrijeme DESC
+            """,
+                params,
+            ).fetchall()
     return [dict(r) for r in rows]
 
 
+def get_gen_alarms() -> int:
+    """Generacija tablice alarms (raste sa svakom promjenom, bilo tko pisao)."""
+    with sqlite3.connect(DB_PATH) as conn:
+        return get_generation(conn, "alarms")
+
+
 def check_and_create_alarm_df(DB_PATH: str) -> None:
     """Očitaj sve zone iz db.zone i pripadajuće korisnike
     i za one koje su u alarm_status=1, a nemaju aktivan alarm u db.alarms
@@ -159,30 +322,287 @@ def check_and_create_alarm_df(DB_PATH: str) -> None:
         """, rows)
         conn.commit()
 
+# ------------------ DIJELJENI POLLER ------------------
+# generacije se dijele svim hubovima, pa ponovno kreirani hub ne ponavlja
+# brojeve koje je klijent već vidio (ETag, SSE id)
+_generacije = itertools.count(1)
+
+
+class AlarmHub:
+    """Jedan poller aktivnih alarma po grupi zona (cijela ustanova ili stanica).
+
+    Jednom po REFRESH_INTERVAL čita aktivne alarme svojih grupa, pa spojenim
+    klijentima tih grupa šalje razliku (dodani / uklonjeni). Opterećenje baze
+    ne ovisi o broju spojenih tableta, nego o broju različitih grupa.
+    """
+
+    def __init__(self, grupe: Grupe = ()) -> None:
+        self.grupe = grupe
+        self.alarmi: dict[int, dict] = {}  # id -> red, redom kao u upitu (vrijeme DESC)
+        self.generacija = 0
+        self.api_do = 0.0  # monotonic rok do kojeg hub drži API/SSE (bez kioska)
+        self.greska: str | None = None
+        self._pretplatnici: list[Callable[[dict], bool]] = []
+        self._poll_lock = asyncio.Lock()
+        self.gen_alarms: int | None = None  # comm['gen_alarms'] pri zadnjem čitanju
+        self.zvuk = sound_src(SOUND_FILE)  # izvor za <audio> svih klijenata
+        self.zvuk_url = sound_url(SOUND_FILE)  # isti zvuk kao URL za fully.playSound
+        self._zvuk_dv: int | None = None  # data_version baze pri zadnjem čitanju zvuka
+
+    def pretplati(self, fn: Callable[[dict], bool]) -> dict:
+        """Dodaj klijenta; vrati puno trenutačno stanje kao diff (sve je 'dodano')."""
+        self._pretplatnici.append(fn)
+        return self._diff(list(self.alarmi.values()), [])
+
+    def broj_klijenata(self) -> int:
+        return len(self._pretplatnici)
+
+    def _diff(self, dodani: list[dict], uklonjeni: list[int]) -> dict:
+        return {
+            "generacija": self.generacija,
+            "dodani": dodani,
+            "uklonjeni": uklonjeni,
+            "alarmi": list(self.alarmi.values()),
+            "greska": self.greska,
+            "zvuk": self.zvuk,
+            "zvuk_url": self.zvuk_url,
+        }
+
+    def _ucitaj(self) -> tuple[dict[int, dict], list[dict]]:
+        """Blokirajući dio ciklusa (izvodi se u poolu): vrati (novo stanje, dodani)."""
+        self._provjeri_zvuk()
+        self.gen_alarms = get_gen_alarms()
+        rows = get_aktivni_alarmi(self.grupe)
+        novi: dict[int, dict] = {}
+        dodani = []
+        for r in rows:
+            stari = self.alarmi.get(r["id"])
+            if stari is None:
+                # zadnja potvrda se čita jednom po alarmu, ne po klijentu
+                r["zadnji"] = get_zadnji_potvrdjeni_alarm_korisnika(r["korisnik"])
+                dodani.append(r)
+                novi[r["id"]] = r
+            else:
+                novi[r["id"]] = stari
+        return novi, dodani
+
+    def _provjeri_zvuk(self) -> None:
+        """Pročitaj comm['sound_file'] samo kad se baza promijenila (PRAGMA data_version)."""
+        dv = data_version(DB_PATH)
+        if dv == self._zvuk_dv:
+            return
+        self._zvuk_dv = dv
+        putanja = get_sound_file()
+        novi = sound_src(putanja)
+        if novi != self.zvuk:
+            print(f"[kiosk] Novi zvuk alarma: {get_config_value('sound_file')}")
+            self.zvuk = novi
+            self.zvuk_url = sound_url(putanja)
+
+    async def poll(self) -> None:
+        """Jedan ciklus: pročitaj aktivne alarme grupa i objavi razliku."""
+        async with self._poll_lock:
+            t0 = time.perf_counter()
+            try:
+                novi, dodani = await u_bazi(self._ucitaj)
+            except Exception as e:
+                if self.greska != str(e):
+                    self.generacija = next(_generacije)
+                self.greska = str(e)
+                zabiljezi_gresku("poll", e)
+                self._objavi(self._diff([], []))
+                return
+            finally:
+                zabiljezi_poll((time.perf_counter() - t0) * 1000)
+
+            metrike["zadnji_ciklus"] = time.time()
+            uklonjeni = [aid for aid in self.alarmi if aid not in novi]
+            self.alarmi = novi
+            if dodani or uklonjeni or self.greska is not None:
+                self.generacija = next(_generacije)
+            self.greska = None
+            # objavljuje se svaki ciklus (i prazan diff) da klijenti održe stanje zvuka
+            self._objavi(self._diff(dodani, uklonjeni))
+
+    def _objavi(self, diff: dict) -> None:
+        for fn in list(self._pretplatnici):
+            try:
+                ziv = fn(diff)
+            except Exception as e:
+                print(f"[kiosk] Greška kod primjene diffa: {e}")
+                ziv = True
+            if ziv is False:
+                self._pretplatnici.remove(fn)
+
+
+hub = AlarmHub()  # cijela ustanova (kiosk bez grupa)
+hubovi: dict[Grupe, AlarmHub] = {(): hub}
+
+
+def hub_za(grupe: Grupe) -> AlarmHub:
+    """Dijeljeni poller za zadane grupe (kreira se kod prvog kioska te grupe)."""
+    h = hubovi.get(grupe)
+    if h is None:
+        h = hubovi[grupe] = AlarmHub(grupe)
+        background_tasks.create(h.poll(), name="alarm_hub_grupe")  # ne čekaj petlju
+    return h
+
+# ------------------ METRIKE ------------------
+metrike: dict[str, float | str | None] = {
+    "zadnji_ciklus": 0.0,  # epoch zadnjeg uspješnog čitanja alarma
+    "zadnja_priprema": 0.0,  # epoch zadnjeg uspješnog _pripremi_ciklus (osoblje, alarmi bez enginea)
+    "zadnja_greska": None,  # "izvor: poruka" zadnje greške (baza, poller, UI)
+    "zadnja_greska_vrijeme": 0.0,
+    "broj_gresaka": 0,
+    "lock_cekanja": 0,  # greške "database is locked" (istekao busy_timeout)
+    "ui_odspojeni": 0,  # UI ažuriranja za već odspojene klijente (nisu greške)
+}
+log = logging.getLogger("kiosk")
+LAG_UZORAKA = 600  # ~5 min uz LAG_INTERVAL = 0.5 s
+lag_ms = metrics.Mjerenja(LAG_UZORAKA)  # kašnjenje event loopa
+poll_ms = metrics.Mjerenja()  # trajanje ciklusa pollera (uključivo čekanje na bazu)
+
+
+def zabiljezi_poll(ms: float) -> None:
+    poll_ms.dodaj(ms)
+
+
+def zabiljezi_gresku(izvor: str, e: BaseException) -> None:
+    """Zapamti grešku za /health (greške u pollerima i UI-ju se inače samo progutaju)."""
+    metrike["zadnja_greska"] = f"{izvor}: {e}"
+    metrike["zadnja_greska_vrijeme"] = time.time()
+    metrike["broj_gresaka"] += 1
+    if metrics.je_zakljucano(e):
+        metrike["lock_cekanja"] += 1
+
+
+async def _mjeri_kasnjenje() -> None:
+    """Mjeri koliko kasni buđenje iz sleep-a; to je vrijeme blokiranog event loopa."""
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lag = max(0.0, (time.perf_counter() - t0 - LAG_INTERVAL) * 1000)
+        lag_ms.dodaj(lag)
+        if lag > LAG_WARN_MS:
+            print(f"[kiosk] Event loop kasni {lag:.0f} ms")
+
+
+def _pripremi_ciklus() -> None:
+    """Zajednički dio ciklusa za sve grupe: osoblje i (bez enginea) kreiranje alarma."""
+    osoblje_cache.osvjezi_ako_treba()
+    if not engine_client.dostupan():
+        # bez enginea alarme kreira kiosk (stari način)
+        check_and_create_alarm_df(DB_PATH)
+
+
+async def _hub_petlja() -> None:
+    zapisano = 0.0
+    while True:
+        try:
+            await u_bazi(_pripremi_ciklus)
+            metrike["zadnja_priprema"] = time.time()
+        except Exception as e:
+            print(f"[kiosk] Priprema ciklusa nije uspjela: {e}")
+            zabiljezi_gresku("ciklus", e)
+        for grupe, h in list(hubovi.items()):
+            if grupe and not h.broj_klijenata() and h.api_do < time.monotonic():
+                del hubovi[grupe]  # nitko više ne prati te grupe
+                continue
+            await h.poll()
+        if time.monotonic() - zapisano >= metrics.METRIKE_INTERVAL:
+            zapisano = time.monotonic()
+            # detalji se skupljaju u petlji (Client.instances), zapis ide u pool
+            detalji = stanje_zdravlja()[1]
+            try:
+                await u_bazi(metrics.zapisi, "kiosk", detalji)
+            except OSError as e:
+                print(f"[kiosk] Metrike nisu zapisane: {e}")
+        # čekaj do REFRESH_INTERVAL, ali osvježi čim se alarmi promijene (engine, drugi kiosk)
+        for _ in range(int(REFRESH_INTERVAL // GEN_INTERVAL)):
+            await asyncio.sleep(GEN_INTERVAL)
+            try:
+                gen = await u_bazi(get_gen_alarms)
+            except sqlite3.Error:
+                break
+            if any(h.gen_alarms != gen for h in hubovi.values()):
+                break
+
+
+def _pripremi_bazu() -> None:
+    with sqlite3.connect(DB_PATH) as conn:
+        ensure_cooldown_columns(conn)
+        ensure_group_columns(conn)
+    osoblje_cache.ucitaj()
+
+
+async def _zagrij_osoblje() -> None:
+    try:
+        await u_bazi(_pripremi_bazu)
+    except sqlite3.Error as e:
+        print(f"[kiosk] Učitavanje osoblja nije uspjelo: {e}")
+
+
+app.on_startup(_zagrij_osoblje)
+app.on_startup(lambda: background_tasks.create(_hub_petlja(), name="alarm_hub"))
+app.on_startup(lambda: background_tasks.create(_mjeri_kasnjenje(), name="loop_lag"))
+app.on_shutdown(lambda: _db_pool.shutdown(wait=False))
+
 # ------------------ AUDIO KONTROLA ------------------
 
 
 def control_sound(action: str, sound_enabled: bool | None = None) -> bool | None:
     if action == "play":
-        ui.run_javascript("window.__playAlarmNow && window.__playAlarmNow();")
+        ui.run_javascript("window.kiosk && kiosk.play();")
     elif action == "pause":
-        ui.run_javascript("window.__stopAlarmNow && window.__stopAlarmNow();")
+        ui.run_javascript("window.kiosk && kiosk.stop();")
     elif action == "toggle":
         new_state = not sound_enabled
         if new_state:
-            ui.run_javascript("window.__playAlarmNow && window.__playAlarmNow();")
+            ui.run_javascript("window.kiosk && kiosk.play();")
             ui.notify("🔊 Zvuk uključen", type="warning")
         else:
-            ui.run_javascript("window.__stopAlarmNow && window.__stopAlarmNow();")
+            ui.run_javascript("window.kiosk && kiosk.stop();")
             ui.notify("🔇 Zvuk isključen", type="info")
         return new_state
     return sound_enabled
 
 
 # ------------------ UI KONTROLA ------------------
+async def potvrdi_s_pinom(pin: str, alarm_id: int, zone_id: int, update_callback=None) -> bool:
+    """Provjeri PIN, potvrdi alarm (engine ili izravno) i javi ishod. True ako je potvrđen."""
+    # pogodak u cacheu ne dira disk; promašaj se osvježava u poolu
+    osoblje = await u_bazi(validiraj_osoblje, pin)
+    if not osoblje:
+        ui.notify("❌ Neispravan PIN ili neaktivno osoblje!", type="negative")
+        return False
+
+    rez = await u_bazi(
+        engine_client.posalji,
+        {"cmd": "potvrdi", "alarm_id": alarm_id, "osoblje": osoblje[1], "izvor": IZVOR_KIOSK},
+    )
+    if rez is None:
+        # engine ne radi -> ista atomska potvrda izravno u bazi
+        pobjeda, tko = await u_bazi(potvrdi_alarm, alarm_id, zone_id, osoblje[1])
+    elif rez.get("ok"):
+        pobjeda, tko = rez["pobjeda"], rez.get("osoblje")
+    else:
+        ui.notify(f"Greška pri potvrdi: {rez.get('greska')}", type="negative")
+        return False
+
+    if pobjeda:
+        ui.notify(f"✔️ Alarm potvrđen od: {osoblje[1]}", type="positive")
+    else:
+        ui.notify(f"ℹ️ Alarm je već potvrdio/la: {tko or 'drugi uređaj'}", type="info")
+
+    # odmah osvježi sve tablete (i ovaj ako je izgubio utrku)
+    if update_callback:
+        await update_callback()
+    return True
+
 
 
-def prikazi_alarm(row: dict, container, update_callback) -> None:
+def prikazi_alarm(row: dict, container, update_callback) -> ui.expansion:
+    """Izgradi karticu jednog alarma u containeru i vrati njen korijenski element."""
     alarm_id = row["id"]
     zone_id = row["zone_id"]
     zone_name = row["zone_name"]
@@ -202,12 +622,15 @@ def prikazi_alarm(row: dict, container, update_callback) -> None:
                     "grid grid-cols-[1fr_1fr_3fr_3fr_2fr] sm:grid-cols-[1fr_1fr_1.5fr_1.5fr_1fr] w-full gap-3 px-3"
                 ):
                     ui.label(f"🕒 {t_hhmm}")
-                    ui.label(f"⏱️ {proteklo}")
+                    # klijentski skript (kiosk_tick) ga osvježava iz data-od svake sekunde
+                    ui.label(f"⏱️ {proteklo}").classes("js-proteklo").props(
+                        f"data-od={int(vrijeme.timestamp() * 1000)}"
+                    )
                     ui.label(f"🛏️ {soba}").classes("font-bold text-2xl")
                     ui.label(f"🧓 {korisnik}")
                     ui.label(f"🚨 {zone_name}")
 
-            zadnji = get_zadnji_potvrdjeni_alarm_korisnika(korisnik)
+            zadnji = row.get("zadnji")
             with ui.row().classes("items-end justify-around w-full gap-2 sm:gap-4"):
                 if zadnji:
                     try:
@@ -228,94 +651,99 @@ def prikazi_alarm(row: dict, container, update_callback) -> None:
                     )
                 )
 
-                def potvrdi_handler():
-                    pin = (pin_input.value or "").strip()
-                    osoblje = validiraj_osoblje(pin)
-                    if not osoblje:
-                        ui.notify(
-                            "❌ Neispravan PIN ili neaktivno osoblje!", type="negative"
-                        )
-                        return
-
-                    potvrdi_alarm(alarm_id, osoblje[1])
-                    reset_zone_alarm(zone_id)
-
-                    ui.notify(f"✔️ Alarm potvrđen od: {osoblje[1]}", type="positive")
-
-                    if update_callback:
-                        update_callback()
-
+                async def potvrdi_handler():
+                    await potvrdi_s_pinom(
+                        (pin_input.value or "").strip(), alarm_id, zone_id, update_callback
+                    )
 
                 ui.button("POTVRDI", on_click=potvrdi_handler).props(
                     "flat unelevated"
                 ).classes(
                     "bg-gray-800 rounded-lg sm:rounded-xl text-white hover:bg-gray-700 text-sm sm:text-base"
                 )
+    return exp
+
+
+# ------------------ STORM MODE ------------------
+STORM_STUPCI = [
+    {"name": "vrijeme", "label": "🕒", "field": "vrijeme", "align": "left"},
+    {"name": "soba", "label": "🛏️ Soba", "field": "soba", "align": "left"},
+    {"name": "korisnik", "label": "🧓 Korisnik", "field": "korisnik", "align": "left"},
+    {"name": "zone_name", "label": "🚨 Zona", "field": "zone_name", "align": "left"},
+]
+
+
+def storm_aktivan(broj: int, storm: bool) -> bool:
+    """Storm mode s histerezom: uključi se na STORM_ON ili više aktivnih alarma,
+    isključi tek kad ih je manje od STORM_OFF, pa prikaz ne titra oko praga."""
+    return broj >= STORM_OFF if storm else broj >= STORM_ON
+
+
+def storm_redovi(rows: list[dict]) -> list[dict]:
+    """Lagani redovi za virtualiziranu tablicu (bez kartica i PIN polja po alarmu)."""
+    return [
+        {
+            "id": r["id"],
+            "zone_id": r["zone_id"],
+            "vrijeme": r["vrijeme"][11:16],
+            "soba": r["soba"] or "N/A",
+            "korisnik": r["korisnik"] or "NEPOZNAT",
+            "zone_name": r["zone_name"],
+        }
+        for r in rows
+    ]
 
 
-# ------------------ MAIN PAGE ------------------
-@ui.page("/")
-def main_page():
-    # skriveni audio element (spreman za autoplay trik)
-    ui.audio(SOUND_FILE).props(
-        "id=alarm-audio loop controls=false preload=auto autoplay playsinline muted"
-    ).classes("hidden")
+def storm_sazetak(rows: list[dict]) -> str:
+    vremena = sorted(r["vrijeme"] for r in rows)
+    return (
+        f"🚨 {len(rows)} AKTIVNIH ALARMA · najstariji {vremena[0][11:16]}"
+        f" · najnoviji {vremena[-1][11:16]} · dodirnite red za potvrdu"
+    )
 
-    # JS helperi: prvo pokušaj preko Fully Kiosk API-ja (nema ograničenja),
-    # ako nije dostupan -> HTML5 audio s "muted autoplay -> unmute" trikom.
-    ui.run_javascript(
-        """
-    (function () {
-
-    function playHtml5() {
-        const a = document.getElementById('alarm-audio');
-        if (!a) return false;
-
-        try {
-        a.pause();              // očisti prethodno stanje
-        a.currentTime = 0;      // od početka
-        a.muted = true;         // start u muted modu (autoplay dopušten)
-        const p = a.play();
-
-        // kad krene svirati, odmah ga odmute-aj
-        const unmute = () => { try { a.muted = false; } catch(e) {} };
-        a.addEventListener('playing', unmute, { once: true });
-        // fallback ako 'playing' ne dođe dovoljno brzo
-        setTimeout(unmute, 80);
-
-        if (p && typeof p.catch === 'function') p.catch(()=>{});
-        return true;
-        } catch (e) {
-        return false;
-        }
-    }
 
-    window.__playAlarmNow = () => {
-        const a = document.getElementById('alarm-audio');
-        const src = a ? (a.currentSrc || a.src) : null;
+# ------------------ KLIJENTSKI JS ------------------
+# zvuk, sat i proteklo vrijeme žive u static/kiosk.js; skripta se učitava
+# s otiskom u URL-u pa je browser kešira, a stranica šalje samo podatke
+KIOSK_JS = asset_url("kiosk.js")
+if KIOSK_JS is None:  # bez skripte nema zvuka ni sata, pa kiosk ne smije tiho krenuti
+    raise RuntimeError(f"Nedostaje {os.path.join(STATIC_DIR, 'kiosk.js')}")
+ui.add_head_html(f'<script src="{KIOSK_JS}"></script>', shared=True)
 
-        // 1) Fully Kiosk Browser (svira bez ikakvog gesta)
-        if (typeof fully !== 'undefined' && fully.playSound && src) {
-        try { fully.playSound(src); return true; } catch (e) {}
-        }
 
-        // 2) HTML5 fallback s muted->unmute
-        return playHtml5();
-    };
+# ------------------ MAIN PAGE ------------------
+def kiosk_grupe(params) -> tuple[Grupe, str]:
+    """Grupe i naslov kioska: postavke uređaja (?kiosk=ime) pa parametri iz URL-a."""
+    postavke: dict[str, str] = {}
+    if params.get("kiosk"):
+        try:
+            with sqlite3.connect(DB_PATH) as conn:
+                postavke = get_kiosk_postavke(conn, params["kiosk"])
+        except sqlite3.Error as e:
+            print(f"[kiosk] Postavke uređaja nisu učitane: {e}")
+    postavke.update({k: v for k, v in params.items() if v})
+    grupe = parse_grupe(postavke)
+    return grupe, postavke.get("naslov") or grupe_opis(grupe) or DEFAULT_NASLOV
 
-    window.__stopAlarmNow = () => {
-        if (typeof fully !== 'undefined' && fully.stopSound) {
-        try { fully.stopSound(); } catch (e) {}
-        }
-        const a = document.getElementById('alarm-audio');
-        if (a) { try { a.pause(); } catch(e) {} }
-    };
 
-    })();
-    """
-    )
+@ui.page("/")
+def main_page(request: Request):
+    # grupe zona ovog kioska, npr. /?stanica=S1 ili /?kiosk=tablet-kat1 (postavke u comm)
+    grupe, naslov = kiosk_grupe(dict(request.query_params))
+    hub = hub_za(grupe)
+
+    # skriveni audio element (spreman za autoplay trik)
+    zvuk = hub.zvuk  # izvor koji ovaj klijent trenutačno ima
+    ui.audio(zvuk).props(
+        "id=alarm-audio loop controls=false preload=auto autoplay playsinline muted"
+    ).props(f"data-url={hub.zvuk_url}").classes("hidden")
 
-    last_alarm_ids: set[int] = set()
+    # sat i "⏱️ N min" tika preglednik (kiosk.js), pomak prema serverskom vremenu
+    ui.run_javascript(f"window.kiosk && kiosk.sat({int(time.time() * 1000)});")
+
+    client = ui.context.client
+    kartice: dict[int, ui.expansion] = {}  # alarm_id -> kartica (keyed rendering)
+    prazno: ui.card | None = None
     sound_paused_by_user = False  # Dodaj varijablu za praćenje pauze
     sound_playing = False
 
@@ -323,30 +751,24 @@ def main_page():
     def safe_ui(fn, *args, **kwargs):
         try:
             return fn(*args, **kwargs)
-        except (KeyError, RuntimeError):
-            # npr. 'Cannot update UI after disconnect' ili već očišćen client
+        except (KeyError, RuntimeError) as e:
+            # npr. 'Cannot update UI after disconnect' ili već očišćen client:
+            # redovito kod zatvaranja tableta, pa ne ide u greške za /health
+            metrike["ui_odspojeni"] += 1
+            log.debug("UI ažuriranje za odspojenog klijenta: %s", e)
             return
 
     # header
     with ui.row().classes(
         "max-w-full items-center justify-between w-full mb-3 text-white"
     ):
-        time_lbl = ui.label("").classes("bg-gray-800 rounded-lg px-3 py-1")
-
-        def _upd_time():
-            """Ažuriraj vrijeme u headeru."""
-            now = datetime.now()
-            safe_ui(
-                setattr,
-                time_lbl,
-                "text",
-                f"{now.strftime('%d.%m.%Y')} 🕒 {now.strftime('%H:%M')}",
-            )
-
-        _upd_time()
-        clock_timer = ui.timer(60, _upd_time)
+        # početna vrijednost sa servera, dalje je tika klijent (bez ui.timer po tabletu)
+        now = datetime.now()
+        ui.label(f"{now.strftime('%d.%m.%Y')} 🕒 {now.strftime('%H:%M')}").classes(
+            "js-sat bg-gray-800 rounded-lg px-3 py-1"
+        )
 
-        ui.label("🔔 AKTIVNI ALARMI - DOM BUZIN").classes(
+        ui.label(f"🔔 AKTIVNI ALARMI - {naslov}").classes(
             "bg-gray-800 rounded-lg px-3 py-1"
         )
 
@@ -362,13 +784,106 @@ def main_page():
         ).classes("bg-gray-800 rounded-lg text-white hover:bg-gray-700")
 
     container = ui.column().classes("w-full")
+
+    # storm mode: sažetak + virtualizirana tablica (crta samo redove u vidnom polju)
+    storm = False
+    storm_zadnje = 0.0  # monotonic vrijeme zadnjeg crtanja
+    storm_ceka = False  # zakazano je jedno odgođeno crtanje
+    storm_gen: int | None = None
+    zadnji_diff: dict | None = None
+    with ui.column().classes("w-full") as storm_box:
+        storm_lbl = ui.label("").classes(
+            "bg-red-900 text-white rounded-lg px-3 py-2 text-xl font-bold w-full"
+        )
+        storm_tbl = (
+            ui.table(columns=STORM_STUPCI, rows=[], row_key="id", pagination=0)
+            .props("virtual-scroll dense flat hide-pagination")
+            .classes("w-full text-lg")
+            .style("height: 75vh")
+        )
+    storm_box.set_visibility(False)
+
+    odabrani: dict = {}
+    with ui.dialog() as pin_dlg, ui.card():
+        pin_naslov = ui.label("").classes("text-lg font-bold")
+        pin_dlg_input = ui.input(label="PIN (4 znamenke)", password=True).props(
+            'type=number inputmode=numeric pattern="[0-9]*"'
+        )
+
+        async def potvrdi_iz_dijaloga():
+            if not odabrani:
+                return
+            pin = (pin_dlg_input.value or "").strip()
+            if await potvrdi_s_pinom(pin, odabrani["id"], odabrani["zone_id"], hub.poll):
+                pin_dlg.close()
+
+        with ui.row():
+            ui.button("POTVRDI", on_click=potvrdi_iz_dijaloga).props("flat unelevated").classes(
+                "bg-gray-800 rounded-lg text-white"
+            )
+            ui.button("ODUSTANI", on_click=pin_dlg.close).props("flat")
+
+    def otvori_pin(e):
+        row = e.args[1] if isinstance(e.args, list) and len(e.args) > 1 else None
+        if not row:
+            return
+        odabrani.clear()
+        odabrani.update(row)
+        pin_naslov.text = f"🛏️ {row['soba']} · 🧓 {row['korisnik']} · 🚨 {row['zone_name']}"
+        pin_dlg_input.value = ""
+        pin_dlg.open()
+
+    storm_tbl.on("rowClick", otvori_pin)
+
+    def storm_crtaj() -> None:
+        """Nacrtaj zadnje poznato stanje (najviše jednom po STORM_RENDER_INTERVAL)."""
+        nonlocal storm_zadnje, storm_ceka, storm_gen
+        storm_ceka = False
+        if not storm or zadnji_diff is None or client.id not in Client.instances:
+            return
+        storm_zadnje = time.monotonic()
+        if zadnji_diff["generacija"] == storm_gen:
+            return
+        storm_gen = zadnji_diff["generacija"]
+        rows = zadnji_diff["alarmi"]
+        with client:
+            storm_lbl.text = storm_sazetak(rows)
+            storm_tbl.rows = storm_redovi(rows)
+
+    def storm_zakazi() -> None:
+        nonlocal storm_ceka
+        ostalo = STORM_RENDER_INTERVAL - (time.monotonic() - storm_zadnje)
+        if ostalo <= 0:
+            storm_crtaj()
+        elif not storm_ceka:
+            storm_ceka = True
+            asyncio.get_running_loop().call_later(ostalo, storm_crtaj)
+
+    def storm_promijeni(ukljuci: bool) -> None:
+        nonlocal storm, prazno, storm_gen
+        storm = ukljuci
+        if ukljuci:
+            # kartice se uklanjaju jednom; dalje se ažurira samo tablica
+            for aid in list(kartice):
+                safe_ui(container.remove, kartice.pop(aid))
+            if prazno is not None:
+                safe_ui(container.remove, prazno)
+                prazno = None
+            ui.notify("🚨 Velik broj alarma – prikaz je sažet", type="warning")
+        else:
+            storm_tbl.rows = []
+            storm_gen = None
+        container.set_visibility(not ukljuci)
+        storm_box.set_visibility(ukljuci)
       
     def render_empty():
-        safe_ui(container.clear)
+        nonlocal prazno
+        if prazno is not None:
+            return
         with container:
             with ui.card().classes(
                 "flex items-center justify-center w-full mx-auto bg-black"
-            ):
+            ) as prazno:
                     ui.label(
                     "⚠️ PAŽNJA!\n\n"
                     "Ovaj uređaj je dio sustava za nadzor korisnika.\n"
@@ -380,56 +895,251 @@ def main_page():
                     "text-center text-green-900 whitespace-pre-line p-4 text-xl font-bold leading-loose"
                 )
 
-    def tick():
-        nonlocal last_alarm_ids, sound_playing,sound_paused_by_user
+    def uskladi_kartice(rows: list[dict]) -> bool:
+        """Keyed usklađivanje: makni samo nestale, dodaj samo nove kartice.
 
-        try:
-            check_and_create_alarm_df(DB_PATH)
-            rows = get_aktivni_alarmi()
-        except Exception as e:
-            safe_ui(lambda: ui.notify(f"Greška pri dohvaćanju alarma: {e}", type="warning"))
-            if sound_playing:
-                control_sound("pause")
-                sound_playing = False
-            return
+        Postojeće kartice (i PIN koji se u njih upisuje) se ne diraju. Vrati True
+        ako je došao barem jedan novi alarm.
+        """
+        nonlocal prazno
+        ids = {r["id"] for r in rows}
+        for aid in [a for a in kartice if a not in ids]:
+            safe_ui(container.remove, kartice.pop(aid))
+
+        if rows and prazno is not None:
+            safe_ui(container.remove, prazno)
+            prazno = None
+
+        novi_alarm = False
+        for pozicija, r in enumerate(rows):
+            if r["id"] in kartice:
+                continue
+            kartica = prikazi_alarm(r, container, hub.poll)
+            kartica.move(container, target_index=pozicija)
+            kartice[r["id"]] = kartica
+            novi_alarm = True
+        return novi_alarm
+
+    def primijeni(diff: dict) -> bool:
+        """Primijeni diff iz zajedničkog pollera; False ako klijent više ne postoji."""
+        nonlocal sound_playing, sound_paused_by_user, zvuk, zadnji_diff
+        if client.id not in Client.instances:
+            return False
+
+        with client:
+            if diff["zvuk"] != zvuk:
+                zvuk = diff["zvuk"]
+                ui.run_javascript(
+                    f"window.kiosk && kiosk.switchSound({json.dumps(zvuk)}, {json.dumps(diff['zvuk_url'])});"
+                )
 
-        # ako nema aktivnih alarma
-        if not rows:
-            safe_ui(container.clear)
-            render_empty()
-            if sound_playing:
-                control_sound("pause")
-                sound_playing = False
-            last_alarm_ids = set()
-            sound_paused_by_user = False  # resetiraj kad nema alarma
-            return
+            if diff["greska"]:
+                safe_ui(lambda: ui.notify(f"Greška pri dohvaćanju alarma: {diff['greska']}", type="warning"))
+                if sound_playing:
+                    control_sound("pause")
+                    sound_playing = False
+                return True
+
+            rows = diff["alarmi"]
+            if storm != storm_aktivan(len(rows), storm):
+                storm_promijeni(not storm)
+
+            if storm:
+                zadnji_diff = diff
+                storm_zakazi()
+                # zvuk jednom: ne pokreće se ponovno za svaki novi alarm u oluji
+                if not sound_paused_by_user and not sound_playing:
+                    control_sound("play")
+                    sound_playing = True
+                return True
+
+            novi_alarm = uskladi_kartice(rows)
+
+            # ako nema aktivnih alarma
+            if not rows:
+                render_empty()
+                if sound_playing:
+                    control_sound("pause")
+                    sound_playing = False
+                sound_paused_by_user = False  # resetiraj kad nema alarma
+                return True
+
+            # ima aktivnih alarma
+            if novi_alarm:
+                sound_paused_by_user = False  # resetiraj pauzu SAMO ako je došao novi alarm
+
+            if not sound_paused_by_user:
+                control_sound("play")
+                sound_playing = True
+            else:
+                if sound_playing:
+                    control_sound("pause")
+                    sound_playing = False
+        return True
+
+    def pretplati():
+        nonlocal hub
+        hub = hub_za(grupe)  # petlja je u međuvremenu mogla ukloniti hub bez klijenata
+        primijeni(hub.pretplati(primijeni))
+
+    # inicijalno stanje nakon 1 sekunde, dalje samo diffovi pollera grupe
+    ui.timer(1, pretplati, once=True)
+
+
+
+# ------------------ HTTP API ------------------
+# Zidni displeji, pager bridge i nadzor prate alarme bez NiceGUI sesije.
+# Filtar grupa je isti kao za kiosk (?stanica=S1, ?kiosk=ime).
+API_EPOHA = secrets.token_hex(4)  # generacije kreću ispočetka nakon restarta
+API_POLJA = ("id", "zone_id", "zone_name", "vrijeme", "korisnik", "soba")
+
+
+def _api_alarm(r: dict) -> dict:
+    return {k: r.get(k) for k in API_POLJA}
+
+
+def _api_etag(h: AlarmHub) -> str:
+    grupe = hashlib.sha1(repr(h.grupe).encode()).hexdigest()[:8]
+    return f'"{API_EPOHA}-{grupe}-{h.generacija}"'
+
+
+async def _api_hub(request: Request) -> AlarmHub:
+    grupe, _ = await u_bazi(kiosk_grupe, dict(request.query_params))
+    novi = grupe not in hubovi
+    h = hub_za(grupe)
+    h.api_do = time.monotonic() + API_HUB_TTL  # petlja ga ne briše dok ga API koristi
+    if novi:
+        await h.poll()  # prvi upit za ove grupe, inače bi odgovor bio prazan
+    return h
+
+
+@app.get("/api/alarms/active")
+async def api_aktivni_alarmi(request: Request) -> Response:
+    """Aktivni alarmi kao JSON; ETag je generacija pa nepromijenjeno stanje vraća 304."""
+    h = await _api_hub(request)
+    etag = _api_etag(h)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(
+        {
+            "generacija": h.generacija,
+            "alarmi": [_api_alarm(r) for r in h.alarmi.values()],
+            "greska": h.greska,
+        },
+        headers=headers,
+    )
 
-        # ima aktivnih alarma
 
-        current_ids = {r["id"] for r in rows}
-        novi_alarm = not current_ids.issubset(last_alarm_ids)  # True ako postoji novi alarm
+def _sse(dogadjaj: str, generacija: int, podaci: dict) -> str:
+    return f"id: {generacija}\nevent: {dogadjaj}\ndata: {json.dumps(podaci, ensure_ascii=False)}\n\n"
 
-        if current_ids != last_alarm_ids:
-            safe_ui(container.clear)
-            for r in rows:
-                prikazi_alarm(r, container, tick)
-            last_alarm_ids = current_ids
-            if novi_alarm:
-                sound_paused_by_user = False  # resetiraj pauzu SAMO ako je došao novi alarm  # resetiraj pauzu kad dođe novi alarm
 
+@app.get("/api/alarms/stream")
+async def api_stream_alarma(request: Request) -> StreamingResponse:
+    """Server-sent events: 'stanje' (puno stanje) pri spajanju, zatim 'diff' pri svakoj promjeni."""
+    h = await _api_hub(request)
+    red: asyncio.Queue[dict] = asyncio.Queue(maxsize=SSE_QUEUE)
+    zatvoren = False
+
+    def primi(diff: dict) -> bool:
+        nonlocal zatvoren
+        if zatvoren:
+            return False
+        if not (diff["dodani"] or diff["uklonjeni"] or diff["greska"]):
+            return True  # prazan ciklus pollera, potrošaču ne treba
+        try:
+            red.put_nowait(diff)
+        except asyncio.QueueFull:
+            print("[kiosk] SSE potrošač ne stiže čitati, odspajam ga")
+            zatvoren = True
+            return False
+        return True
+
+    async def tok():
+        nonlocal zatvoren
+        pocetno = h.pretplati(primi)
+        try:
+            yield _sse(
+                "stanje",
+                pocetno["generacija"],
+                {"alarmi": [_api_alarm(r) for r in pocetno["alarmi"]], "greska": pocetno["greska"]},
+            )
+            while not zatvoren and not await request.is_disconnected():
+                try:
+                    diff = await asyncio.wait_for(red.get(), SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield _sse(
+                    "diff",
+                    diff["generacija"],
+                    {
+                        "dodani": [_api_alarm(r) for r in diff["dodani"]],
+                        "uklonjeni": diff["uklonjeni"],
+                        "greska": diff["greska"],
+                    },
+                )
+        finally:
+            zatvoren = True
+
+    return StreamingResponse(
+        tok(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ------------------ HEALTH ------------------
+def stanje_zdravlja() -> tuple[bool, dict]:
+    """(zdrav, detalji) za watchdog: svježina ciklusa, trajanje, lag, klijenti, greške."""
+    sad = time.time()
+    zadnji = metrike["zadnji_ciklus"] or 0.0
+    starost = round(sad - zadnji, 1) if zadnji else None
+    razlozi = []
+    if starost is None or starost > HEALTH_MAX_AGE:
+        razlozi.append("nema uspješnog ciklusa")
+    priprema = metrike["zadnja_priprema"] or 0.0
+    priprema_starost = round(sad - priprema, 1) if priprema else None
+    if priprema_starost is None or priprema_starost > HEALTH_MAX_AGE:
+        razlozi.append("priprema ciklusa ne uspijeva")
+    if lag_ms.zadnje > HEALTH_MAX_LAG_MS:
+        razlozi.append("event loop blokiran")
+    return not razlozi, {
+        "status": "ok" if not razlozi else "greska",
+        "razlozi": razlozi,
+        "zadnji_ciklus_prije_s": starost,
+        "zadnja_priprema_prije_s": priprema_starost,
+        "ciklus_ms": poll_ms.sazetak(),
+        "lag_ms": lag_ms.sazetak(),
+        "klijenti": len(Client.instances),
+        "pretplatnici": sum(h.broj_klijenata() for h in hubovi.values()),
+        "zadnja_greska": metrike["zadnja_greska"],
+        "zadnja_greska_prije_s": (
+            round(sad - metrike["zadnja_greska_vrijeme"], 1)
+            if metrike["zadnja_greska_vrijeme"]
+            else None
+        ),
+        "broj_gresaka": metrike["broj_gresaka"],
+        "lock_cekanja": metrike["lock_cekanja"],
+        "ui_odspojeni": metrike["ui_odspojeni"],
+        "generacija": hub.generacija,
+        "gen_alarms": hub.gen_alarms,
+    }
 
-        if current_ids and not sound_paused_by_user:
-            control_sound("play")
-            sound_playing = True
-        else:
-            if sound_playing:
-                control_sound("pause")
-                sound_playing = False
 
+@app.get("/health")
+async def health() -> JSONResponse:
+    """Liveness: 200 dok ciklus teče i loop nije blokiran, inače 503 (watchdog restarta kiosk)."""
+    zdrav, detalji = stanje_zdravlja()
+    return JSONResponse(detalji, status_code=200 if zdrav else 503, headers={"Cache-Control": "no-store"})
 
-    ui.timer(REFRESH_INTERVAL, tick)
-    ui.timer(1, tick, once=True)  # inicijalni tick nakon 1 sekunde
 
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness: 200 tek nakon prvog uspješnog čitanja alarma."""
+    spreman = bool(metrike["zadnji_ciklus"])
+    return JSONResponse({"spreman": spreman}, status_code=200 if spreman else 503, headers={"Cache-Control": "no-store"})
 
 
 # ------------------ MOBILE CSS FIXES ------------------
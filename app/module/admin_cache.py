@@ -0,0 +1,53 @@
+import sqlite3
+
+import pandas as pd
+import streamlit as st
+
+from module.config import DB_PATH
+from module.db_changes import PRACENE_TABLICE, data_version, get_generation
+
+# ------------------ CACHE ČITANJA ZA ADMIN STRANICE ------------------
+# Rezultat upita se pamti pod ključem (upit, parametri, verzija baze). Verzija
+# je brojač promjena pa je cache uvijek točan: svaki commit bilo koje druge
+# konekcije (admin stranice, scanner, kiosk) daje novu verziju i novo čitanje.
+CACHE_MAX = 256  # najviše zapamćenih rezultata (svi upiti i verzije zajedno)
+
+
+@st.cache_data(max_entries=CACHE_MAX, show_spinner=False)
+def _procitaj(sql: str, params: tuple, db_path: str, verzija: tuple) -> pd.DataFrame:
+    with sqlite3.connect(db_path) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def _verzija(db_path: str, tablice: tuple[str, ...]) -> tuple:
+    """Ključ verzije: generacije praćenih tablica ili data_version cijele baze.
+
+    Generacije (triggeri iz db_changes) ne mijenja scanner koji piše u zone,
+    pa npr. popis osoblja ostaje u cacheu dok scanner radi. Bez triggera
+    vrijedi samo data_version.
+    """
+    if tablice and set(tablice) <= set(PRACENE_TABLICE):
+        imena = [f"trg_gen_{t}_{op}" for t in tablice for op in ("insert", "update", "delete")]
+        with sqlite3.connect(db_path) as conn:
+            ima = conn.execute(
+                f"SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN ({', '.join('?' * len(imena))})",
+                imena,
+            ).fetchone()[0]
+            if ima == len(imena):
+                return ("gen",) + tuple(get_generation(conn, t) for t in tablice)
+    return ("dv", data_version(db_path))
+
+
+def cached_query(
+    sql: str,
+    params: tuple = (),
+    tablice: tuple[str, ...] = (),
+    db_path: str = DB_PATH,
+) -> pd.DataFrame:
+    """SELECT kao DataFrame iz cachea; ponovno se čita samo kad se baza promijenila.
+
+    tablice: ako upit čita samo tablice s generacijom (osoblje, alarms), cache
+    ovisi samo o njihovim promjenama.
+    """
+    return _procitaj(sql, tuple(params), db_path, _verzija(db_path, tuple(tablice)))
+
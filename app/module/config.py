@@ -19,6 +19,9 @@ REQUIRED_TABLES = {
         "last_alarm_time",
         "cooldown_until_epoch",
         "cooldown_until",
+        "krilo",
+        "kat",
+        "stanica",
     },
     "alarms": {
         "id",
@@ -30,6 +33,7 @@ REQUIRED_TABLES = {
         "korisnik",
         "soba",
         "osoblje",
+        "ponavljanja",
     },
     "comm": {"key", "value"},
 }
@@ -55,6 +59,10 @@ TYPE_MAP = {
     "value": "INTEGER DEFAULT 0",
     "cooldown_until_epoch": "INTEGER DEFAULT 0",
     "cooldown_until": "TEXT DEFAULT NULL",
+    "ponavljanja": "INTEGER DEFAULT 0",
+    "krilo": "TEXT DEFAULT NULL",
+    "kat": "TEXT DEFAULT NULL",
+    "stanica": "TEXT DEFAULT NULL",
 }
 
 
@@ -107,7 +115,10 @@ def ensure_table(conn: sqlite3.Connection, name: str) -> bool:
                 alarm_status INTEGER DEFAULT 0,
                 last_updated TEXT DEFAULT NULL,
                 last_alarm_time TEXT DEFAULT NULL,
-                cooldown_until_epoch INTEGER DEFAULT 0
+                cooldown_until_epoch INTEGER DEFAULT 0,
+                krilo TEXT DEFAULT NULL,
+                kat TEXT DEFAULT NULL,
+                stanica TEXT DEFAULT NULL
             )
         """
         )
@@ -124,7 +135,8 @@ def ensure_table(conn: sqlite3.Connection, name: str) -> bool:
                 vrijemePotvrde TEXT,
                 korisnik TEXT,
                 soba TEXT,
-                osoblje TEXT
+                osoblje TEXT,
+                ponavljanja INTEGER DEFAULT 0
             )
         """
         )
@@ -0,0 +1,105 @@
+import heapq
+import sqlite3
+import time
+from datetime import datetime
+
+from module.config import TIME_FMT, TYPE_MAP, table_info
+
+# ------------------ POSTAVKE ------------------
+COOLDOWN_S = 60  # sekunde nakon potvrde u kojima se ponovne aktivacije zone ne alarmiraju
+COOLDOWN_KEY = "cooldown_s"  # comm ključ za promjenu trajanja bez izmjene koda
+
+# kolone koje cooldown koristi (na starijim bazama se dodaju pri pokretanju)
+COOLDOWN_KOLONE = {
+    "zone": ("cooldown_until_epoch", "cooldown_until"),
+    "alarms": ("ponavljanja",),
+}
+
+
+def ensure_cooldown_columns(conn: sqlite3.Connection) -> list[str]:
+    """Dodaj nedostajuće cooldown kolone. Vrati popis dodanih ('tablica.kolona')."""
+    dodane = []
+    for tablica, kolone in COOLDOWN_KOLONE.items():
+        postojece = table_info(conn, tablica)
+        if not postojece:
+            continue
+        for kol in kolone:
+            if kol not in postojece:
+                conn.execute(f"ALTER TABLE {tablica} ADD COLUMN {kol} {TYPE_MAP[kol]}")
+                dodane.append(f"{tablica}.{kol}")
+    if dodane:
+        conn.commit()
+    return dodane
+
+
+def get_cooldown_s(conn: sqlite3.Connection) -> int:
+    """Trajanje cooldowna iz comm['cooldown_s'] ili COOLDOWN_S."""
+    row = conn.execute("SELECT value FROM comm WHERE key = ?", (COOLDOWN_KEY,)).fetchone()
+    try:
+        return max(0, int(row[0])) if row and row[0] not in (None, "") else COOLDOWN_S
+    except (TypeError, ValueError):
+        return COOLDOWN_S
+
+
+def cooldown_until(trajanje: int, sad: float | None = None) -> tuple[int, str]:
+    """Rok hlađenja kao (epoch, tekst) za kolone cooldown_until_epoch / cooldown_until."""
+    rok = int(time.time() if sad is None else sad) + int(trajanje)
+    return rok, datetime.fromtimestamp(rok).strftime(TIME_FMT)
+
+
+# ------------------ PRAĆENJE ROKOVA ------------------
+class CooldownTracker:
+    """Rokovi hlađenja zona u min-heapu.
+
+    Zastarjeli unosi (zona dobila novi rok) se ne brišu iz heapa nego preskaču
+    pri čitanju, pa su i početak i istek O(log n). Potisnute aktivacije se
+    broje po zoni dok rok ne istekne.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[int, int]] = []
+        self.rok: dict[int, int] = {}  # zone_id -> epoch isteka
+        self.potisnuto: dict[int, int] = {}  # zone_id -> broj potisnutih aktivacija
+
+    def zapocni(self, zone_id: int, do_epoch: int) -> None:
+        if self.rok.get(zone_id) == do_epoch:
+            return
+        self.rok[zone_id] = do_epoch
+        self.potisnuto.pop(zone_id, None)
+        heapq.heappush(self._heap, (do_epoch, zone_id))
+
+    def aktivan(self, zone_id: int, sad: float | None = None) -> bool:
+        sad = time.time() if sad is None else sad
+        return self.rok.get(zone_id, 0) > sad
+
+    def potisni(self, zone_id: int) -> None:
+        self.potisnuto[zone_id] = self.potisnuto.get(zone_id, 0) + 1
+
+    def _ocisti_vrh(self) -> None:
+        while self._heap and self.rok.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def sljedeci_rok(self) -> int | None:
+        """Epoch najbližeg isteka ili None ako nema aktivnih rokova."""
+        self._ocisti_vrh()
+        return self._heap[0][0] if self._heap else None
+
+    def istekli(self, sad: float | None = None) -> list[tuple[int, int]]:
+        """Skini sve istekle rokove; vrati [(zone_id, broj potisnutih aktivacija)]."""
+        sad = time.time() if sad is None else sad
+        rez = []
+        while True:
+            self._ocisti_vrh()
+            if not self._heap or self._heap[0][0] > sad:
+                return rez
+            _, zid = heapq.heappop(self._heap)
+            del self.rok[zid]
+            rez.append((zid, self.potisnuto.pop(zid, 0)))
+
+    def snimka(self) -> tuple:
+        """Kopija stanja za vraćanje ako transakcija koja ga je mijenjala ne uspije."""
+        return list(self._heap), dict(self.rok), dict(self.potisnuto)
+
+    def vrati(self, snimka: tuple) -> None:
+        heap, rok, potisnuto = snimka
+        self._heap, self.rok, self.potisnuto = list(heap), dict(rok), dict(potisnuto)
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import threading
+
+from module.config import DB_PATH
+
+# Trajne konekcije samo za čitanje brojača promjena (po putanji baze).
+_conns: dict[str, tuple[int, sqlite3.Connection]] = {}
+_epohe: dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def data_version(db_path: str = DB_PATH) -> int:
+    """Vrati brojač promjena baze (PRAGMA data_version s trajne konekcije).
+
+    Vrijednost se mijenja čim bilo koja druga konekcija (bilo koji proces)
+    commita promjenu. Ako baza ne postoji vraća -1. Ako je datoteka baze
+    zamijenjena (npr. vraćen backup), konekcija se otvara ponovno, a gornji
+    bitovi rezultata se povećavaju da brojač ne bi ponovio staru vrijednost.
+    """
+    try:
+        ino = os.stat(db_path).st_ino
+    except OSError:
+        return -1
+
+    with _lock:
+        postojeca = _conns.get(db_path)
+        if postojeca is None or postojeca[0] != ino:
+            if postojeca is not None:
+                postojeca[1].close()
+                _epohe[db_path] = _epohe.get(db_path, 0) + 1
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            _conns[db_path] = (ino, conn)
+        conn = _conns[db_path][1]
+        dv = int(conn.execute("PRAGMA data_version").fetchone()[0])
+    return (_epohe.get(db_path, 0) << 32) | dv
+
+
+# ------------------ GENERACIJE PO TABLICI ------------------
+# Triggeri povećavaju comm['gen_<tablica>'] pri svakoj promjeni tablice,
+# bez obzira tko piše (admin stranice, simulatori, kiosk).
+PRACENE_TABLICE = ("osoblje", "alarms")
+
+
+def ensure_change_triggers(
+    conn: sqlite3.Connection, tablice: tuple[str, ...] = PRACENE_TABLICE
+) -> list[str]:
+    """Kreira triggere brojača promjena za zadane tablice. Vrati imena kreiranih."""
+    postojeci = {
+        r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger'")
+    }
+    kreirani = []
+    for t in tablice:
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            ime = f"trg_gen_{t}_{op.lower()}"
+            if ime in postojeci:
+                continue
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {ime} AFTER {op} ON {t}
+                BEGIN
+                    INSERT INTO comm(key, value) VALUES('gen_{t}', 1)
+                    ON CONFLICT(key) DO UPDATE SET value = value + 1;
+                END
+            """
+            )
+            kreirani.append(ime)
+    if kreirani:
+        conn.commit()
+    return kreirani
+
+
+def get_generation(conn: sqlite3.Connection, tablica: str) -> int:
+    """Vrati generaciju tablice iz comm (0 ako još nije bilo promjena)."""
+    row = conn.execute(
+        "SELECT value FROM comm WHERE key = ?", (f"gen_{tablica}",)
+    ).fetchone()
+    return int(row[0]) if row and row[0] is not None else 0
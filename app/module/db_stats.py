@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import threading
+
+from module.config import DB_PATH
+from module.db_changes import data_version
+
+# Statistika se računa jednim prolazom kroz dbstat (bez COUNT(*) po tablici)
+# i čuva dok se brojač promjena baze ne promijeni.
+_CACHE: dict[str, tuple[int, dict]] = {}
+_lock = threading.Lock()
+
+SQL_DBSTAT = """
+    SELECT name,
+           COUNT(*) AS stranice,
+           SUM(pgsize) AS bajtovi,
+           SUM(unused) AS neiskoristeno,
+           SUM(CASE WHEN pagetype = 'leaf' THEN ncell ELSE 0 END) AS celije_list,
+           SUM(CASE WHEN pagetype <> 'overflow' THEN ncell ELSE 0 END) AS celije_sve,
+           SUM(CASE WHEN prev IS NOT NULL AND pageno <> prev + 1 THEN 1 ELSE 0 END) AS skokovi
+    FROM (
+        SELECT name, pagetype, ncell, unused, pgsize, pageno,
+               LAG(pageno) OVER (PARTITION BY name ORDER BY path) AS prev
+        FROM dbstat
+    )
+    GROUP BY name
+"""
+
+
+def _read_stat1(conn: sqlite3.Connection) -> dict[str, str]:
+    """Vrati {ime indeksa ili tablice: stat} iz sqlite_stat1 (prazno ako nema ANALYZE)."""
+    try:
+        rows = conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {(idx or tbl): stat for tbl, idx, stat in rows}
+
+
+def _stat1_rows(stat: str | None) -> int | None:
+    """Prvi broj u sqlite_stat1.stat je procijenjeni broj redaka."""
+    if not stat:
+        return None
+    try:
+        return int(stat.split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def _collect(db_path: str) -> dict:
+    """Prikupi statistiku stranica/bajtova za sve tablice i indekse."""
+    with sqlite3.connect(db_path) as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        objekti = conn.execute(
+            """
+            SELECT name, type, tbl_name FROM sqlite_master
+            WHERE type IN ('table', 'index')
+            ORDER BY tbl_name, type DESC, name
+            """
+        ).fetchall()
+        stat1 = _read_stat1(conn)
+        try:
+            dbstat = {r[0]: r[1:] for r in conn.execute(SQL_DBSTAT).fetchall()}
+            ima_dbstat = True
+        except sqlite3.OperationalError:
+            # SQLite bez SQLITE_ENABLE_DBSTAT_VTAB -> samo procjene iz sqlite_stat1
+            dbstat, ima_dbstat = {}, False
+
+    rows = []
+    for name, tip, tablica in objekti:
+        d = dbstat.get(name)
+        procjena = _stat1_rows(stat1.get(name))
+        if d:
+            stranice, bajtovi, neisk, cel_list, cel_sve, skokovi = d
+            zapisa = cel_list if tip == "table" else cel_sve
+            rows.append(
+                {
+                    "naziv": name,
+                    "tip": "tablica" if tip == "table" else "indeks",
+                    "tablica": tablica,
+                    "zapisa": int(zapisa or 0),
+                    "procjena_stat1": procjena,
+                    "stranice": int(stranice),
+                    "bajtovi": int(bajtovi or 0),
+                    "neiskoristeno_pct": round(100.0 * (neisk or 0) / bajtovi, 1) if bajtovi else 0.0,
+                    "fragmentacija_pct": round(100.0 * (skokovi or 0) / stranice, 1) if stranice > 1 else 0.0,
+                }
+            )
+        else:
+            # bez dbstat (ili virtualna/prazna tablica bez stranica)
+            rows.append(
+                {
+                    "naziv": name,
+                    "tip": "tablica" if tip == "table" else "indeks",
+                    "tablica": tablica,
+                    "zapisa": procjena,
+                    "procjena_stat1": procjena,
+                    "stranice": None,
+                    "bajtovi": None,
+                    "neiskoristeno_pct": None,
+                    "fragmentacija_pct": None,
+                }
+            )
+
+    tablice = {}
+    for r in rows:
+        t = tablice.setdefault(
+            r["tablica"],
+            {"tablica": r["tablica"], "zapisa": None, "bajtovi_tablica": 0, "bajtovi_indeksi": 0, "broj_indeksa": 0},
+        )
+        if r["tip"] == "tablica":
+            t["zapisa"] = r["zapisa"]
+            t["bajtovi_tablica"] += r["bajtovi"] or 0
+        else:
+            t["broj_indeksa"] += 1
+            t["bajtovi_indeksi"] += r["bajtovi"] or 0
+    for t in tablice.values():
+        t["bajtovi_ukupno"] = t["bajtovi_tablica"] + t["bajtovi_indeksi"]
+
+    wal_path = db_path + "-wal"
+    return {
+        "page_size": int(page_size),
+        "page_count": int(page_count),
+        "freelist_count": int(freelist),
+        "file_bytes": os.path.getsize(db_path),
+        "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+        "dbstat": ima_dbstat,
+        "objekti": rows,
+        "tablice": sorted(tablice.values(), key=lambda t: t["bajtovi_ukupno"], reverse=True),
+    }
+
+
+def get_db_stats(db_path: str = DB_PATH) -> dict | None:
+    """Vrati statistiku baze (stranice, bajtovi, zapisi, indeksi, fragmentacija).
+
+    Rezultat se čuva u memoriji procesa i ponovno računa tek kad se promijeni
+    brojač promjena baze (PRAGMA data_version). Vrati None ako baza ne postoji.
+    """
+    verzija = data_version(db_path)
+    if verzija < 0:
+        return None
+    with _lock:
+        cached = _CACHE.get(db_path)
+        if cached and cached[0] == verzija:
+            return cached[1]
+        stats = _collect(db_path)
+        _CACHE[db_path] = (verzija, stats)
+        return stats
+
+
+def get_row_count(table_name: str, db_path: str = DB_PATH) -> int:
+    """Broj zapisa tablice iz keširane statistike.
+
+    Kad dbstat/sqlite_stat1 nemaju broj za tablicu, broji se COUNT(*);
+    0 samo ako baza ili tablica ne postoje.
+    """
+    stats = get_db_stats(db_path)
+    if not stats:
+        return 0
+    for r in stats["objekti"]:
+        if r["naziv"] == table_name and r["tip"] == "tablica":
+            if r["zapisa"] is not None:
+                return int(r["zapisa"])
+            with sqlite3.connect(db_path) as conn:
+                return int(conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0])
+    return 0
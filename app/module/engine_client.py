@@ -0,0 +1,111 @@
+import os
+import secrets
+import threading
+import time
+from multiprocessing.connection import Client, Connection
+
+from module.config import DB_PATH
+
+# ------------------ ADRESA ENGINEA ------------------
+ENGINE_ADDRESS = ("127.0.0.1", 6070)
+ENGINE_KEY_PATH = os.path.join(os.path.dirname(DB_PATH), "engine.key")
+ENGINE_ROK = 5.0  # s koliko naredba smije čekati u redu enginea; starija se odbacuje
+ENGINE_COMMIT_BUDGET = 5.0  # s za transakciju (busy_timeout enginea)
+# klijent čeka dulje od enginea: nakon isteka engine naredbu više ne primjenjuje
+ENGINE_TIMEOUT = ENGINE_ROK + ENGINE_COMMIT_BUDGET + 1.0
+ENGINE_RETRY = 5.0  # sekunde prije novog pokušaja spajanja nakon neuspjeha
+
+_conn: Connection | None = None
+_nedostupan_do = 0.0
+_lock = threading.Lock()
+
+
+def engine_authkey() -> bytes:
+    """Zajednički ključ enginea i klijenata (data/engine.key, kreira se jednom)."""
+    try:
+        with open(ENGINE_KEY_PATH, "rb") as f:
+            key = f.read()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(ENGINE_KEY_PATH), exist_ok=True)
+    key = secrets.token_bytes(32)
+    try:
+        fd = os.open(ENGINE_KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # drugi proces (engine/kiosk pri podizanju) je upravo kreirao ključ
+        return _procitaj_tudji_kljuc()
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def _procitaj_tudji_kljuc(pokusaja: int = 50) -> bytes:
+    """Pričekaj da drugi proces dopiše ključ koji je kreirao (O_EXCL pobjednik)."""
+    for _ in range(pokusaja):
+        with open(ENGINE_KEY_PATH, "rb") as f:
+            key = f.read()
+        if len(key) == 32:
+            return key
+        time.sleep(0.02)
+    raise RuntimeError(f"{ENGINE_KEY_PATH} je prazan ili nepotpun")
+
+
+def _zatvori() -> None:
+    global _conn
+    if _conn is not None:
+        try:
+            _conn.close()
+        except OSError:
+            pass
+    _conn = None
+
+
+def posalji(naredba: dict, timeout: float = ENGINE_TIMEOUT) -> dict | None:
+    """Pošalji naredbu engineu i vrati odgovor.
+
+    Vrati None samo ako naredba nije stigla do enginea (nema veze); pozivatelj
+    tada sam piše u bazu (stari put). Ako je naredba poslana, a odgovor nije
+    stigao, vrati {"ok": False, ...}: engine ju je možda primijenio, pa izravan
+    upis ne smije slijediti. Nakon neuspjelog spajanja ili slanja se
+    ENGINE_RETRY sekundi ne pokušava ponovno, da gumbi na kiosku ne čekaju;
+    spor odgovor samo zatvara vezu (engine radi, sljedeća naredba se ponovno spaja).
+    """
+    global _conn, _nedostupan_do
+    with _lock:
+        if _conn is None:
+            if time.monotonic() < _nedostupan_do:
+                return None
+            try:
+                _conn = Client(ENGINE_ADDRESS, authkey=engine_authkey())
+            except (OSError, EOFError) as e:
+                _nedostupan_do = time.monotonic() + ENGINE_RETRY
+                if not isinstance(e, ConnectionRefusedError):
+                    print(f"[engine] Spajanje nije uspjelo: {e}")
+                return None
+        try:
+            _conn.send(naredba)
+        except (OSError, EOFError) as e:
+            # stara veza (npr. engine restartan): naredba nije isporučena
+            print(f"[engine] Veza prekinuta: {e}")
+            _zatvori()
+            _nedostupan_do = time.monotonic() + ENGINE_RETRY
+            return None
+        try:
+            if not _conn.poll(timeout):
+                raise TimeoutError("engine nije odgovorio")
+            return _conn.recv()
+        except (OSError, EOFError, TimeoutError) as e:
+            print(f"[engine] Nema odgovora: {e}")
+            _zatvori()  # zakašnjeli odgovor ne smije stići sljedećoj naredbi
+            return {"ok": False, "greska": f"engine nije odgovorio ({e})"}
+
+
+def dostupan() -> bool:
+    """True ako engine radi (ping kroz postojeću ili novu vezu).
+
+    Nedostupan je samo ako se ne može spojiti ili poslati; spor odgovor ne
+    znači da engine ne radi, a lažni "ne radi" bi uključio drugog pisca.
+    """
+    return posalji({"cmd": "ping"}, timeout=1.0) is not None
@@ -0,0 +1,191 @@
+import sqlite3
+
+import pandas as pd
+
+# ------------------ SKUPNI UVOZ KORISNIKA ------------------
+# Datoteka (CSV/XLSX) ima kolone: ime (obavezno), soba, zona (id ili naziv zone).
+# Korisnik se prepoznaje po imenu, pa ponovni uvoz iste datoteke ne mijenja ništa.
+KOLONE = {
+    "ime": "ime",
+    "korisnik": "ime",
+    "soba": "soba",
+    "zona": "zona",
+    "zona_id": "zona",
+    "narukvica": "zona",
+}
+
+
+def ucitaj_datoteku(datoteka, ime_datoteke: str) -> pd.DataFrame:
+    """Pročitaj CSV ili XLSX u DataFrame s kolonama ime, soba, zona."""
+    if ime_datoteke.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(datoteka, dtype=str)  # treba openpyxl
+    else:
+        df = pd.read_csv(datoteka, dtype=str, sep=None, engine="python")
+    df = df.rename(columns=lambda c: KOLONE.get(str(c).strip().lower(), str(c).strip().lower()))
+    if "ime" not in df.columns:
+        raise ValueError("Datoteka mora imati kolonu 'ime'.")
+    for kol in ("soba", "zona"):
+        if kol not in df.columns:
+            df[kol] = None
+    return df[["ime", "soba", "zona"]]
+
+
+def _tekst(v) -> str | None:
+    """Vrijednost ćelije kao tekst bez razmaka; prazna ćelija -> None."""
+    if v is None or pd.isna(v):
+        return None
+    return str(v).strip() or None
+
+
+def pripremi_uvoz(conn: sqlite3.Connection, df: pd.DataFrame) -> dict:
+    """Usporedi datoteku s bazom (u memoriji) i vrati plan promjena bez pisanja.
+
+    Plan: 'pregled' (redak po redak za prikaz), 'novi', 'sobe', 'narukvice'
+    (promjene za primijeni_uvoz) i 'greske' (broj redaka koji se ne uvoze).
+    """
+    korisnici: dict[str, list[tuple[int, str | None]]] = {}
+    for kid, ime, soba in conn.execute("SELECT id, ime, soba FROM korisnici"):
+        korisnici.setdefault(ime, []).append((kid, soba))
+    zone = {zid: (naziv, kid) for zid, naziv, kid in conn.execute("SELECT id, naziv, korisnik_id FROM zone")}
+    zona_po_nazivu = {naziv: zid for zid, (naziv, _) in zone.items()}
+    narukvica_korisnika = {kid: zid for zid, (_, kid) in zone.items() if kid is not None}
+    ime_korisnika = {kid: ime for ime, lst in korisnici.items() for kid, _ in lst}
+
+    def zona_id(zona: str | None) -> int | None:
+        if not zona:
+            return None
+        return int(zona) if zona.isdigit() and int(zona) in zone else zona_po_nazivu.get(zona)
+
+    redovi = [tuple(_tekst(v) for v in r) for r in df[["ime", "soba", "zona"]].itertuples(index=False)]
+
+    # 1. provjere retka za sebe: ime, ponavljanja u datoteci, postojanje zone
+    provjera = []  # (ime, soba, zona, zid, greska) po retku
+    vidjena_imena: set[str] = set()
+    vidjene_zone: dict[int, str] = {}
+    for ime, soba, zona in redovi:
+        greska, zid = None, None
+        if not ime:
+            greska = "nema imena"
+        elif ime in vidjena_imena:
+            greska = "ime se ponavlja u datoteci"
+        elif len(korisnici.get(ime, [])) > 1:
+            greska = "u bazi postoji više korisnika s tim imenom"
+        elif zona:
+            zid = zona_id(zona)
+            if zid is None:
+                greska = f"zona '{zona}' ne postoji"
+            elif zid in vidjene_zone:
+                greska = f"zona {zid} je već dodijeljena u retku za '{vidjene_zone[zid]}'"
+        if greska is None:
+            vidjena_imena.add(ime)
+            if zid is not None:
+                vidjene_zone[zid] = ime
+        provjera.append([ime, soba, zona, zid, greska])
+
+    # 2. zauzeta zona se smije preuzeti samo ako njen dosadašnji korisnik u
+    # ispravnom retku iste datoteke dobiva drugu narukvicu; odbijeni redak
+    # može srušiti preuzimanje koje je ovisilo o njemu, pa do stabilnog stanja
+    promjena = True
+    while promjena:
+        promjena = False
+        nova_zona = {r[0]: r[3] for r in provjera if r[4] is None}
+        for r in provjera:
+            ime, _, _, zid, greska = r
+            if greska is not None or zid is None:
+                continue
+            vlasnik = zone[zid][1]
+            postojeci = korisnici.get(ime, [(None, None)])[0][0]
+            if vlasnik is not None and vlasnik != postojeci:
+                ime_vlasnika = ime_korisnika.get(vlasnik, vlasnik)
+                if nova_zona.get(ime_vlasnika) in (None, zid):
+                    r[4] = f"zona {zid} pripada korisniku '{ime_vlasnika}'"
+                    promjena = True
+
+    # 3. plan iz ispravnih redaka
+    pregled, novi, sobe, narukvice = [], [], [], []
+    greske = 0
+    for i, (ime, soba, zona, zid, greska) in enumerate(provjera, start=2):  # redak 1 je zaglavlje
+        akcije = []
+        if greska is not None:
+            greske += 1
+        elif ime not in korisnici:
+            novi.append((ime, soba))
+            akcije.append("novi korisnik")
+            if zid is not None:
+                narukvice.append((ime, zid))
+                akcije.append(f"narukvica → {zid}")
+        else:
+            kid, stara_soba = korisnici[ime][0]
+            if soba and soba != stara_soba:
+                sobe.append((soba, kid))
+                akcije.append(f"soba {stara_soba or '-'} → {soba}")
+            if zid is not None and narukvica_korisnika.get(kid) != zid:
+                narukvice.append((ime, zid))
+                akcije.append(f"narukvica {narukvica_korisnika.get(kid, '-')} → {zid}")
+
+        pregled.append(
+            {
+                "redak": i,
+                "ime": ime,
+                "soba": soba,
+                "zona": zid if zid is not None else zona,
+                "promjena": f"❌ {greska}" if greska else (", ".join(akcije) or "bez promjene"),
+            }
+        )
+
+    return {
+        "pregled": pd.DataFrame(pregled),
+        "novi": novi,
+        "sobe": sobe,
+        "narukvice": narukvice,
+        "greske": greske,
+    }
+
+
+def promjene(plan: dict) -> dict:
+    """Samo promjene iz plana (bez pregleda), za usporedbu s ponovno izračunatim planom."""
+    return {k: list(plan[k]) for k in ("novi", "sobe", "narukvice")}
+
+
+def primijeni_uvoz(conn: sqlite3.Connection, df: pd.DataFrame, prikazano: dict) -> dict[str, int]:
+    """Upiši uvoz u jednoj transakciji (executemany po vrsti promjene).
+
+    Plan se unutar transakcije računa ponovno i mora biti jednak prikazanom
+    (promjene(plan) iz pregleda); ako je netko u međuvremenu mijenjao
+    korisnike ili zone, ništa se ne upisuje i diže se ValueError.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        plan = pripremi_uvoz(conn, df)
+        if promjene(plan) != promjene(prikazano):
+            raise ValueError("Baza se promijenila nakon pregleda; pregledaj uvoz ponovno.")
+        conn.executemany("INSERT INTO korisnici (ime, soba) VALUES (?, ?)", plan["novi"])
+        conn.executemany("UPDATE korisnici SET soba = ? WHERE id = ?", plan["sobe"])
+        if plan["narukvice"]:
+            imena = sorted({ime for ime, _ in plan["narukvice"]})
+            ids = dict(
+                conn.execute(
+                    f"SELECT ime, id FROM korisnici WHERE ime IN ({', '.join('?' * len(imena))})",
+                    imena,
+                ).fetchall()
+            )
+            dodjele = [(ids[ime], zid) for ime, zid in plan["narukvice"]]
+            # jedan korisnik = jedna narukvica: prvo otkvači stare, pa dodijeli nove
+            conn.executemany(
+                "UPDATE zone SET korisnik_id = NULL WHERE korisnik_id = ?",
+                [(kid,) for kid, _ in dodjele],
+            )
+            conn.executemany(
+                "UPDATE zone SET korisnik_id = NULL WHERE id = ?",
+                [(zid,) for _, zid in dodjele],
+            )
+            conn.executemany("UPDATE zone SET korisnik_id = ? WHERE id = ?", dodjele)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {
+        "novi": len(plan["novi"]),
+        "sobe": len(plan["sobe"]),
+        "narukvice": len(plan["narukvice"]),
+    }
@@ -0,0 +1,111 @@
+import glob
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+
+from module.config import DB_PATH
+
+# ------------------ METRIKE SERVISA ------------------
+# Svaki servis (scanner, kiosk, engine) povremeno zapiše svoje metrike u
+# data/metrics/<servis>.json (atomski, tmp + os.replace). Admin stranica samo
+# čita te datoteke i stat() baze, pa ne ispituje servise kod svakog reruna.
+METRICS_DIR = os.path.join(os.path.dirname(DB_PATH), "metrics")
+BACKUP_DIR = os.path.join(os.path.dirname(DB_PATH), "backup")  # kao u 9_!_SqlLite
+UZORAKA = 200  # zadnjih mjerenja za percentile
+METRIKE_INTERVAL = 5.0  # s između zapisa metrika (heartbeat servisa)
+
+
+def zapisi(servis: str, podaci: dict, mapa: str = METRICS_DIR) -> None:
+    """Zapiši metrike servisa s vremenom zapisa (heartbeat) i PID-om."""
+    os.makedirs(mapa, exist_ok=True)
+    putanja = os.path.join(mapa, f"{servis}.json")
+    tmp = f"{putanja}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({**podaci, "vrijeme": time.time(), "pid": os.getpid()}, f, ensure_ascii=False)
+    os.replace(tmp, putanja)
+
+
+def procitaj_sve(mapa: str = METRICS_DIR) -> dict[str, dict]:
+    """{servis: metrike} za sve zapisane servise, s poljem 'starost' (s)."""
+    rez = {}
+    sad = time.time()
+    for putanja in sorted(glob.glob(os.path.join(mapa, "*.json"))):
+        try:
+            with open(putanja, encoding="utf-8") as f:
+                podaci = json.load(f)
+        except (OSError, ValueError):
+            continue
+        podaci["starost"] = sad - podaci.get("vrijeme", 0)
+        rez[os.path.splitext(os.path.basename(putanja))[0]] = podaci
+    return rez
+
+
+def je_zakljucano(e: BaseException) -> bool:
+    """SQLite greška zbog zaključane baze (istekao busy_timeout)."""
+    return isinstance(e, sqlite3.OperationalError) and (
+        "locked" in str(e) or "busy" in str(e)
+    )
+
+
+def _percentil(uzorci: list[float], p: float) -> float:
+    """p-ti percentil sortiranog popisa (najbliži rang), zaokružen na 0.1 ms."""
+    return round(uzorci[int(p * (len(uzorci) - 1))], 1) if uzorci else 0.0
+
+
+class Mjerenja:
+    """Zadnjih UZORAKA trajanja (ms) s percentilima za zapis u metrike."""
+
+    def __init__(self, uzoraka: int = UZORAKA) -> None:
+        self.uzorci: deque[float] = deque(maxlen=uzoraka)
+        self.zadnje = 0.0
+
+    def dodaj(self, ms: float) -> None:
+        self.zadnje = ms
+        self.uzorci.append(ms)
+
+    def sazetak(self) -> dict[str, float]:
+        s = sorted(self.uzorci)
+        return {
+            "zadnji": round(self.zadnje, 1),
+            "p50": _percentil(s, 0.50),
+            "p95": _percentil(s, 0.95),
+            "p99": _percentil(s, 0.99),
+            "max": round(s[-1], 1) if s else 0.0,
+        }
+
+
+# ------------------ BAZA (bez spajanja na servise) ------------------
+def stanje_datoteka(db_path: str = DB_PATH) -> dict:
+    """Veličina baze i WAL-a i procjena okvira koji čekaju checkpoint.
+
+    Čita se samo stat() i zaglavlje baze (veličina stranice), bez konekcije,
+    pa ne ometa pisce. WAL okvir = 24 B zaglavlja + stranica; WAL datoteka se
+    nakon checkpointa ponovno koristi, pa je broj okvira gornja granica.
+    """
+    rez = {"db_bytes": 0, "wal_bytes": 0, "wal_okviri": 0}
+    try:
+        rez["db_bytes"] = os.path.getsize(db_path)
+        with open(db_path, "rb") as f:
+            zaglavlje = f.read(18)
+        stranica = int.from_bytes(zaglavlje[16:18], "big") if len(zaglavlje) == 18 else 4096
+        stranica = 65536 if stranica == 1 else stranica
+    except OSError:
+        return rez
+    try:
+        st_wal = os.stat(f"{db_path}-wal")
+    except OSError:
+        return rez
+    rez["wal_bytes"] = st_wal.st_size
+    rez["wal_okviri"] = max(0, (st_wal.st_size - 32) // (stranica + 24))
+    return rez
+
+
+def zadnji_backup(mapa: str = BACKUP_DIR) -> tuple[str, float] | None:
+    """(putanja, mtime) najnovijeg backupa ili None."""
+    datoteke = glob.glob(os.path.join(mapa, "backup_*.db"))
+    if not datoteke:
+        return None
+    zadnja = max(datoteke, key=os.path.getmtime)
+    return zadnja, os.path.getmtime(zadnja)
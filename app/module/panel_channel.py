@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+import time
+
+from module.config import DB_PATH
+from module.db_changes import data_version
+
+# ------------------ KANAL SCANNER <-> ADMIN ------------------
+# Centrala dopušta malo istovremenih sesija, pa s njom razgovara samo scanner.
+# Scanner nakon svakog čitanja sprema snimku svih zona u JSON datoteku, a
+# admin stranice čitaju snimku i naredbe (brisanje alarma) šalju preko comm
+# tablice; scanner ih izvršava svojom postojećom sesijom.
+SNAPSHOT_PATH = os.path.join(os.path.dirname(DB_PATH), "panel_snapshot.json")
+SNAPSHOT_STALE_S = 60  # snimka starija od ovoga znači da scanner ne radi
+CLEAR_KEY = "panel_clear"  # comm: epoch zadnjeg zahtjeva za brisanje alarma
+CLEAR_DONE_KEY = "panel_clear_done"  # comm: epoch zadnjeg izvršenog zahtjeva
+PROVJERA_INTERVAL = 0.5  # s između provjera novih zahtjeva dok scanner čeka
+
+
+# ------------------ SNIMKA (piše scanner) ------------------
+def procitaj_snimku(putanja: str = SNAPSHOT_PATH) -> dict | None:
+    """Zadnja snimka centrale s poljem 'starost' (s) ili None ako je nema."""
+    try:
+        with open(putanja, encoding="utf-8") as f:
+            snimka = json.load(f)
+    except (OSError, ValueError):
+        return None
+    snimka["starost"] = time.time() - snimka.get("vrijeme", 0)
+    return snimka
+
+
+def _zapisi(snimka: dict, putanja: str) -> None:
+    tmp = putanja + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snimka, f, ensure_ascii=False)
+    os.replace(tmp, putanja)  # čitatelj nikad ne vidi pola datoteke
+
+
+def spremi_snimku(
+    zone: list[dict] | None = None,
+    greska: str | None = None,
+    naredba: dict | None = None,
+    putanja: str = SNAPSHOT_PATH,
+) -> None:
+    """Spremi stanje centrale; izostavljena polja ostaju iz prethodne snimke."""
+    snimka = procitaj_snimku(putanja) or {"vrijeme": 0, "zone": [], "naredba": None}
+    snimka.pop("starost", None)
+    if zone is not None:
+        snimka["zone"] = zone
+        snimka["vrijeme"] = time.time()
+        snimka["greska"] = None  # uspješno čitanje briše staru grešku
+    if greska:
+        snimka["greska"] = greska
+        snimka["greska_vrijeme"] = time.time()
+    if naredba is not None:
+        snimka["naredba"] = naredba
+    _zapisi(snimka, putanja)
+
+
+def nepouzdana(snimka: dict | None) -> str | None:
+    """Razlog zbog kojeg se snimka ne smije koristiti za izmjene baze, ili None."""
+    if snimka is None:
+        return "nema snimke centrale"
+    if snimka["starost"] > SNAPSHOT_STALE_S:
+        return f"snimka je stara {snimka['starost']:.0f} s"
+    if snimka.get("greska"):
+        return f"zadnje čitanje centrale nije uspjelo ({snimka['greska']})"
+    return None
+
+
+def aktivne_zone(snimka: dict) -> list[dict]:
+    """Zone iz snimke koje su u alarmu."""
+    return [z for z in snimka.get("zone", []) if z.get("alarm") in (1, True, "1")]
+
+
+# ------------------ NAREDBE (admin -> scanner) ------------------
+def _comm_int(conn: sqlite3.Connection, key: str) -> int:
+    row = conn.execute("SELECT value FROM comm WHERE key = ?", (key,)).fetchone()
+    try:
+        return int(row[0]) if row and row[0] is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _set_comm(conn: sqlite3.Connection, key: str, value: int) -> None:
+    conn.execute(
+        "INSERT INTO comm(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
+
+
+def zatrazi_clear(db_path: str = DB_PATH) -> int:
+    """Zatraži od scannera brisanje alarma na centrali; vrati oznaku zahtjeva."""
+    with sqlite3.connect(db_path) as conn:
+        zahtjev = max(int(time.time() * 1000), _comm_int(conn, CLEAR_KEY) + 1)
+        _set_comm(conn, CLEAR_KEY, zahtjev)
+        conn.commit()
+    return zahtjev
+
+
+def cekaj_izvrsenje(zahtjev: int, timeout: float, db_path: str = DB_PATH) -> dict | None:
+    """Čekaj da scanner izvrši zahtjev; vrati rezultat naredbe iz snimke ili None."""
+    rok = time.monotonic() + timeout
+    while time.monotonic() < rok:
+        with sqlite3.connect(db_path) as conn:
+            if _comm_int(conn, CLEAR_DONE_KEY) >= zahtjev:
+                snimka = procitaj_snimku()
+                return (snimka or {}).get("naredba") or {}
+        time.sleep(PROVJERA_INTERVAL)
+    return None
+
+
+def preuzmi_zahtjev(db_path: str = DB_PATH) -> int | None:
+    """(scanner) Oznaka neizvršenog zahtjeva za brisanje ili None."""
+    with sqlite3.connect(db_path) as conn:
+        zahtjev = _comm_int(conn, CLEAR_KEY)
+        return zahtjev if zahtjev > _comm_int(conn, CLEAR_DONE_KEY) else None
+
+
+def potvrdi_zahtjev(zahtjev: int, db_path: str = DB_PATH) -> None:
+    """(scanner) Označi zahtjev izvršenim."""
+    with sqlite3.connect(db_path) as conn:
+        _set_comm(conn, CLEAR_DONE_KEY, zahtjev)
+        conn.commit()
+
+
+def cekaj_zahtjev(trajanje: float, db_path: str = DB_PATH) -> bool:
+    """(scanner) Spavaj do `trajanje` s, ali se vrati ranije ako stigne zahtjev.
+
+    Baza se čita samo kad se promijeni (PRAGMA data_version), pa čekanje ne
+    opterećuje bazu.
+    """
+    rok = time.monotonic() + trajanje
+    dv = data_version(db_path)
+    while True:
+        ostalo = rok - time.monotonic()
+        if ostalo <= 0:
+            return False
+        time.sleep(min(PROVJERA_INTERVAL, ostalo))
+        novi = data_version(db_path)
+        if novi != dv:
+            dv = novi
+            if preuzmi_zahtjev(db_path) is not None:
+                return True
@@ -0,0 +1,58 @@
+import pandas as pd
+import streamlit as st
+
+# ------------------ ODABIR IZ DATAFRAME-A ------------------
+# Selectbox nad DataFrameom s oznakama iz rječnika id -> tekst. Rječnik se
+# gradi jednom po pozivu (O(n)) umjesto filtriranja DataFrame-a za svaku
+# opciju u format_func (O(n²)). Veliki popisi dobivaju pretragu i stranice.
+PAGE_SIZE = 200  # najviše opcija u jednom selectboxu
+
+
+def oznake(df: pd.DataFrame, fmt: str, id_col: str = "id") -> dict:
+    """Rječnik id -> oznaka, npr. oznake(df, "{naziv} ID {id}")."""
+    if df.empty:
+        return {}
+    return {r[id_col]: fmt.format(**r) for r in df.to_dict("records")}
+
+
+def picker(
+    label: str,
+    df: pd.DataFrame,
+    fmt: str,
+    key: str,
+    id_col: str = "id",
+    page_size: int = PAGE_SIZE,
+    **kwargs,
+):
+    """Selectbox s id vrijednostima iz df[id_col] i oznakama po predlošku fmt.
+
+    Do page_size opcija je običan selectbox (ima ugrađeno tipkanje za
+    pretragu). Iznad toga se prikazuje polje za pretragu i odabir stranice,
+    a u selectbox ide samo jedna stranica opcija (uvijek i trenutni odabir).
+    """
+    mapa = oznake(df, fmt, id_col)
+    opcije = list(mapa)
+
+    if len(opcije) > page_size:
+        c1, c2 = st.columns([3, 1])
+        trazi = c1.text_input(
+            "🔎 Traži", key=f"{key}_trazi", placeholder=f"{len(opcije)} stavki"
+        ).strip().lower()
+        if trazi:
+            opcije = [i for i in opcije if trazi in mapa[i].lower()]
+        stranica_max = max(1, -(-len(opcije) // page_size))
+        if st.session_state.get(f"{key}_str", 1) > stranica_max:
+            st.session_state[f"{key}_str"] = 1  # pretraga je suzila popis
+        stranica = c2.number_input(
+            "Stranica",
+            min_value=1,
+            max_value=stranica_max,
+            key=f"{key}_str",
+            help=f"{len(opcije)} stavki, {stranica_max} stranica",
+        )
+        odabrano = st.session_state.get(key)
+        opcije = opcije[(stranica - 1) * page_size : stranica * page_size]
+        if odabrano in mapa and odabrano not in opcije:
+            opcije.insert(0, odabrano)
+
+    return st.selectbox(label, options=opcije, format_func=mapa.__getitem__, key=key, **kwargs)
@@ -0,0 +1,115 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# ------------------ VRIJEME ODZIVA NA ALARME ------------------
+# Koliko je štićenik čekao: od alarms.vrijeme do alarms.vrijemePotvrde.
+# Razlika se računa u SQL-u (julianday), a raspodjele po grupama jednim
+# vektoriziranim prolazom u NumPyju (sort po grupi + interpolacija), bez
+# Python petlje po grupi.
+SMJENE = (  # (naziv, od sata, do sata); smjena koja prelazi ponoć ima od > do
+    ("Jutarnja", 7, 15),
+    ("Popodnevna", 15, 23),
+    ("Noćna", 23, 7),
+)
+SLA_S = 300  # potvrda unutar 5 minuta
+PERCENTILI = (50, 90, 99)
+
+GRUPIRANJA = {  # oznaka -> kolona u ucitaj_odzive
+    "Osoblje": "osoblje",
+    "Smjena": "smjena",
+    "Soba": "soba",
+    "Zona": "zona",
+    "Sat u danu": "sat",
+    "Krilo": "krilo",
+    "Stanica": "stanica",
+}
+
+SQL_ODZIVI = """
+    SELECT a.id,
+           a.vrijeme,
+           COALESCE(NULLIF(TRIM(a.osoblje), ''), '(nepoznato)') AS osoblje,
+           COALESCE(NULLIF(TRIM(a.soba), ''), '(bez sobe)') AS soba,
+           COALESCE(a.zone_name, z.naziv, CAST(a.zone_id AS TEXT)) AS zona,
+           COALESCE(z.krilo, '(bez krila)') AS krilo,
+           COALESCE(z.stanica, '(bez stanice)') AS stanica,
+           CAST(strftime('%H', a.vrijeme) AS INTEGER) AS sat,
+           ROUND((julianday(a.vrijemePotvrde) - julianday(a.vrijeme)) * 86400.0, 1) AS sekunde
+    FROM alarms a
+    LEFT JOIN zone z ON z.id = a.zone_id
+    WHERE a.potvrda = 1
+      AND a.vrijemePotvrde IS NOT NULL
+      AND a.vrijeme >= ? AND a.vrijeme < ?
+"""
+
+
+def smjena_po_satu(smjene=SMJENE) -> np.ndarray:
+    """Niz od 24 naziva smjene: indeks je sat u danu."""
+    po_satu = np.full(24, "(izvan smjene)", dtype=object)
+    for naziv, od, do in smjene:
+        sati = range(od, do) if od < do else [*range(od, 24), *range(0, do)]
+        po_satu[list(sati)] = naziv
+    return po_satu
+
+
+def dodaj_dimenzije(df: pd.DataFrame, smjene=SMJENE) -> pd.DataFrame:
+    """Rezultatu SQL_ODZIVI dodaj smjenu; izbaci neispravna vremena."""
+    df = df[df["sekunde"].notna() & (df["sekunde"] >= 0)].reset_index(drop=True)
+    df["sat"] = df["sat"].fillna(0).astype(int)
+    df["smjena"] = smjena_po_satu(smjene)[df["sat"].to_numpy()]
+    return df
+
+
+def ucitaj_odzive(conn: sqlite3.Connection, od: str, do: str, smjene=SMJENE) -> pd.DataFrame:
+    """Potvrđeni alarmi s vrijeme >= od i < do (TIME_FMT), sa sekundama čekanja."""
+    return dodaj_dimenzije(pd.read_sql_query(SQL_ODZIVI, conn, params=(od, do)), smjene)
+
+
+def raspodjela(
+    vrijednosti: np.ndarray,
+    grupe: np.ndarray,
+    sla_s: float = SLA_S,
+    percentili=PERCENTILI,
+) -> pd.DataFrame:
+    """Percentili, max, prosjek i prekoračenja SLA po grupi (vektorizirano).
+
+    Percentili se računaju linearnom interpolacijom kao np.percentile, ali za
+    sve grupe odjednom: vrijednosti se sortiraju unutar grupa, a položaj
+    percentila je početak grupe + q * (n - 1).
+    """
+    vrijednosti = np.asarray(vrijednosti, dtype=float)
+    if not len(vrijednosti):
+        kolone = ["grupa", "broj", *[f"p{q}" for q in percentili], "max", "prosjek"]
+        return pd.DataFrame(columns=kolone + ["prekoracenja", "udio_prekoracenja"])
+    kodovi, nazivi = pd.factorize(pd.Series(grupe), sort=True)
+
+    red = np.lexsort((vrijednosti, kodovi))
+    s = vrijednosti[red]
+    broj = np.bincount(kodovi, minlength=len(nazivi))
+    kraj = np.cumsum(broj)
+    pocetak = kraj - broj
+
+    rez = {"grupa": np.asarray(nazivi, dtype=object), "broj": broj}
+    for q in percentili:
+        pos = pocetak + (q / 100.0) * (broj - 1)
+        lo = np.floor(pos).astype(int)
+        hi = np.ceil(pos).astype(int)
+        rez[f"p{q}"] = s[lo] + (s[hi] - s[lo]) * (pos - lo)
+    rez["max"] = s[kraj - 1]
+    rez["prosjek"] = np.bincount(kodovi, weights=vrijednosti) / broj
+    prekoracenja = np.bincount(kodovi, weights=vrijednosti > sla_s, minlength=len(nazivi)).astype(int)
+    rez["prekoracenja"] = prekoracenja
+    rez["udio_prekoracenja"] = prekoracenja / broj
+    return pd.DataFrame(rez)
+
+
+def statistika_odziva(df: pd.DataFrame, po: str, sla_s: float = SLA_S) -> pd.DataFrame:
+    """Raspodjela vremena odziva grupirana po koloni `po` (vidi GRUPIRANJA)."""
+    return raspodjela(df["sekunde"].to_numpy(), df[po].to_numpy(), sla_s)
+
+
+def ukupno(df: pd.DataFrame, sla_s: float = SLA_S) -> dict:
+    """Raspodjela za sve alarme zajedno (jedan redak kao dict)."""
+    rez = raspodjela(df["sekunde"].to_numpy(), np.zeros(len(df), dtype=int), sla_s)
+    return rez.iloc[0].drop("grupa").to_dict() if not rez.empty else {}
@@ -0,0 +1,108 @@
+import base64
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from module.config import BASE_DIR
+
+# ------------------ POSTAVKE ------------------
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+ASSET_PREFIX = "/assets"
+ASSET_EXT = {".mp3", ".wav", ".png", ".svg", ".js"}
+GZIP_EXT = {".wav", ".svg", ".js"}  # mp3 i png su već komprimirani
+INLINE_MAX = 16 * 1024  # najveća datoteka koja se smije ugraditi kao data: URI
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+
+# ime -> {"kljuc", "hash", "tip", "podaci", "gzip"}; računa se jednom po verziji datoteke
+_assets: dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def _asset(ime: str) -> dict | None:
+    """Učitaj datoteku iz static/ s hashom i gzip varijantom (keširano po mtime/size)."""
+    if ime != os.path.basename(ime) or os.path.splitext(ime)[1].lower() not in ASSET_EXT:
+        return None
+    putanja = os.path.join(STATIC_DIR, ime)
+    try:
+        st = os.stat(putanja)
+    except OSError:
+        return None
+    kljuc = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        a = _assets.get(ime)
+        if a and a["kljuc"] == kljuc:
+            return a
+
+    with open(putanja, "rb") as f:
+        podaci = f.read()
+    gz = None
+    if os.path.splitext(ime)[1].lower() in GZIP_EXT:
+        gz = gzip.compress(podaci, compresslevel=9, mtime=0)
+        if len(gz) > 0.9 * len(podaci):
+            gz = None  # ne isplati se
+    a = {
+        "kljuc": kljuc,
+        "hash": hashlib.sha256(podaci).hexdigest()[:12],
+        "tip": mimetypes.guess_type(ime)[0] or "application/octet-stream",
+        "podaci": podaci,
+        "gzip": gz,
+    }
+    with _lock:
+        _assets[ime] = a
+    return a
+
+
+def asset_url(ime: str) -> str | None:
+    """URL s otiskom sadržaja, npr. /assets/alarm_3_short.1a2b3c4d5e6f.wav."""
+    a = _asset(ime)
+    if a is None:
+        return None
+    baza, ext = os.path.splitext(ime)
+    return f"{ASSET_PREFIX}/{baza}.{a['hash']}{ext}"
+
+
+def data_uri(ime: str, max_bytes: int = INLINE_MAX) -> str | None:
+    """data: URI za male datoteke (npr. kratki zvuk alarma), inače None."""
+    a = _asset(ime)
+    if a is None or len(a["podaci"]) > max_bytes:
+        return None
+    return f"data:{a['tip']};base64,{base64.b64encode(a['podaci']).decode('ascii')}"
+
+
+def _rastavi(naziv: str) -> tuple[str, str]:
+    """'alarm.1a2b3c4d5e6f.wav' -> ('alarm.wav', '1a2b3c4d5e6f')."""
+    baza, ext = os.path.splitext(naziv)
+    ime, _, h = baza.rpartition(".")
+    return ime + ext, h
+
+
+# ------------------ HTTP ------------------
+def register_asset_routes(fastapi_app) -> None:
+    """Dodaj rutu ASSET_PREFIX/{naziv} na FastAPI/NiceGUI aplikaciju.
+
+    Točan otisak -> trajni cache (immutable), ETag i gzip ako ga klijent prihvaća.
+    Zastarjeli otisak dobiva trenutačni sadržaj, ali bez dugog cachea. Gzip i
+    izvorno tijelo su različiti bajtovi, pa gzip ETag ima sufiks "-gz".
+    """
+    from fastapi import Request, Response
+
+    @fastapi_app.get(ASSET_PREFIX + "/{naziv}", include_in_schema=False)
+    def posluzi_asset(naziv: str, request: Request) -> Response:
+        ime, h = _rastavi(naziv)
+        a = _asset(ime)
+        if a is None:
+            return Response(status_code=404)
+        gz = a["gzip"] is not None and "gzip" in request.headers.get("accept-encoding", "")
+        etag = f'"{a["hash"]}-gz"' if gz else f'"{a["hash"]}"'
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": CACHE_IMMUTABLE if h == a["hash"] else "no-cache",
+        }
+        if etag in (t.strip() for t in request.headers.get("if-none-match", "").split(",")):
+            return Response(status_code=304, headers=headers)
+        if gz:
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=a["gzip"] if gz else a["podaci"], media_type=a["tip"], headers=headers)
@@ -0,0 +1,100 @@
+import sqlite3
+from urllib.parse import parse_qsl, urlencode
+
+from module.config import TYPE_MAP, table_info
+
+# ------------------ GRUPE ZONA ------------------
+# zona pripada krilu, katu i sestrinskoj stanici; kiosk prati samo svoje grupe
+GRUPE = ("krilo", "kat", "stanica")
+KIOSK_KEY_PREFIX = "kiosk:"  # comm['kiosk:<ime>'] = "stanica=S1&naslov=..." (postavke uređaja)
+DEFAULT_NASLOV = "DOM BUZIN"
+
+GRUPE_INDEXI = {
+    "ix_zone_stanica": "CREATE INDEX IF NOT EXISTS ix_zone_stanica ON zone(stanica)",
+    "ix_zone_krilo_kat": "CREATE INDEX IF NOT EXISTS ix_zone_krilo_kat ON zone(krilo, kat)",
+}
+
+Grupe = tuple[tuple[str, tuple[str, ...]], ...]  # npr. (("kat", ("1", "2")), ("krilo", ("A",)))
+
+
+def ensure_group_columns(conn: sqlite3.Connection) -> list[str]:
+    """Dodaj kolone grupa i indekse na zone. Vrati popis dodanog."""
+    postojece = table_info(conn, "zone")
+    if not postojece:
+        return []
+    dodano = []
+    for kol in GRUPE:
+        if kol not in postojece:
+            conn.execute(f"ALTER TABLE zone ADD COLUMN {kol} {TYPE_MAP[kol]}")
+            dodano.append(f"zone.{kol}")
+    indeksi = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    for ime, stmt in GRUPE_INDEXI.items():
+        if ime not in indeksi:
+            conn.execute(stmt)
+            dodano.append(ime)
+    if dodano:
+        conn.commit()
+    return dodano
+
+
+def parse_grupe(params) -> Grupe:
+    """Grupe iz parametara (URL ili postavke uređaja): ?kat=1,2&krilo=A.
+
+    Vrijednosti unutar grupe su ILI, različite grupe su I. Rezultat je
+    kanonski (sortiran) pa ga kiosk koristi i kao ključ dijeljenog pollera.
+    """
+    rez = {}
+    for kol in GRUPE:
+        vrijednost = params.get(kol)
+        if not vrijednost:
+            continue
+        vrijednosti = {v.strip() for v in str(vrijednost).split(",") if v.strip()}
+        if vrijednosti:
+            rez[kol] = tuple(sorted(vrijednosti))
+    return tuple(sorted(rez.items()))
+
+
+def grupe_sql(grupe: Grupe, alias: str = "z") -> tuple[str, list[str]]:
+    """WHERE uvjet (bez 'WHERE') i parametri za filtriranje zona po grupama."""
+    uvjeti, params = [], []
+    for kol, vrijednosti in grupe:
+        uvjeti.append(f"{alias}.{kol} IN ({', '.join('?' * len(vrijednosti))})")
+        params.extend(vrijednosti)
+    return " AND ".join(uvjeti) or "1", params
+
+
+def grupe_opis(grupe: Grupe) -> str:
+    """Kratki opis za zaglavlje kioska, npr. 'KRILO A · KAT 1,2'."""
+    return " · ".join(f"{kol.upper()} {','.join(v)}" for kol, v in grupe)
+
+
+# ------------------ POSTAVKE UREĐAJA ------------------
+def get_kiosk_postavke(conn: sqlite3.Connection, ime: str) -> dict[str, str]:
+    """Postavke kioska iz comm['kiosk:<ime>'] (prazan dict ako ih nema)."""
+    row = conn.execute(
+        "SELECT value FROM comm WHERE key = ?", (KIOSK_KEY_PREFIX + ime,)
+    ).fetchone()
+    if not row or not isinstance(row[0], str):
+        return {}
+    return dict(parse_qsl(row[0]))
+
+
+def set_kiosk_postavke(conn: sqlite3.Connection, ime: str, postavke: dict[str, str]) -> None:
+    """Spremi postavke kioska (prazne vrijednosti se izostavljaju)."""
+    vrijednost = urlencode({k: v for k, v in postavke.items() if v})
+    conn.execute(
+        "INSERT INTO comm(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (KIOSK_KEY_PREFIX + ime, vrijednost),
+    )
+    conn.commit()
+
+
+def list_kiosk_postavke(conn: sqlite3.Connection) -> dict[str, dict[str, str]]:
+    """Sve spremljene postavke uređaja: ime -> postavke."""
+    rows = conn.execute(
+        "SELECT key, value FROM comm WHERE key LIKE ?", (KIOSK_KEY_PREFIX + "%",)
+    ).fetchall()
+    return {
+        k[len(KIOSK_KEY_PREFIX):]: dict(parse_qsl(v)) if isinstance(v, str) else {}
+        for k, v in rows
+    }
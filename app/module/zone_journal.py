@@ -0,0 +1,174 @@
+import sqlite3
+import time
+from typing import Iterable, Iterator
+
+from module.config import DB_PATH
+
+# ------------------ IZVORI PROMJENA ------------------
+# Izvor se sprema kao mali INTEGER da redak journala ostane kompaktan.
+IZVOR_CENTRALA = 1
+IZVOR_KIOSK = 2
+IZVOR_ADMIN = 3
+IZVOR_SIMULATOR = 4
+
+IZVORI = {
+    IZVOR_CENTRALA: "centrala",
+    IZVOR_KIOSK: "kiosk",
+    IZVOR_ADMIN: "admin",
+    IZVOR_SIMULATOR: "simulator",
+}
+
+JOURNAL_KEEP_DAYS = 30  # koliko dana detaljnih prijelaza ostaje prije sažimanja
+
+
+# ------------------ SHEMA ------------------
+def ensure_journal(conn: sqlite3.Connection) -> None:
+    """Kreira tablice zone_journal (append-only prijelazi) i zone_snapshot (sažeci)."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS zone_journal (
+            id INTEGER PRIMARY KEY,
+            ts INTEGER NOT NULL,
+            zone_id INTEGER NOT NULL,
+            status INTEGER NOT NULL,
+            izvor INTEGER NOT NULL
+        )
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS ix_zone_journal_zone_ts ON zone_journal(zone_id, ts)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS zone_snapshot (
+            snap_ts INTEGER NOT NULL,
+            zone_id INTEGER NOT NULL,
+            status INTEGER NOT NULL,
+            changed_ts INTEGER,
+            PRIMARY KEY (snap_ts, zone_id)
+        ) WITHOUT ROWID
+    """
+    )
+
+
+# ------------------ UPIS ------------------
+def append_transitions(
+    conn: sqlite3.Connection,
+    zone_ids: Iterable[int],
+    status: int,
+    izvor: int,
+    ts: int | None = None,
+) -> None:
+    """Dodaj prijelaze zona u journal.
+
+    Poziva se na istoj konekciji i u istoj transakciji kao UPDATE zone, pa je
+    cijela skupina jedan executemany bez dodatnog commita. Tablica se kreira
+    tek ako ne postoji (prvi upis), tako da u normalnom radu nema dodatnih upita.
+    """
+    ts = int(time.time()) if ts is None else int(ts)
+    rows = [(ts, int(zid), int(status), int(izvor)) for zid in zone_ids]
+    if not rows:
+        return
+    sql = "INSERT INTO zone_journal (ts, zone_id, status, izvor) VALUES (?, ?, ?, ?)"
+    try:
+        conn.executemany(sql, rows)
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise
+        ensure_journal(conn)
+        conn.executemany(sql, rows)
+
+
+# ------------------ SAŽIMANJE ------------------
+def compact_journal(db_path: str = DB_PATH, keep_days: int = JOURNAL_KEEP_DAYS) -> int:
+    """Sažmi prijelaze starije od keep_days u novi snapshot i obriši ih iz journala.
+
+    Snapshot sadrži zadnje poznato stanje svake zone u trenutku reza (prethodni
+    snapshot + zadnji prijelaz po zoni). Vraća broj obrisanih redaka journala.
+    """
+    cutoff = int(time.time()) - keep_days * 86400
+    with sqlite3.connect(db_path) as conn:
+        ensure_journal(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        n_old = conn.execute(
+            "SELECT COUNT(*) FROM zone_journal WHERE ts < ?", (cutoff,)
+        ).fetchone()[0]
+        if not n_old:
+            conn.rollback()
+            return 0
+
+        prev = conn.execute(
+            "SELECT MAX(snap_ts) FROM zone_snapshot WHERE snap_ts <= ?", (cutoff,)
+        ).fetchone()[0]
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO zone_snapshot (snap_ts, zone_id, status, changed_ts)
+            SELECT :cutoff, j.zone_id, j.status, j.ts
+            FROM zone_journal j
+            WHERE j.id IN (
+                SELECT MAX(id) FROM zone_journal WHERE ts < :cutoff GROUP BY zone_id
+            )
+            UNION ALL
+            SELECT :cutoff, s.zone_id, s.status, s.changed_ts
+            FROM zone_snapshot s
+            WHERE s.snap_ts = :prev
+              AND s.zone_id NOT IN (
+                  SELECT zone_id FROM zone_journal WHERE ts < :cutoff
+              )
+            """,
+            {"cutoff": cutoff, "prev": prev},
+        )
+        conn.execute("DELETE FROM zone_journal WHERE ts < ?", (cutoff,))
+        conn.commit()
+    return int(n_old)
+
+
+# ------------------ REKONSTRUKCIJA ------------------
+def iter_transitions(
+    db_path: str = DB_PATH,
+    od_ts: int = 0,
+    do_ts: int | None = None,
+    zone_id: int | None = None,
+) -> Iterator[dict]:
+    """Vrati prijelaze iz journala (redom upisa) za zadani interval i po želji zonu."""
+    do_ts = int(time.time()) if do_ts is None else int(do_ts)
+    sql = "SELECT id, ts, zone_id, status, izvor FROM zone_journal WHERE ts BETWEEN ? AND ?"
+    params: list = [int(od_ts), do_ts]
+    if zone_id is not None:
+        sql += " AND zone_id = ?"
+        params.append(int(zone_id))
+    sql += " ORDER BY id"
+    with sqlite3.connect(db_path) as conn:
+        for id_, ts, zid, status, izvor in conn.execute(sql, params):
+            yield {
+                "id": id_,
+                "ts": ts,
+                "zone_id": zid,
+                "status": status,
+                "izvor": IZVORI.get(izvor, str(izvor)),
+            }
+
+
+def zone_state_at(db_path: str = DB_PATH, ts: int | None = None) -> dict[int, int]:
+    """Rekonstruiraj stanje svih zona u trenutku ts (snapshot + replay journala).
+
+    Točno je za trenutke nakon zadnjeg sažimanja; za ranije trenutke vrijedi
+    rezolucija snapshota (stanje u trenutku reza).
+    """
+    ts = int(time.time()) if ts is None else int(ts)
+    with sqlite3.connect(db_path) as conn:
+        ensure_journal(conn)
+        snap_ts = conn.execute(
+            "SELECT MAX(snap_ts) FROM zone_snapshot WHERE snap_ts <= ?", (ts,)
+        ).fetchone()[0]
+        stanje = {}
+        if snap_ts is not None:
+            stanje = dict(
+                conn.execute(
+                    "SELECT zone_id, status FROM zone_snapshot WHERE snap_ts = ?",
+                    (snap_ts,),
+                ).fetchall()
+            )
+    for t in iter_transitions(db_path, od_ts=snap_ts or 0, do_ts=ts):
+        stanje[t["zone_id"]] = t["status"]
+    return stanje
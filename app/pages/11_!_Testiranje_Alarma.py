@@ -3,11 +3,17 @@ import streamlit as st
 from admin import DB_PATH
 import pandas as pd
 from datetime import datetime
-from module.axpro_auth import (
-    login_axpro,
-    get_zone_status,
-    clear_axpro_alarms,
+from module.panel_channel import (
+    procitaj_snimku,
+    aktivne_zone,
+    zatrazi_clear,
+    SNAPSHOT_STALE_S,
 )
+from module.zone_journal import append_transitions, IZVOR_ADMIN, IZVOR_SIMULATOR
+from module import engine_client
+from module.cooldown import cooldown_until, ensure_cooldown_columns, get_cooldown_s
+from module.admin_cache import cached_query
+from module.pickers import picker
 
 st.set_page_config(page_title="Alarm Axpro", page_icon="📈", layout="wide")
 
@@ -15,38 +21,83 @@ st.set_page_config(page_title="Alarm Axpro", page_icon="📈", layout="wide")
 TIME_FMT = "%Y-%m-%d %H:%M:%S"
 
 
-# ----------- SPAJANJE NA CENTERALU -----------
+# ----------- STANJE CENTRALE (SNIMKA SCANNERA) -----------
 def get_axpro_data():
-    cookie = login_axpro()
-    if not cookie:
-        st.error("Neuspješna prijava na Axpro centralu.")
+    """Aktivne zone iz zadnje snimke scannera; na centralu se ne spaja."""
+    snimka = procitaj_snimku()
+    if snimka is None:
+        st.error("Nema snimke centrale. Radi li scan.py?")
         return None
-    zones = get_zone_status(cookie)
-    if zones is None:
-        st.error("Neuspješno dohvaćanje statusa zona.")
-        return None
-    zone_list = [z["Zone"] for z in zones.get("ZoneList", [])]
-    df = pd.DataFrame(zone_list)
-    df = df[df["alarm"] == 1]  # Filtrirajaj samo aktivne alarme
-    return df
+    starost = snimka["starost"]
+    if starost > SNAPSHOT_STALE_S:
+        st.warning(f"Snimka centrale je stara {starost:.0f} s. Radi li scan.py?")
+    else:
+        st.caption(f"Snimka centrale stara {starost:.0f} s (osvježava scanner).")
+    if snimka.get("greska"):
+        st.warning(f"Zadnja greška scannera: {snimka['greska']}")
+    return pd.DataFrame(aktivne_zone(snimka))
 
 # ----------- UPRAVLJANJE ALARMIMA -----------
 
+def posalji_engineu(naredba: dict) -> bool | None:
+    """Pošalji naredbu alarm engineu; None ako engine ne radi (piše se izravno)."""
+    rez = engine_client.posalji(naredba)
+    if rez is None:
+        return None
+    if not rez.get("ok"):
+        st.error(f"Alarm engine: {rez.get('greska')}")
+        return False
+    return True
+
+
 def confirm_alarm(alarm_id, osoblje_ime):
     """Upiši u db.alarms potvrdu vrijeme potvrde, osobu koja je potvrdila"""
+    rez = engine_client.posalji(
+        {"cmd": "potvrdi", "alarm_id": int(alarm_id), "osoblje": osoblje_ime, "izvor": IZVOR_ADMIN}
+    )
+    if rez is not None:
+        if not rez.get("ok"):
+            st.error(f"Alarm engine: {rez.get('greska')}")
+            return False
+        if not rez["pobjeda"]:
+            st.warning(f"Alarm je već potvrdio/la: {rez.get('osoblje')}")
+            return False
+        return True
+    # bez enginea isto što i engine: potvrda, reset zone, cooldown i journal zajedno
     try:
+        now_txt = datetime.now().strftime(TIME_FMT)
         with sqlite3.connect(DB_PATH) as conn:
-            cur = conn.cursor()
-            cur.execute(
+            ensure_cooldown_columns(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute(
                 """
                 UPDATE alarms 
                 SET potvrda = 1, 
                     vrijemePotvrde = ?, 
                     osoblje = ?
-                WHERE id = ?
+                WHERE id = ? AND potvrda = 0
             """,
-                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), osoblje_ime, alarm_id),
+                (now_txt, osoblje_ime, alarm_id),
             )
+            if cur.rowcount != 1:
+                conn.rollback()
+                st.warning("Alarm je već potvrđen.")
+                return False
+            row = conn.execute("SELECT zone_id FROM alarms WHERE id = ?", (alarm_id,)).fetchone()
+            if row and row[0] is not None:
+                rok, rok_txt = cooldown_until(get_cooldown_s(conn))
+                conn.execute(
+                    """
+                    UPDATE zone SET
+                        alarm_status = 0,
+                        last_updated = ?,
+                        cooldown_until_epoch = ?,
+                        cooldown_until = ?
+                    WHERE id = ?
+                    """,
+                    (now_txt, rok, rok_txt, row[0]),
+                )
+                append_transitions(conn, [row[0]], 0, IZVOR_ADMIN)
             conn.commit()
             return True
     except Exception as e:
@@ -56,6 +107,11 @@ def confirm_alarm(alarm_id, osoblje_ime):
 
 def set_zone_alarm(zone_id: int) -> bool:
     """Uključi alarm na jednoj zoni (postavi alarm_status=1)."""
+    rez = posalji_engineu(
+        {"cmd": "zone_alarm", "zone_ids": [int(zone_id)], "status": 1, "izvor": IZVOR_SIMULATOR}
+    )
+    if rez is not None:
+        return rez
     try:
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         with sqlite3.connect(DB_PATH) as conn:
@@ -70,6 +126,7 @@ def set_zone_alarm(zone_id: int) -> bool:
                 """,
                 (ts, ts, zone_id),
             )
+            append_transitions(conn, [zone_id], 1, IZVOR_SIMULATOR)
             conn.commit()
         return True
     except Exception as e:
@@ -78,15 +135,20 @@ def set_zone_alarm(zone_id: int) -> bool:
 
 def reset_zone_alarms() -> bool:
     """Isključi sve alarme u svim zonama (postavi alarm_status=0 za sve)."""
+    rez = posalji_engineu({"cmd": "zone_alarm", "zone_ids": None, "status": 0, "izvor": IZVOR_ADMIN})
+    if rez is not None:
+        return rez
     try:
         with sqlite3.connect(DB_PATH) as conn:
             cur = conn.cursor()
+            aktivne = [r[0] for r in cur.execute("SELECT id FROM zone WHERE alarm_status = 1")]
             cur.execute(
                 """
                 UPDATE zone
                 SET alarm_status = 0
                 """
             )
+            append_transitions(conn, aktivne, 0, IZVOR_ADMIN)
             conn.commit()
         return True
     except Exception as e:
@@ -94,11 +156,10 @@ def reset_zone_alarms() -> bool:
         return False
 
 # ------------------ UČITAVANJE PODATAKA ------------------
-def query(sql: str) -> pd.DataFrame:
-    """Izvrši SELECT upit i vrati rezultat kao DataFrame."""
+def query(sql: str, tablice: tuple[str, ...] = ()) -> pd.DataFrame:
+    """Izvrši SELECT upit i vrati rezultat kao DataFrame (iz cachea dok se baza ne promijeni)."""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            return pd.read_sql_query(sql, conn)
+        return cached_query(sql, tablice=tablice, db_path=DB_PATH)
     except Exception as e:
         st.error(f"Greška pri učitavanju podataka iz baze: {e}")
         return pd.DataFrame()
@@ -132,7 +193,7 @@ sql_sveZone = """
 df_zone_aktivne = query(sqlz)
 df_alarm_aktivni = query(sqla)
 df_zone = query(sql_sveZone)
-df_osoblje = query(sql_osoblje)
+df_osoblje = query(sql_osoblje, tablice=("osoblje",))
 
 if st.sidebar.button("🔄 Osvježi prikaz"):
     st.rerun()
@@ -175,10 +236,10 @@ if df_zone.empty:
 else:
     col1,col2,col3= st.columns([2,1,1])
     with col1:
-        selected_zone_id = st.selectbox(
+        selected_zone_id = picker(
             "Zona",
-            options=df_zone["id"].tolist(),
-            format_func=lambda zid: f"{df_zone[df_zone['id']==zid]['naziv'].iloc[0]} ID {zid}",
+            df_zone,
+            "{naziv} ID {id}",
             key="sel_zone",
             label_visibility="collapsed",
         )
@@ -222,21 +283,21 @@ st.dataframe(df_alarm_aktivni, width='stretch')
 # Single alarm selector for both operations
 col1, col2, col3 = st.columns([2, 1, 1])
 with col1:
-    selected_alarm_id = st.selectbox(
+    selected_alarm_id = picker(
         "Odaberi alarm:",
-        options=df_alarm_aktivni["id"].tolist(),
-        format_func=lambda x: f"{df_alarm_aktivni[df_alarm_aktivni['id']==x]['zone_name'].iloc[0]} - {df_alarm_aktivni[df_alarm_aktivni['id']==x]['korisnik'].iloc[0]}",
+        df_alarm_aktivni,
+        "{zone_name} - {korisnik}",
         key="shared_alarm_selector", label_visibility="collapsed"
     )
 with col2:
     
-    selected_osoblje_id = st.selectbox(
+    selected_osoblje_id = picker(
         "Odaberi osoblje:",
-        options=df_osoblje["id"].tolist(),
-        format_func=lambda x: f"{df_osoblje[df_osoblje['id']==x]['ime'].iloc[0]} ({df_osoblje[df_osoblje['id']==x]['sifra'].iloc[0]})",
+        df_osoblje,
+        "{ime} ({sifra})",
         key="osoblje_selector",label_visibility="collapsed"
     )
-    selected_osoblje_ime = df_osoblje[df_osoblje["id"] == selected_osoblje_id]["ime"].iloc[0]
+    selected_osoblje_ime = dict(zip(df_osoblje["id"], df_osoblje["ime"])).get(selected_osoblje_id)
 
 with col3:
     if st.button("✅ Potvrdi Alarm", type="primary", width="stretch"):
@@ -250,26 +311,17 @@ st.markdown("---")
 #Tablica Axpro centrla
 
 if st.button("🔄 Dohvati podatke s centrale", type="primary", width='content'):
-    try:
-        with st.spinner("Dohvaćanje podataka s Axpro centrale..."):
-            df_axpro = get_axpro_data()
-    except Exception as e:
-        st.error(f"Greška pri dohvaćanju podataka s Axpro centrale: {e}")
-        df_axpro = None
+    st.session_state.prikazi_axpro = True
+if st.session_state.get("prikazi_axpro"):
+    df_axpro = get_axpro_data()
     if df_axpro is not None:
         st.subheader("Aktivne zone Axpro (alarm_status=1)")
         st.dataframe(df_axpro, width='stretch')
         if not df_axpro.empty:
+            # scanner briše alarme svojom sesijom, odmah po primitku zahtjeva
             if st.button("Očisti sve alarme na Axpro centralu", width='content'):
-                cookie = login_axpro()
-                if cookie:
-                    success = clear_axpro_alarms(cookie)
-                    if success:
-                        st.success("Uspješno očišćeni svi alarmi na Axpro centralu.")
-                    else:
-                        st.error("Neuspješno čišćenje alarma na Axpro centralu.")
-                else:
-                    st.error("Neuspješna prijava na Axpro centralu.")
+                zatrazi_clear()
+                st.success("Zahtjev za čišćenje alarma poslan scanneru.")
 st.caption("© 2024 by RM")
 
 #Reset centrale
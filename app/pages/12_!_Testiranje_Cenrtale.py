@@ -4,11 +4,23 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from module.pickers import picker
+from module.zone_groups import (
+    GRUPE,
+    ensure_group_columns,
+    list_kiosk_postavke,
+    set_kiosk_postavke,
+)
+from module.panel_channel import (
+    nepouzdana,
+    procitaj_snimku,
+    zatrazi_clear,
+    cekaj_izvrsenje,
+    SNAPSHOT_STALE_S,
+)
+
 try:
     from module.axpro_auth import (
-        login_axpro,
-        get_zone_status,
-        clear_axpro_alarms,
         HOST,
         USERNAME,
         PASSWORD,
@@ -46,6 +58,8 @@ if "sync_log" not in st.session_state:
     st.session_state.sync_log = []
 if "last_sync" not in st.session_state:
     st.session_state.last_sync = None
+if "sync_diff" not in st.session_state:
+    st.session_state.sync_diff = None
 
 
 def log_message(message, type="info"):
@@ -63,9 +77,11 @@ def get_zone_iz_baze():
             return pd.DataFrame()
 
         with sqlite3.connect(DB_PATH) as conn:
+            ensure_group_columns(conn)
             return pd.read_sql_query(
                 """
-                SELECT z.id, z.naziv, z.korisnik_id, k.ime as korisnik_ime
+                SELECT z.id, z.naziv, z.krilo, z.kat, z.stanica,
+                       z.korisnik_id, k.ime as korisnik_ime
                 FROM zone z
                 LEFT JOIN korisnici k ON z.korisnik_id = k.id
                 ORDER BY z.id
@@ -77,57 +93,66 @@ def get_zone_iz_baze():
         return pd.DataFrame()
 
 
+RESET_TIMEOUT = 30  # s čekanja da scanner izvrši reset (jedan ciklus + rezerva)
+
+
 def get_zone_status_detailed():
-    """Dohvati detaljan status zona s centrale (kao u testnoj stranici)"""
-    if not AXPRO_AVAILABLE:
+    """Zone iz zadnje snimke scannera (scanner jedini drži sesiju na centrali)"""
+    snimka = procitaj_snimku()
+    if snimka is None:
+        log_message("❌ Nema snimke centrale (radi li scan.py?)", "error")
+        st.error("❌ Nema snimke centrale. Radi li scan.py?")
         return None
 
-    try:
-        with st.spinner("🔄 Dohvaćam status zona..."):
-            cookie = login_axpro()
-            zones_data = get_zone_status(cookie)
-            zone_list = [z["Zone"] for z in zones_data.get("ZoneList", [])]
-            log_message(f"📊 Dohvaćen detaljan status {len(zone_list)} zona", "info")
-            return zone_list
-    except Exception as e:
-        log_message(f"❌ Greška pri dohvaćanju statusa zona: {e}", "error")
-        st.error(f"❌ Greška: {e}")
-        return None
+    starost = snimka["starost"]
+    if starost > SNAPSHOT_STALE_S:
+        st.warning(f"⚠️ Snimka je stara {starost:.0f} s. Radi li scan.py?")
+    else:
+        st.caption(f"🕒 Snimka stara {starost:.0f} s (osvježava scanner).")
+    if snimka.get("greska"):
+        st.warning(f"⚠️ Zadnja greška scannera: {snimka['greska']}")
+    zone_list = snimka.get("zone", [])
+    log_message(f"📊 Učitana snimka {len(zone_list)} zona (stara {starost:.0f} s)", "info")
+    return zone_list
 
 
 def reset_alarme_na_centrali():
-    """Resetiraj sve alarme na centrali (kao u testnoj stranici)"""
-    if not AXPRO_AVAILABLE:
-        return False, "Axpro moduli nisu dostupni"
-
-    try:
-        with st.spinner("🧹 Resetiram alarme..."):
-            cookie = login_axpro()
-            status, response_text = clear_axpro_alarms(cookie)
-            log_message(f"🧯 Alarmi resetirani (status: {status})", "success")
-            return True, response_text
-    except Exception as e:
-        log_message(f"❌ Greška pri resetiranju alarma: {e}", "error")
-        return False, str(e)
-
-
-def sinkroniziraj_zone():
-    """Sinkroniziraj zone s centrale u bazu"""
-    if not AXPRO_AVAILABLE:
-        return 0, 0, 0
-
+    """Zatraži od scannera reset alarma na centrali i pričekaj rezultat"""
+    zahtjev = zatrazi_clear(DB_PATH)
+    with st.spinner("🧹 Scanner resetira alarme..."):
+        naredba = cekaj_izvrsenje(zahtjev, RESET_TIMEOUT, DB_PATH)
+    if naredba is None:
+        log_message("⚠️ Scanner nije izvršio reset (radi li scan.py?)", "warning")
+        return False, "Scanner nije odgovorio; zahtjev ostaje na čekanju."
+    if not naredba.get("ok"):
+        log_message(f"❌ Greška pri resetiranju alarma: {naredba.get('odgovor')}", "error")
+        return False, str(naredba.get("odgovor"))
+    log_message(f"🧯 Alarmi resetirani (status: {naredba.get('status')})", "success")
+    return True, naredba.get("odgovor", "")
+
+
+def sinkroniziraj_zone(update_existing=False, obrisi_nepostojece=False):
+    """Sinkroniziraj zone iz snimke centrale u bazu"""
     try:
         with st.spinner("🔄 Sinkronizacija zona..."):
-            cookie = login_axpro()
-            zones_data = get_zone_status(cookie)
-            zone_list = [z["Zone"] for z in zones_data.get("ZoneList", [])]
+            # snimka se mogla zastarjeti između prikaza i klika
+            razlog = nepouzdana(procitaj_snimku())
+            if razlog:
+                log_message(f"⚠️ Sinkronizacija preskočena: {razlog}", "warning")
+                st.warning(f"⚠️ Sinkronizacija preskočena: {razlog}")
+                return 0, 0, 0
+            zone_list = get_zone_status_detailed()
 
             if not zone_list:
                 log_message("⚠️ Nema zona za sinkronizaciju", "warning")
                 return 0, 0, 0
 
             # Upiši u bazu
-            return upisi_zone_u_bazu([(z["id"], z["name"]) for z in zone_list])
+            return upisi_zone_u_bazu(
+                [(z["id"], z["name"]) for z in zone_list],
+                update_existing=update_existing,
+                obrisi_nepostojece=obrisi_nepostojece,
+            )
 
     except Exception as e:
         log_message(f"❌ Greška pri sinkronizaciji: {e}", "error")
@@ -135,8 +160,13 @@ def sinkroniziraj_zone():
         return 0, 0, 0
 
 
-def upisi_zone_u_bazu(zone_podaci, update_existing=False):
-    """Upiši zone u bazu podataka"""
+def upisi_zone_u_bazu(zone_podaci, update_existing=False, obrisi_nepostojece=False):
+    """Upiši zone u bazu podataka (skupno, jedna transakcija).
+
+    Zone s centrale idu u privremenu tablicu, a nove / preimenovane / uklonjene
+    se računaju joinom i primjenjuju jednim upitom po vrsti promjene.
+    Sažetak promjena sprema se u st.session_state.sync_diff.
+    """
     if not zone_podaci:
         log_message("⚠️ Nema zona za upis", "warning")
         return 0, 0, 0
@@ -148,10 +178,8 @@ def upisi_zone_u_bazu(zone_podaci, update_existing=False):
 
     try:
         with sqlite3.connect(DB_PATH) as conn:
-            cur = conn.cursor()
-
             # Osiguraj da postoji tablica zone
-            cur.execute(
+            conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS zone (
                     id INTEGER PRIMARY KEY, 
@@ -160,49 +188,111 @@ def upisi_zone_u_bazu(zone_podaci, update_existing=False):
                 )
             """
             )
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS zone_centrala (id INTEGER PRIMARY KEY, naziv TEXT NOT NULL)"
+            )
+            conn.execute("DELETE FROM zone_centrala")
+            conn.executemany(
+                "INSERT OR REPLACE INTO zone_centrala (id, naziv) VALUES (?, ?)",
+                [(int(zid), str(naziv)) for zid, naziv in zone_podaci],
+            )
 
-            nove_zone = 0
-            azurirane_zone = 0
-            neizmijenjene_zone = 0
-
-            for zona_id, naziv in zone_podaci:
-                cur.execute("SELECT naziv FROM zone WHERE id = ?", (zona_id,))
-                postojeca = cur.fetchone()
-
-                if not postojeca:
-                    # Nova zona
-                    cur.execute(
-                        "INSERT INTO zone (id, naziv) VALUES (?, ?)", (zona_id, naziv)
-                    )
-                    log_message(f"✅ Dodana nova zona: {zona_id} – {naziv}", "success")
-                    nove_zone += 1
+            # Razlika centrala <-> baza
+            nove = conn.execute(
+                """
+                SELECT c.id, c.naziv FROM zone_centrala c
+                LEFT JOIN zone z ON z.id = c.id
+                WHERE z.id IS NULL ORDER BY c.id
+                """
+            ).fetchall()
+            preimenovane = conn.execute(
+                """
+                SELECT c.id, z.naziv, c.naziv FROM zone_centrala c
+                JOIN zone z ON z.id = c.id
+                WHERE z.naziv IS NOT c.naziv ORDER BY c.id
+                """
+            ).fetchall()
+            uklonjene = conn.execute(
+                """
+                SELECT z.id, z.naziv, z.korisnik_id FROM zone z
+                LEFT JOIN zone_centrala c ON c.id = z.id
+                WHERE c.id IS NULL ORDER BY z.id
+                """
+            ).fetchall()
 
-                elif postojeca[0] != naziv and update_existing:
-                    # Ažuriraj postojeću zonu
-                    cur.execute(
-                        "UPDATE zone SET naziv = ? WHERE id = ?", (naziv, zona_id)
-                    )
-                    log_message(
-                        f"🔄 Ažurirana zona: {zona_id} – {postojeca[0]} → {naziv}",
-                        "info",
+            # Primjena: jedan upit po vrsti promjene
+            conn.execute(
+                """
+                INSERT INTO zone (id, naziv)
+                SELECT c.id, c.naziv FROM zone_centrala c
+                WHERE c.id NOT IN (SELECT id FROM zone)
+                """
+            )
+            if update_existing:
+                conn.execute(
+                    """
+                    UPDATE zone
+                    SET naziv = (SELECT c.naziv FROM zone_centrala c WHERE c.id = zone.id)
+                    WHERE id IN (
+                        SELECT c.id FROM zone_centrala c
+                        JOIN zone z ON z.id = c.id
+                        WHERE z.naziv IS NOT c.naziv
                     )
-                    azurirane_zone += 1
-
-                else:
-                    # Zona postoji i nije promijenjena
-                    neizmijenjene_zone += 1
-
+                    """
+                )
+            obrisane = 0
+            if obrisi_nepostojece:
+                # kao i ručno brisanje: samo zone bez dodijeljenog korisnika
+                obrisane = conn.execute(
+                    """
+                    DELETE FROM zone
+                    WHERE korisnik_id IS NULL
+                      AND id NOT IN (SELECT id FROM zone_centrala)
+                    """
+                ).rowcount
+            conn.execute("DELETE FROM zone_centrala")
             conn.commit()
 
-            if nove_zone == 0 and azurirane_zone == 0:
-                log_message("ℹ️ Sve zone već postoje u bazi", "info")
-            else:
-                log_message(
-                    f"🎯 Sinkronizacija završena: {nove_zone} novih, {azurirane_zone} ažuriranih",
-                    "success",
-                )
+        azurirane = len(preimenovane) if update_existing else 0
+        neizmijenjene = len(zone_podaci) - len(nove) - azurirane
+        diff = (
+            [{"promjena": "➕ nova", "id": zid, "naziv": naziv, "prije": None} for zid, naziv in nove]
+            + [
+                {
+                    "promjena": "🔄 preimenovana" if update_existing else "⚠️ drugi naziv (nije ažurirano)",
+                    "id": zid,
+                    "naziv": novi,
+                    "prije": stari,
+                }
+                for zid, stari, novi in preimenovane
+            ]
+            + [
+                {
+                    "promjena": (
+                        "🗑️ obrisana"
+                        if obrisi_nepostojece and kid is None
+                        else "❔ nema je na centrali"
+                    ),
+                    "id": zid,
+                    "naziv": naziv,
+                    "prije": None,
+                }
+                for zid, naziv, kid in uklonjene
+            ]
+        )
+        st.session_state.sync_diff = diff
+
+        if not nove and not azurirane and not obrisane:
+            log_message("ℹ️ Sve zone već postoje u bazi", "info")
+        else:
+            log_message(
+                f"🎯 Sinkronizacija završena: {len(nove)} novih, {azurirane} ažuriranih, {obrisane} obrisanih",
+                "success",
+            )
+        if uklonjene and not obrisi_nepostojece:
+            log_message(f"❔ {len(uklonjene)} zona u bazi nema na centrali", "warning")
 
-            return nove_zone, azurirane_zone, neizmijenjene_zone
+        return len(nove), azurirane, neizmijenjene
 
     except Exception as e:
         log_message(f"❌ Greška pri upisu u bazu: {e}", "error")
@@ -210,6 +300,29 @@ def upisi_zone_u_bazu(zone_podaci, update_existing=False):
         return 0, 0, 0
 
 
+def spremi_grupe_zona(df: pd.DataFrame) -> int:
+    """Spremi krilo/kat/stanicu zona iz editora; vrati broj promijenjenih zona."""
+    rows = [
+        tuple(
+            None if pd.isna(r[k]) or str(r[k]).strip() == "" else str(r[k]).strip()
+            for k in GRUPE
+        )
+        + (int(r["id"]),)
+        for _, r in df.iterrows()
+    ]
+    with sqlite3.connect(DB_PATH) as conn:
+        before = conn.total_changes
+        conn.executemany(
+            """
+            UPDATE zone SET krilo = ?, kat = ?, stanica = ?
+            WHERE id = ? AND NOT (krilo IS ? AND kat IS ? AND stanica IS ?)
+            """,
+            [r + r[:3] for r in rows],
+        )
+        conn.commit()
+        return conn.total_changes - before
+
+
 def obrisi_zonu_iz_baze(zona_id):
     """Obriši zonu iz baze"""
     try:
@@ -246,7 +359,7 @@ if not os.path.exists(DB_PATH):
     st.stop()
 
 if not AXPRO_AVAILABLE:
-    st.warning("⚠️ Axpro moduli nisu dostupni. Možete samo pregledavati postojeće zone.")
+    st.warning("⚠️ Axpro konfiguracija nije dostupna. Zone se i dalje čitaju iz snimke scannera.")
 
 # Tabs za organizaciju
 tab1, tab2, tab3 = st.tabs(
@@ -280,6 +393,9 @@ with tab1:
             column_config={
                 "id": st.column_config.NumberColumn("ID", width="small"),
                 "naziv": st.column_config.TextColumn("Naziv zone"),
+                "krilo": st.column_config.TextColumn("Krilo", width="small"),
+                "kat": st.column_config.TextColumn("Kat", width="small"),
+                "stanica": st.column_config.TextColumn("Stanica", width="small"),
                 "korisnik_id": st.column_config.NumberColumn(
                     "Korisnik ID", width="small"
                 ),
@@ -289,6 +405,49 @@ with tab1:
             hide_index=True,
         )
 
+        # Grupe zona: kiosk s ?stanica=... (ili ?kiosk=ime) prikazuje samo svoje zone
+        with st.expander("🏷️ Grupe zona (krilo / kat / stanica)"):
+            uredjene = st.data_editor(
+                zone_df[["id", "naziv", *GRUPE]],
+                disabled=["id", "naziv"],
+                hide_index=True,
+                width="stretch",
+                key="grupe_editor",
+            )
+            if st.button("💾 Spremi grupe"):
+                promijenjeno = spremi_grupe_zona(uredjene)
+                log_message(f"🏷️ Grupe ažurirane za {promijenjeno} zona", "info")
+                st.success(f"✅ Spremljeno ({promijenjeno} zona).")
+                st.rerun()
+
+        with st.expander("📟 Kiosk uređaji"):
+            st.caption(
+                "Tablet otvara kiosk s /?kiosk=<ime>; parametri iz URL-a imaju prednost."
+            )
+            with sqlite3.connect(DB_PATH) as conn:
+                uredjaji = list_kiosk_postavke(conn)
+            if uredjaji:
+                st.dataframe(
+                    pd.DataFrame(
+                        [{"uređaj": ime, **p} for ime, p in uredjaji.items()]
+                    ),
+                    hide_index=True,
+                    width="stretch",
+                )
+            with st.form("kiosk_uredjaj"):
+                ime = st.text_input("Ime uređaja", placeholder="npr. tablet-kat1")
+                cols = st.columns(len(GRUPE) + 1)
+                postavke = {
+                    k: cols[i].text_input(k.capitalize(), help="više vrijednosti odvojiti zarezom")
+                    for i, k in enumerate(GRUPE)
+                }
+                postavke["naslov"] = cols[-1].text_input("Naslov na kiosku")
+                if st.form_submit_button("💾 Spremi uređaj") and ime.strip():
+                    with sqlite3.connect(DB_PATH) as conn:
+                        set_kiosk_postavke(conn, ime.strip(), postavke)
+                    log_message(f"📟 Spremljene postavke kioska '{ime.strip()}'", "info")
+                    st.rerun()
+
         # Opcije za brisanje zona
         with st.expander("🗑️ Obriši zonu"):
             st.warning(
@@ -299,10 +458,11 @@ with tab1:
             if slobodne_zone.empty:
                 st.info("ℹ️ Nema slobodnih zona za brisanje.")
             else:
-                zona_za_brisanje = st.selectbox(
+                zona_za_brisanje = picker(
                     "Odaberi zonu za brisanje:",
-                    options=slobodne_zone["id"].tolist(),
-                    format_func=lambda x: f"Zona {x}: {slobodne_zone[slobodne_zone['id'] == x]['naziv'].iloc[0]}",
+                    slobodne_zone,
+                    "Zona {id}: {naziv}",
+                    key="zona_za_brisanje",
                 )
 
                 if st.button("🗑️ Obriši zonu", type="secondary"):
@@ -316,19 +476,31 @@ with tab2:
     if st.session_state.last_sync:
         st.info(f"⏰ Zadnja sinkronizacija: {st.session_state.last_sync}")
 
+    # zastarjela snimka bi "nepostojećima" proglasila zone koje centrala ima
+    razlog = nepouzdana(procitaj_snimku())
+    if razlog:
+        st.warning(f"⚠️ Sinkronizacija nije moguća: {razlog}. Radi li scan.py?")
+
     # Opcije sinkronizacije
     update_existing = st.checkbox(
         "📝 Ažuriraj postojeće zone",
         help="Ažuriraj nazive postojećih zona ako su promijenjeni na centrali",
     )
+    obrisi_nepostojece = st.checkbox(
+        "🗑️ Obriši zone kojih nema na centrali",
+        help="Brišu se samo zone bez dodijeljenog korisnika",
+        disabled=bool(razlog),
+    )
 
     # Gumb za sinkronizaciju
     if st.button(
         "🔄 Sinkroniziraj zone s centrale",
-        disabled=not AXPRO_AVAILABLE,
         width="stretch",
+        disabled=bool(razlog),
     ):
-        nove, azurirane, neizmijenjene = sinkroniziraj_zone()
+        nove, azurirane, neizmijenjene = sinkroniziraj_zone(
+            update_existing, obrisi_nepostojece
+        )
         st.session_state.last_sync = datetime.now().strftime("%d.%m.%Y %H:%M")
 
         if nove > 0 or azurirane > 0:
@@ -339,6 +511,15 @@ with tab2:
         else:
             st.info("ℹ️ Nema promjena.")
 
+    if st.session_state.sync_diff is not None:
+        st.markdown("**Razlika pri zadnjoj sinkronizaciji**")
+        if st.session_state.sync_diff:
+            st.dataframe(
+                pd.DataFrame(st.session_state.sync_diff), hide_index=True, width="stretch"
+            )
+        else:
+            st.caption("Baza i centrala su bile usklađene.")
+
 with tab3:
     st.subheader("🧪 Testiranje komunikacije s centralom")
 
@@ -354,7 +535,7 @@ with tab3:
                 st.write(f"**Password:** {'*' * len(PASSWORD)}")
 
     # Test konekcije i prikaz zona s detaljima (identično kao u testnoj stranici)
-    if st.button("🔌 Spoji se i prikaži zone", disabled=not AXPRO_AVAILABLE):
+    if st.button("🔌 Prikaži zone (snimka scannera)"):
         zone_list = get_zone_status_detailed()
         if zone_list:
             st.success(f"✅ Učitano {len(zone_list)} zona.")
@@ -376,7 +557,7 @@ with tab3:
     st.markdown("---")
     st.subheader("🧹 Resetiraj sve alarme na centrali")
 
-    if st.button("🧯 Resetiraj alarme", disabled=not AXPRO_AVAILABLE):
+    if st.button("🧯 Resetiraj alarme"):
         success, response = reset_alarme_na_centrali()
         if success:
             st.success("✅ Alarmi uspješno resetirani!")
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import sqlite3
 from admin import DB_PATH
+from module.admin_cache import cached_query
+from module.pickers import picker
+from module.korisnici_import import pripremi_uvoz, primijeni_uvoz, promjene, ucitaj_datoteku
 
 # Page configuration
 st.set_page_config(page_title="Korisnici", page_icon="👥", layout="wide")
@@ -25,17 +28,16 @@ st.subheader("👥 Upravljanje Korisnicima")
 def get_korisnici_data():
     """Dohvati korisnike s dodijeljenim narukvicama"""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            return pd.read_sql_query(
-                """
-                SELECT k.id AS korisnik_id, k.ime, k.soba,
-                       z.id AS zona_id, z.naziv AS zona_naziv
-                FROM korisnici k
-                LEFT JOIN zone z ON k.id = z.korisnik_id
-                ORDER BY k.ime
-            """,
-                conn,
-            )
+        return cached_query(
+            """
+            SELECT k.id AS korisnik_id, k.ime, k.soba,
+                   z.id AS zona_id, z.naziv AS zona_naziv
+            FROM korisnici k
+            LEFT JOIN zone z ON k.id = z.korisnik_id
+            ORDER BY k.ime
+        """,
+            db_path=DB_PATH,
+        )
     except Exception as e:
         st.error(f"Greška pri dohvaćanju korisnika: {e}")
         return pd.DataFrame()
@@ -44,16 +46,15 @@ def get_korisnici_data():
 def get_slobodne_narukvice():
     """Dohvati narukvice koje nisu dodijeljene nijednom korisniku"""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            return pd.read_sql_query(
-                """
-                SELECT z.id, z.naziv 
-                FROM zone z 
-                WHERE z.korisnik_id IS NULL
-                ORDER BY z.id
-            """,
-                conn,
-            )
+        return cached_query(
+            """
+            SELECT z.id, z.naziv
+            FROM zone z
+            WHERE z.korisnik_id IS NULL
+            ORDER BY z.id
+        """,
+            db_path=DB_PATH,
+        )
     except Exception as e:
         st.error(f"Greška pri dohvaćanju slobodnih narukvica: {e}")
         return pd.DataFrame()
@@ -141,6 +142,53 @@ def obrisi_korisnika(korisnik_id):
         return False
 
 
+# Skupni uvoz
+with st.expander("📥 Skupni uvoz korisnika (CSV / XLSX)"):
+    st.caption(
+        "Kolone: **ime** (obavezno), **soba**, **zona** (ID ili naziv zone). "
+        "Korisnik se prepoznaje po imenu, pa ponovni uvoz iste datoteke ne mijenja ništa."
+    )
+    datoteka = st.file_uploader("Datoteka", type=["csv", "xlsx"], key="uvoz_datoteka")
+    if datoteka is not None:
+        try:
+            uvoz_df = ucitaj_datoteku(datoteka, datoteka.name)
+            with sqlite3.connect(DB_PATH) as conn:
+                plan = pripremi_uvoz(conn, uvoz_df)
+        except ImportError as e:
+            st.error(f"❌ Za XLSX treba paket openpyxl: {e}")
+            plan = None
+        except Exception as e:
+            st.error(f"❌ Greška pri čitanju datoteke: {e}")
+            plan = None
+
+        if plan is not None:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("➕ Novi korisnici", len(plan["novi"]))
+            col2.metric("🛏️ Promjene sobe", len(plan["sobe"]))
+            col3.metric("🔗 Dodjele narukvica", len(plan["narukvice"]))
+            col4.metric("❌ Redci s greškom", plan["greske"])
+            st.dataframe(plan["pregled"], hide_index=True, width="stretch")
+
+            ima_promjena = bool(plan["novi"] or plan["sobe"] or plan["narukvice"])
+            if plan["greske"]:
+                st.warning("⚠️ Redci s greškom se preskaču; ostale promjene se mogu primijeniti.")
+            # primjenjuje se samo plan koji je korisnik vidio (prethodni prikaz)
+            prikazano = st.session_state.get("uvoz_prikazano")
+            st.session_state["uvoz_prikazano"] = promjene(plan)
+            if st.button("✅ Primijeni uvoz", disabled=not ima_promjena, type="primary"):
+                try:
+                    with sqlite3.connect(DB_PATH) as conn:
+                        rez = primijeni_uvoz(conn, uvoz_df, prikazano or promjene(plan))
+                    st.success(
+                        f"✅ Uvezeno: {rez['novi']} novih, {rez['sobe']} promjena sobe, "
+                        f"{rez['narukvice']} dodjela narukvica."
+                    )
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Uvoz nije proveden (ništa nije upisano): {e}")
+            elif not ima_promjena:
+                st.info("ℹ️ Baza je već usklađena s datotekom.")
+
 # Main content
 korisnici_df = get_korisnici_data()
 slobodne_narukvice_df = get_slobodne_narukvice()
@@ -297,12 +345,10 @@ else:
                     elif len(slobodne_narukvice_df) > 0:
                         col1, col2 = st.columns([3, 1])
                         with col1:
-                            selected_narukvica = st.selectbox(
+                            selected_narukvica = picker(
                                 "Odaberi slobodnu narukvicu:",
-                                options=slobodne_narukvice_df["id"].tolist(),
-                                format_func=lambda x: slobodne_narukvice_df[
-                                    slobodne_narukvice_df["id"] == x
-                                ]["naziv"].iloc[0],
+                                slobodne_narukvice_df,
+                                "{naziv}",
                                 key=f"select_narukvica_{korisnik_id}",
                             )
                         with col2:
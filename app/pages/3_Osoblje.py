@@ -1,7 +1,7 @@
 import streamlit as st
 import sqlite3
-import pandas as pd
 from admin import DB_PATH
+from module.admin_cache import cached_query
 
 st.set_page_config(page_title="Osoblje", layout="centered")
 st.markdown("""
@@ -17,9 +17,7 @@ st.caption("Dodavanje, uređivanje i brisanje djelatnika koji potvrđuju alarme
 
 # -------------------- Funkcija za dohvat osoblja --------------------
 def get_osoblje():
-    with sqlite3.connect(DB_PATH) as conn:
-        df = pd.read_sql_query("SELECT * FROM osoblje", conn)
-    return df
+    return cached_query("SELECT * FROM osoblje", tablice=("osoblje",), db_path=DB_PATH)
 
 # -------------------- Dodavanje novog osoblja --------------------
 with st.expander("➕ Dodaj novo osoblje"):
@@ -118,6 +118,7 @@ with col1:
         ok = set_comm_value(COMM_KEY, selected)
         if ok:
             st.success(f"Spremljeno: key='{COMM_KEY}', value='{selected}'")
+            st.caption("Kiosk preuzima novi ton u roku od nekoliko sekundi, bez restarta.")
 with col2:
     # Prikaži trenutno spremljeni naziv iz baze
     refreshed = get_comm_value(COMM_KEY) or ""
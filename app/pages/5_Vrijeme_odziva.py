@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import pandas as pd
+import streamlit as st
+from datetime import date, timedelta
+from admin import DB_PATH
+from module.admin_cache import cached_query
+from module.zone_groups import ensure_group_columns
+from module.response_times import (
+    GRUPIRANJA,
+    SLA_S,
+    SQL_ODZIVI,
+    dodaj_dimenzije,
+    statistika_odziva,
+    ukupno,
+)
+
+st.set_page_config(page_title="Vrijeme odziva", page_icon="⏱️", layout="wide")
+st.markdown(
+    """
+    <style>
+        div[data-testid="stToolbar"] button {
+            display: none !important;
+        }
+    </style>
+""",
+    unsafe_allow_html=True,
+)
+
+st.title("⏱️ Vrijeme odziva na alarme")
+st.caption("Koliko su štićenici čekali: od alarma do potvrde osoblja. Samo potvrđeni alarmi.")
+
+
+# -------------------- Razdoblje i parametri --------------------
+def prethodni_mjesec() -> tuple[date, date]:
+    prvi_ovaj = date.today().replace(day=1)
+    return (prvi_ovaj - timedelta(days=1)).replace(day=1), prvi_ovaj - timedelta(days=1)
+
+
+col1, col2, col3 = st.columns([2, 1, 1])
+with col1:
+    razdoblje = st.date_input("Razdoblje", value=prethodni_mjesec(), format="DD.MM.YYYY")
+with col2:
+    sla_min = st.number_input("SLA (min)", min_value=0.5, value=SLA_S / 60, step=0.5)
+with col3:
+    po = st.selectbox("Grupiraj po", list(GRUPIRANJA))
+
+if not isinstance(razdoblje, tuple) or len(razdoblje) != 2:
+    st.info("Odaberi početni i završni datum.")
+    st.stop()
+
+od, do = razdoblje
+sla_s = sla_min * 60
+if not os.path.exists(DB_PATH):
+    st.error("❌ Baza ne postoji.")
+    st.stop()
+try:
+    # SQL_ODZIVI čita zone.krilo i zone.stanica, kojih na starijoj bazi nema
+    with sqlite3.connect(DB_PATH) as conn:
+        ensure_group_columns(conn)
+    df = dodaj_dimenzije(
+        cached_query(
+            SQL_ODZIVI,
+            (od.strftime("%Y-%m-%d"), (do + timedelta(days=1)).strftime("%Y-%m-%d")),
+            db_path=DB_PATH,
+        )
+    )
+except (sqlite3.Error, pd.errors.DatabaseError) as e:
+    st.error(f"❌ Greška pri čitanju baze: {e}")
+    st.stop()
+
+if df.empty:
+    st.info("Nema potvrđenih alarma u odabranom razdoblju.")
+    st.stop()
+
+
+# -------------------- Ukupno --------------------
+def min_s(sekunde: float) -> str:
+    return f"{int(sekunde // 60)}:{int(sekunde % 60):02d}"
+
+
+u = ukupno(df, sla_s)
+m = st.columns(6)
+m[0].metric("Alarma", f"{int(u['broj'])}")
+m[1].metric("p50", min_s(u["p50"]))
+m[2].metric("p90", min_s(u["p90"]))
+m[3].metric("p99", min_s(u["p99"]))
+m[4].metric("Max", min_s(u["max"]))
+m[5].metric("Preko SLA", f"{int(u['prekoracenja'])} ({u['udio_prekoracenja']:.0%})")
+
+# -------------------- Po grupama --------------------
+st.markdown("---")
+st.subheader(f"📊 Po: {po.lower()}")
+
+stat = statistika_odziva(df, GRUPIRANJA[po], sla_s)
+if po != "Sat u danu":
+    stat = stat.sort_values("p90", ascending=False)
+prikaz = stat.rename(
+    columns={
+        "grupa": po,
+        "broj": "Alarma",
+        "prosjek": "Prosjek (s)",
+        "max": "Max (s)",
+        "p50": "p50 (s)",
+        "p90": "p90 (s)",
+        "p99": "p99 (s)",
+        "prekoracenja": "Preko SLA",
+        "udio_prekoracenja": "Udio preko SLA",
+    }
+)
+st.dataframe(
+    prikaz,
+    width="stretch",
+    hide_index=True,
+    column_config={
+        "Udio preko SLA": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1),
+        **{k: st.column_config.NumberColumn(format="%.0f") for k in ("Prosjek (s)", "Max (s)", "p50 (s)", "p90 (s)", "p99 (s)")},
+    },
+)
+st.bar_chart(stat.set_index("grupa")[["p50", "p90", "p99"]], y_label="sekunde")
+
+st.download_button(
+    "⬇️ Preuzmi CSV",
+    stat.to_csv(index=False).encode("utf-8"),
+    file_name=f"odziv_{po.lower().replace(' ', '_')}_{od:%Y%m%d}_{do:%Y%m%d}.csv",
+    mime="text/csv",
+)
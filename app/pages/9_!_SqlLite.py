@@ -7,6 +7,9 @@ from datetime import datetime
 import pandas as pd
 import streamlit as st
 from admin import DB_PATH
+from module.db_stats import get_db_stats, get_row_count
+from module.zone_journal import ensure_journal
+from module.db_changes import ensure_change_triggers
 
 # ====================== PAGE CONFIG & STYLES ======================
 st.set_page_config(
@@ -46,6 +49,9 @@ REQUIRED_TABLES = {
         "last_alarm_time",
         "cooldown_until_epoch",
         "cooldown_until",
+        "krilo",
+        "kat",
+        "stanica",
     },
     "alarms": {
         "id",
@@ -57,6 +63,7 @@ REQUIRED_TABLES = {
         "korisnik",
         "soba",
         "osoblje",
+        "ponavljanja",
     },
     "comm": {"key", "value"},
 }
@@ -82,6 +89,10 @@ TYPE_MAP = {
     "value": "INTEGER DEFAULT 0",
     "cooldown_until_epoch": "INTEGER DEFAULT 0",
     "cooldown_until": "TEXT DEFAULT NULL",
+    "ponavljanja": "INTEGER DEFAULT 0",
+    "krilo": "TEXT DEFAULT NULL",
+    "kat": "TEXT DEFAULT NULL",
+    "stanica": "TEXT DEFAULT NULL",
 }
 
 
@@ -142,6 +153,16 @@ INDEX_DEFS = [
         "zone",
         "CREATE INDEX IF NOT EXISTS ix_zone_korisnik_id ON zone(korisnik_id)",
     ),
+    (
+        "ix_zone_stanica",
+        "zone",
+        "CREATE INDEX IF NOT EXISTS ix_zone_stanica ON zone(stanica)",
+    ),
+    (
+        "ix_zone_krilo_kat",
+        "zone",
+        "CREATE INDEX IF NOT EXISTS ix_zone_krilo_kat ON zone(krilo, kat)",
+    ),
     (
         "ux_osoblje_sifra",
         "osoblje",
@@ -251,7 +272,10 @@ def ensure_table(conn: sqlite3.Connection, name: str) -> bool:
                 alarm_status INTEGER DEFAULT 0,
                 last_updated TEXT DEFAULT NULL,
                 last_alarm_time TEXT DEFAULT NULL,
-                cooldown_until_epoch INTEGER DEFAULT 0
+                cooldown_until_epoch INTEGER DEFAULT 0,
+                krilo TEXT DEFAULT NULL,
+                kat TEXT DEFAULT NULL,
+                stanica TEXT DEFAULT NULL
             )
         """
         )
@@ -268,7 +292,8 @@ def ensure_table(conn: sqlite3.Connection, name: str) -> bool:
                 vrijemePotvrde TEXT,
                 korisnik TEXT,
                 soba TEXT,
-                osoblje TEXT
+                osoblje TEXT,
+                ponavljanja INTEGER DEFAULT 0
             )
         """
         )
@@ -329,10 +354,10 @@ def ensure_indexes(conn: sqlite3.Connection) -> list[str]:
     return created
 
 
-def get_table_stats(conn: sqlite3.Connection, table_name: str) -> int:
+def get_table_stats(table_name: str) -> int:
+    """Broj zapisa iz keširane dbstat statistike (bez COUNT(*) po tablici)."""
     try:
-        cur = conn.execute(f"SELECT COUNT(*) FROM {table_name}")
-        return int(cur.fetchone()[0])
+        return get_row_count(table_name, DB_PATH)
     except Exception:
         return 0
 
@@ -478,6 +503,16 @@ with tab1:
             if not created_idx:
                 logs.append("[INDEX] Nema novih indeksa — svi već postoje.")
 
+            # 4) Journal prijelaza zona (append-only) + snapshotovi
+            if not table_info(conn, "zone_journal"):
+                ensure_journal(conn)
+                conn.commit()
+                logs.append(f"[TABLE] Kreiran journal zona: zone_journal, zone_snapshot (DB: {DB_PATH})")
+
+            # 5) Triggeri brojača promjena (kiosk po njima osvježava cache osoblja)
+            for trg in ensure_change_triggers(conn):
+                logs.append(f"[TRIGGER] Kreiran trigger: {trg} (DB: {DB_PATH})")
+
         # Rezime
         if created_tables:
             logs.append(
@@ -521,7 +556,7 @@ with tab2:
                     with colA:
                         st.markdown(f"#### 📄 `{selected}`")
                     with colB:
-                        st.metric("Broj zapisa", get_table_stats(conn, selected))
+                        st.metric("Broj zapisa", get_table_stats(selected))
 
                     df = get_table_data(conn, selected)
                     if df.empty:
@@ -557,20 +592,60 @@ with tab3:
     if not exists:
         st.warning("⚠️ Baza ne postoji.")
     else:
-        with connect() as conn:
-            tnames = get_table_names(conn)
-            if tnames:
-                rows = [
-                    {"Tablica": t, "Broj zapisa": get_table_stats(conn, t)}
-                    for t in tnames
-                ]
-                df_sizes = pd.DataFrame(rows)
-                c1, c2 = st.columns([2, 1])
-                with c1:
-                    st.dataframe(df_sizes, width='stretch', hide_index=True)
-                with c2:
-                    if not df_sizes.empty and df_sizes["Broj zapisa"].sum() > 0:
-                        st.bar_chart(df_sizes.set_index("Tablica")["Broj zapisa"])
+        try:
+            stats = get_db_stats(DB_PATH)
+        except Exception as e:
+            stats = None
+            st.error(f"Greška pri čitanju statistike baze: {e}")
+        if stats:
+            s1, s2, s3, s4 = st.columns(4)
+            with s1:
+                st.metric("📄 Veličina stranice", f"{stats['page_size']} B")
+            with s2:
+                st.metric("📚 Broj stranica", stats["page_count"])
+            with s3:
+                st.metric("🕳️ Slobodne stranice", stats["freelist_count"])
+            with s4:
+                st.metric("📝 WAL (KB)", f"{stats['wal_bytes'] / 1024:.1f}")
+            if not stats["dbstat"]:
+                st.info(
+                    "ℹ️ SQLite nema dbstat modul — broj zapisa je procjena iz sqlite_stat1 (pokreni ANALYZE)."
+                )
+
+            df_sizes = pd.DataFrame(stats["tablice"]).rename(
+                columns={
+                    "tablica": "Tablica",
+                    "zapisa": "Broj zapisa",
+                    "bajtovi_tablica": "Tablica (B)",
+                    "bajtovi_indeksi": "Indeksi (B)",
+                    "broj_indeksa": "Broj indeksa",
+                    "bajtovi_ukupno": "Ukupno (B)",
+                }
+            )
+            c1, c2 = st.columns([2, 1])
+            with c1:
+                st.dataframe(df_sizes, width='stretch', hide_index=True)
+            with c2:
+                if not df_sizes.empty and df_sizes["Ukupno (B)"].sum() > 0:
+                    st.bar_chart(
+                        df_sizes.set_index("Tablica")[["Tablica (B)", "Indeksi (B)"]]
+                    )
+
+            with st.expander("🔬 Detalji po tablici i indeksu (dbstat)"):
+                df_obj = pd.DataFrame(stats["objekti"]).rename(
+                    columns={
+                        "naziv": "Naziv",
+                        "tip": "Tip",
+                        "tablica": "Tablica",
+                        "zapisa": "Zapisa",
+                        "procjena_stat1": "Procjena (stat1)",
+                        "stranice": "Stranica",
+                        "bajtovi": "Bajtova",
+                        "neiskoristeno_pct": "Neiskorišteno %",
+                        "fragmentacija_pct": "Fragmentacija %",
+                    }
+                )
+                st.dataframe(df_obj, width='stretch', hide_index=True)
 
         st.markdown("#### 🧹 VACUUM + ANALYZE (s izvještajem)")
         if st.button("Pokreni i prikaži uštedu", width='stretch'):
@@ -589,11 +664,14 @@ with tab3:
         with connect() as conn:
             tnames = get_table_names(conn)
             if "alarms" in tnames:
-                alarms_df = get_table_data(conn, "alarms")
-                if not alarms_df.empty:
+                total = get_table_stats("alarms")
+                if total:
+                    # nepotvrđeni idu preko ix_alarms_potvrda_vrijeme, ukupno iz dbstat
+                    nepotvrdeni = conn.execute(
+                        "SELECT COUNT(*) FROM alarms WHERE potvrda = 0"
+                    ).fetchone()[0]
                     a1, a2, a3 = st.columns(3)
-                    total = len(alarms_df)
-                    confirmed = int((alarms_df["potvrda"] == 1).sum())
+                    confirmed = total - int(nepotvrdeni)
                     with a1:
                         st.metric("Ukupno alarma", total)
                     with a2:
@@ -603,11 +681,12 @@ with tab3:
                 else:
                     st.info("Nema podataka o alarmima.")
             if "zone" in tnames:
-                zone_df = get_table_data(conn, "zone")
-                if not zone_df.empty:
+                total_zones = get_table_stats("zone")
+                if total_zones:
                     z1, z2 = st.columns(2)
-                    total_zones = len(zone_df)
-                    assigned = int(zone_df["korisnik_id"].notna().sum())
+                    assigned = int(
+                        conn.execute("SELECT COUNT(korisnik_id) FROM zone").fetchone()[0]
+                    )
                     with z1:
                         st.metric("Ukupno narukvica", total_zones)
                         st.metric("Dodijeljene narukvice", assigned)
@@ -10,6 +10,16 @@ from module.axpro_auth import (
     HOST,
     USERNAME,
 )
+from module.zone_journal import append_transitions, compact_journal, IZVOR_CENTRALA
+from module import engine_client
+from module.cooldown import ensure_cooldown_columns
+from module import metrics
+from module.panel_channel import (
+    spremi_snimku,
+    preuzmi_zahtjev,
+    potvrdi_zahtjev,
+    cekaj_zahtjev,
+)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "data", "alarmni_sustav.db")
@@ -19,43 +29,121 @@ TIME_FMT = "%Y-%m-%d %H:%M:%S"
 
 SLEEP_TIME_AFTER_RESET = 5  # sekundi nakon reseta centrale
 REFRESH_INTERVAL = 10  # sekundi između osvježavanja aktivnih alarma
+JOURNAL_COMPACT_INTERVAL = 6 * 3600  # sekundi između sažimanja journala zona
+
+# ------------------ METRIKE ------------------
+poll_ms = metrics.Mjerenja()  # trajanje get_zone_status
+stanje = {
+    "prijavljen": False,
+    "aktivnih": 0,  # aktivnih zona u zadnjem čitanju
+    "zadnji_poll": None,  # epoch zadnjeg uspješnog čitanja centrale
+    "zadnja_greska": None,
+    "zadnja_greska_vrijeme": None,
+    "broj_gresaka": 0,
+    "lock_cekanja": 0,
+}
+
+
+def zabiljezi_gresku(e: BaseException) -> None:
+    stanje["zadnja_greska"] = str(e)
+    stanje["zadnja_greska_vrijeme"] = time.time()
+    stanje["broj_gresaka"] += 1
+    if metrics.je_zakljucano(e):
+        stanje["lock_cekanja"] += 1
+
+
+def zapisi_metrike() -> None:
+    try:
+        metrics.zapisi("scanner", {**stanje, "poll_ms": poll_ms.sazetak()})
+    except OSError as e:
+        print(f"[metrike] Upozorenje: {e}")
+
 
 def poll_zones_df(cookie) -> pd.DataFrame:
     """Uzima cookie od prijave na AXPRO centralu. \n 
     Vrati df: id(int), name(txt), alarm (bool).\n
-    za koje "alarm" = 1. Ako nema aktivnih vrati prazan df."""
+    za koje "alarm" = 1. Ako nema aktivnih vrati prazan df.\n
+    Sve zone sprema i u snimku centrale za admin stranice (panel_channel)."""
+    t0 = time.perf_counter()
     data = get_zone_status(cookie)
+    poll_ms.dodaj((time.perf_counter() - t0) * 1000)
     zone_list = [z["Zone"] for z in data.get("ZoneList", [])]
+    spremi_snimku(zone_list)
+    stanje["zadnji_poll"] = time.time()
     df = pd.DataFrame(zone_list, columns=["id", "name", "alarm"])
     df["alarm"] = df["alarm"].apply(lambda x: int(x) == 1 if x is not None else False)
     #test makni kasnije
     return df[df["alarm"]].reset_index(drop=True)
 
-def sync_active_and_reset(cookie) -> int:
-    """Upiše aktivne zone u tablicu db.zone i resetira centralu. Vraća broj upisanih u db.zone."""
-    df = poll_zones_df(cookie)
-    if df.empty:
-        return 0
+def upisi_aktivne_zone(df: pd.DataFrame) -> None:
+    """Izravan upis aktivnih zona u db.zone (kad engine ne radi).
 
+    Zone koje već alarmiraju se ne upisuju ponovno; njihova aktivacija se samo
+    broji na otvorenom alarmu zone (alarms.ponavljanja), kao u engineu. Cooldown s odgođenim
+    alarmom radi samo engine, pa se ovdje nijedna nova aktivacija ne potiskuje.
+    """
     now_txt = datetime.now().strftime(TIME_FMT)
+    ids = [int(z) for z in df["id"].tolist()]
     with sqlite3.connect(DB_PATH) as conn:
         cur = conn.cursor()
         # upsert naziva vidi ali je potrebno
         cur.executemany(
             "INSERT INTO zone (id, naziv) VALUES (?, ?) "
-            "ON CONFLICT(id) DO UPDATE SET naziv=excluded.naziv",
+            "ON CONFLICT(id) DO UPDATE SET naziv=excluded.naziv WHERE naziv IS NOT excluded.naziv",
             list(df[["id", "name"]].itertuples(index=False, name=None)),
         )
 
+        oznake = ",".join("?" * len(ids))
+        zauzete = {
+            r[0]
+            for r in cur.execute(
+                f"SELECT id FROM zone WHERE id IN ({oznake}) AND alarm_status = 1",
+                ids,
+            )
+        }
+        nove = [z for z in ids if z not in zauzete]
+
         # postavi aktivno stanje i vremena
         cur.executemany(
             "UPDATE zone SET alarm_status=1, last_alarm_time=? WHERE id=?",
-            [(now_txt, int(zid)) for zid in df["id"].tolist()],
+            [(now_txt, zid) for zid in nove],
+        )
+        cur.executemany(
+            "UPDATE alarms SET ponavljanja = COALESCE(ponavljanja, 0) + 1 "
+            "WHERE id = (SELECT MAX(id) FROM alarms WHERE zone_id = ? AND potvrda = 0)",
+            [(zid,) for zid in zauzete],
         )
+        append_transitions(conn, nove, 1, IZVOR_CENTRALA)
         conn.commit()
 
-   
-    # reset centrale i kratko pričeka
+
+def sync_active_and_reset(cookie) -> int:
+    """Upiše aktivne zone u tablicu db.zone i resetira centralu. Vraća broj upisanih u db.zone."""
+    df = poll_zones_df(cookie)
+    stanje["aktivnih"] = len(df)
+    if df.empty:
+        return 0
+
+    rez = engine_client.posalji(
+        {
+            "cmd": "zone_alarm",
+            "zone_ids": [int(z) for z in df["id"]],
+            "nazivi": {int(z): str(n) for z, n in df[["id", "name"]].itertuples(index=False, name=None)},
+            "status": 1,
+            "izvor": IZVOR_CENTRALA,
+        }
+    )
+    # engine upisuje zone, journal i alarme u jednoj transakciji; bez njega izravan upis
+    if rez is None:
+        upisi_aktivne_zone(df)
+    elif not rez.get("ok"):
+        # upis nije potvrđen: centrala se ne resetira, pa sljedeće čitanje vidi
+        # iste zone i šalje ih ponovno (engine ponavljanje spaja u otvoreni alarm).
+        # Izravan upis bi istu naredbu mogao primijeniti dvaput.
+        print(f"[scan] ⚠️ Engine: {rez.get('greska')}; centrala se ne resetira, ponovno u sljedećem ciklusu")
+        return 0
+
+    # reset centrale (tek nakon potvrđenog upisa) i kratko pričeka
     try:
         clear_axpro_alarms(cookie)
     except Exception as e:
@@ -63,33 +151,73 @@ def sync_active_and_reset(cookie) -> int:
     time.sleep(SLEEP_TIME_AFTER_RESET)
     return len(df)
 
+
+def izvrsi_zahtjeve(cookie) -> None:
+    """Izvrši brisanje alarma koje je zatražila admin stranica (istom sesijom)."""
+    zahtjev = preuzmi_zahtjev(DB_PATH)
+    if zahtjev is None:
+        return
+    naredba = {"naredba": "clear", "zahtjev": zahtjev, "vrijeme": time.time()}
+    try:
+        status, odgovor = clear_axpro_alarms(cookie)
+        naredba.update(status=status, odgovor=odgovor, ok=status == 200)
+    except Exception as e:
+        naredba.update(status=None, odgovor=str(e), ok=False)
+    spremi_snimku(naredba=naredba)
+    potvrdi_zahtjev(zahtjev, DB_PATH)
+    print(f"[admin] Brisanje alarma na zahtjev: {'✅' if naredba['ok'] else '❌'} {naredba['status']}")
+
+
 # ------------------ GLAVNA PETLJA ------------------
 
 
 def main():
     cookie = None
+    zadnje_sazimanje = 0.0
+    with sqlite3.connect(DB_PATH) as conn:
+        ensure_cooldown_columns(conn)
     while True:
+        if time.time() - zadnje_sazimanje > JOURNAL_COMPACT_INTERVAL:
+            try:
+                obrisano = compact_journal(DB_PATH)
+                if obrisano:
+                    print(f"[journal] Sažeto {obrisano} starih prijelaza u snapshot.")
+            except Exception as e:
+                print(f"[journal] Upozorenje: {e}")
+                zabiljezi_gresku(e)
+            zadnje_sazimanje = time.time()
         try:
             # login ili relogin po potrebi
             if not cookie:
                 cookie = login_axpro(HOST, USERNAME)
                 if cookie:
                     print("[login] ✅ Autoriziran")
+                    stanje["prijavljen"] = True
                 else:
                     print("[login] ❌ Neuspjela prijava")
+                    spremi_snimku(greska="Neuspjela prijava na centralu")
+                    stanje["prijavljen"] = False
+                    zapisi_metrike()
                     time.sleep(REFRESH_INTERVAL)
                     continue
 
+            izvrsi_zahtjeve(cookie)
+
             upisano = sync_active_and_reset(cookie)
             if upisano:
                 print(f"[scan] ✅ Upisano {upisano} aktivnih zona i resetirana centrala.")
-            else:
+            elif not stanje["aktivnih"]:
                 print("[scan] — Nema aktivnih zona.")
 
         except Exception as e:
             print(f"[scan] ❌ Greška: {e}. Pokušavam relogin…")
+            spremi_snimku(greska=str(e))
+            zabiljezi_gresku(e)
+            stanje["prijavljen"] = False
             cookie = None  # forsiraj novi login
-        time.sleep(REFRESH_INTERVAL)
+        zapisi_metrike()
+        # zahtjev s admin stranice prekida čekanje
+        cekaj_zahtjev(REFRESH_INTERVAL, DB_PATH)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+// Klijentski dio kioska: zvuk alarma, sat i proteklo vrijeme na karticama.
+// Učitava se jednom kao <script> s otiskom u URL-u (browser ga kešira), a
+// server nakon toga šalje samo podatke, npr. kiosk.play() ili kiosk.sat(ms).
+(function () {
+  if (window.kiosk) return;
+
+  const audio = () => document.getElementById('alarm-audio');
+
+  // ------------------ ZVUK ------------------
+  // prvo Fully Kiosk API (nema ograničenja autoplaya), inače HTML5 audio
+  // s "muted autoplay -> unmute" trikom
+  function playHtml5() {
+    const a = audio();
+    if (!a) return false;
+    try {
+      a.pause();          // očisti prethodno stanje
+      a.currentTime = 0;  // od početka
+      a.muted = true;     // start u muted modu (autoplay dopušten)
+      const p = a.play();
+
+      // kad krene svirati, odmah ga odmute-aj
+      const unmute = () => { try { a.muted = false; } catch (e) {} };
+      a.addEventListener('playing', unmute, { once: true });
+      // fallback ako 'playing' ne dođe dovoljno brzo
+      setTimeout(unmute, 80);
+
+      if (p && typeof p.catch === 'function') p.catch(() => {});
+      return true;
+    } catch (e) {
+      return false;
+    }
+  }
+
+  function play() {
+    const a = audio();
+    // Fully Kiosk Browser svira bez ikakvog gesta, ali ne prima data: URI,
+    // pa dobiva URL iz data-url (isti zvuk kao ugrađeni izvor elementa)
+    const src = a ? (a.dataset.url || a.currentSrc || a.src) : null;
+    if (typeof fully !== 'undefined' && fully.playSound && src && !src.startsWith('data:')) {
+      try { fully.playSound(src); return true; } catch (e) {}
+    }
+    return playHtml5();
+  }
+
+  function stop() {
+    if (typeof fully !== 'undefined' && fully.stopSound) {
+      try { fully.stopSound(); } catch (e) {}
+    }
+    const a = audio();
+    if (a) { try { a.pause(); } catch (e) {} }
+  }
+
+  // zamjena zvuka bez prekida: novi izvor se prvo učita u zasebni Audio,
+  // a tek kad je spreman prebaci se na element (stari zvuk svira do tada)
+  function switchSound(src, url) {
+    const a = audio();
+    if (!a || !src) return;
+    if (url) a.dataset.url = url;
+    const pre = new Audio();
+    pre.preload = 'auto';
+    pre.addEventListener('canplaythrough', () => {
+      const svira = !a.paused;
+      a.src = src;
+      a.load();
+      if (svira) play();
+    }, { once: true });
+    pre.src = src;
+    pre.load();
+  }
+
+  // ------------------ SAT ------------------
+  // sat i "⏱️ N min" na karticama tika preglednik; pomak sata tableta se
+  // ispravlja prema serverskom vremenu koje stranica pošalje pri učitavanju
+  let pomak = 0;
+  let tikalo = null;
+  const dd = (n) => String(n).padStart(2, '0');
+
+  function tick() {
+    const sad = Date.now() + pomak;
+    const d = new Date(sad);
+    const sat = `${dd(d.getDate())}.${dd(d.getMonth() + 1)}.${d.getFullYear()} 🕒 ${dd(d.getHours())}:${dd(d.getMinutes())}`;
+    document.querySelectorAll('.js-sat').forEach((el) => {
+      if (el.textContent !== sat) el.textContent = sat;
+    });
+    document.querySelectorAll('.js-proteklo[data-od]').forEach((el) => {
+      const min = Math.max(0, Math.floor((sad - Number(el.dataset.od)) / 60000));
+      const txt = `⏱️ ${min} min`;
+      if (el.textContent !== txt) el.textContent = txt;
+    });
+  }
+
+  function sat(serverMs) {
+    pomak = serverMs - Date.now();
+    tick();
+    if (tikalo === null) tikalo = setInterval(tick, 1000);
+  }
+
+  window.kiosk = { play, stop, switchSound, sat, tick };
+})();
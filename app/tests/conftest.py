@@ -0,0 +1,22 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# testovi importaju kao aplikacija: "from module..." iz mape app/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.config import ensure_table  # noqa: E402
+from module.cooldown import ensure_cooldown_columns  # noqa: E402
+
+
+@pytest.fixture
+def baza(tmp_path) -> str:
+    """Prazna baza sa svim tablicama aplikacije."""
+    putanja = str(tmp_path / "alarmni_sustav.db")
+    with sqlite3.connect(putanja) as conn:
+        for t in ("osoblje", "korisnici", "zone", "alarms", "comm"):
+            ensure_table(conn, t)
+        ensure_cooldown_columns(conn)
+    return putanja
@@ -0,0 +1,117 @@
+import queue
+import sqlite3
+import time
+
+import pytest
+
+from module.cooldown import CooldownTracker
+
+
+# ------------------ CooldownTracker ------------------
+def test_istekli_vraca_potisnute_i_brise_rok():
+    t = CooldownTracker()
+    t.zapocni(1, 100)
+    t.zapocni(2, 200)
+    t.potisni(1)
+    t.potisni(1)
+    assert t.aktivan(1, sad=50) and not t.aktivan(1, sad=100)
+    assert t.sljedeci_rok() == 100
+    assert t.istekli(sad=150) == [(1, 2)]
+    assert t.sljedeci_rok() == 200
+    assert t.istekli(sad=150) == []
+
+
+def test_novi_rok_preskace_zastarjeli_unos_u_heapu():
+    t = CooldownTracker()
+    t.zapocni(1, 100)
+    t.potisni(1)
+    t.zapocni(1, 300)  # novi rok briše brojač i zamjenjuje stari unos
+    assert t.istekli(sad=200) == []
+    assert t.sljedeci_rok() == 300
+    assert t.istekli(sad=300) == [(1, 0)]
+
+
+def test_isti_rok_ne_brise_potisnute():
+    t = CooldownTracker()
+    t.zapocni(1, 100)
+    t.potisni(1)
+    t.zapocni(1, 100)  # ponovno učitavanje istog roka iz baze
+    assert t.istekli(sad=100) == [(1, 1)]
+
+
+def test_snimka_i_vrati():
+    t = CooldownTracker()
+    t.zapocni(1, 100)
+    t.potisni(1)
+    snimka = t.snimka()
+    t.istekli(sad=100)
+    t.vrati(snimka)
+    assert t.istekli(sad=100) == [(1, 1)]
+
+
+# ------------------ engine: odgođeni alarm ------------------
+@pytest.fixture
+def engine(baza):
+    import engine as engine_modul
+
+    with sqlite3.connect(baza) as conn:
+        conn.executemany("INSERT INTO zone (id, naziv, alarm_status) VALUES (?, ?, 0)", [(1, "Z1"), (2, "Z2")])
+        conn.execute("INSERT INTO comm (key, value) VALUES ('cooldown_s', 1)")
+    e = engine_modul.AlarmEngine(baza)
+    yield e
+    e.conn.close()
+
+
+def posalji(e, naredba: dict) -> dict:
+    odgovor: queue.Queue = queue.Queue()
+    e.primijeni([(naredba, odgovor)])
+    return odgovor.get_nowait()
+
+
+def alarmi(baza: str) -> list[tuple]:
+    with sqlite3.connect(baza) as conn:
+        return conn.execute("SELECT zone_id, potvrda, ponavljanja FROM alarms ORDER BY id").fetchall()
+
+
+def test_potisnute_aktivacije_daju_jedan_odgodeni_alarm(engine, baza):
+    assert posalji(engine, {"cmd": "zone_alarm", "zone_ids": [1], "status": 1, "izvor": 1})["novih_alarma"] == 1
+    aid = engine.aktivni[1]
+    assert posalji(engine, {"cmd": "potvrdi", "alarm_id": aid, "osoblje": "Ana", "izvor": 2})["pobjeda"]
+
+    for _ in range(3):  # unutar cooldowna: broje se, alarm ne nastaje
+        assert posalji(engine, {"cmd": "zone_alarm", "zone_ids": [1], "status": 1, "izvor": 1})["potisnuto"] == 1
+    assert engine.odradi_rokove() == 0
+    assert alarmi(baza) == [(1, 1, 0)]
+
+    time.sleep(max(0.0, engine.cooldown.sljedeci_rok() - time.time()) + 0.05)
+    assert engine.odradi_rokove() == 1
+    # prva potisnuta aktivacija je alarm, ostale dvije su ponavljanja
+    assert alarmi(baza) == [(1, 1, 0), (1, 0, 2)]
+    assert engine.cooldown.sljedeci_rok() is None
+
+
+def test_istek_bez_potisnutih_ne_stvara_alarm(engine, baza):
+    posalji(engine, {"cmd": "zone_alarm", "zone_ids": [2], "status": 1, "izvor": 1})
+    posalji(engine, {"cmd": "potvrdi", "alarm_id": engine.aktivni[2], "osoblje": "Ana", "izvor": 2})
+    time.sleep(max(0.0, engine.cooldown.sljedeci_rok() - time.time()) + 0.05)
+    assert engine.odradi_rokove() == 0
+    assert alarmi(baza) == [(2, 1, 0)]
+
+
+def test_neuspjeli_commit_cuva_rokove_i_brojace(engine, baza, monkeypatch):
+    posalji(engine, {"cmd": "zone_alarm", "zone_ids": [1], "status": 1, "izvor": 1})
+    posalji(engine, {"cmd": "potvrdi", "alarm_id": engine.aktivni[1], "osoblje": "Ana", "izvor": 2})
+    posalji(engine, {"cmd": "zone_alarm", "zone_ids": [1], "status": 1, "izvor": 1})
+    time.sleep(max(0.0, engine.cooldown.sljedeci_rok() - time.time()) + 0.05)
+
+    def zakljucano():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(engine, "_commit", zakljucano)
+    with pytest.raises(sqlite3.OperationalError):
+        engine.odradi_rokove()
+    assert engine.cooldown.potisnuto == {1: 1}
+
+    monkeypatch.undo()
+    assert engine.odradi_rokove() == 1
+    assert alarmi(baza)[-1] == (1, 0, 0)
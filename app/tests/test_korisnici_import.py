@@ -0,0 +1,64 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from module.korisnici_import import pripremi_uvoz, primijeni_uvoz, promjene
+
+
+@pytest.fixture
+def conn(baza):
+    conn = sqlite3.connect(baza)
+    conn.executemany("INSERT INTO korisnici (id, ime, soba) VALUES (?, ?, ?)", [(1, "Ana", "1"), (2, "Ivo", "2")])
+    conn.executemany(
+        "INSERT INTO zone (id, naziv, korisnik_id) VALUES (?, ?, ?)",
+        [(10, "Z10", 1), (11, "Z11", 2), (12, "Z12", None)],
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def datoteka(*redovi) -> pd.DataFrame:
+    return pd.DataFrame(redovi, columns=["ime", "soba", "zona"])
+
+
+def zone(conn) -> dict[int, int | None]:
+    return dict(conn.execute("SELECT id, korisnik_id FROM zone"))
+
+
+def test_ponovni_uvoz_ne_mijenja_nista(conn):
+    df = datoteka(("Ana", "1", "11"), ("Ivo", "3", "Z12"), ("Mia", "4", "10"))
+    plan = pripremi_uvoz(conn, df)
+    assert plan["greske"] == 0
+    primijeni_uvoz(conn, df, promjene(plan))
+    assert zone(conn) == {10: 3, 11: 1, 12: 2}
+
+    drugi = pripremi_uvoz(conn, df)
+    assert promjene(drugi) == {"novi": [], "sobe": [], "narukvice": []}
+    assert set(drugi["pregled"]["promjena"]) == {"bez promjene"}
+
+
+def test_odbijen_redak_vlasnika_ne_otkvacuje_vlasnika(conn):
+    # Ana preuzima Ivinu zonu, ali Ivin redak (nova zona) ne prolazi provjeru
+    df = datoteka(("Ana", None, "11"), ("Ivo", None, "99"))
+    plan = pripremi_uvoz(conn, df)
+    assert plan["greske"] == 2 and plan["narukvice"] == []
+
+
+def test_lanac_preuzimanja_pada_s_odbijenim_retkom(conn):
+    # Mia -> 10 (Anina) ovisi o Ana -> 11 (Ivina), a Ivo ostaje bez nove zone
+    df = datoteka(("Mia", None, "10"), ("Ana", None, "11"), ("Ivo", None, None))
+    plan = pripremi_uvoz(conn, df)
+    assert plan["greske"] == 2
+    assert promjene(plan) == {"novi": [], "sobe": [], "narukvice": []}
+
+
+def test_zastarjeli_plan_se_ne_primjenjuje(conn):
+    df = datoteka(("Mia", "4", "12"))
+    prikazano = promjene(pripremi_uvoz(conn, df))
+    conn.execute("UPDATE zone SET korisnik_id = 2 WHERE id = 12")  # promjena nakon pregleda
+    conn.commit()
+    with pytest.raises(ValueError):
+        primijeni_uvoz(conn, df, prikazano)
+    assert conn.execute("SELECT COUNT(*) FROM korisnici WHERE ime = 'Mia'").fetchone()[0] == 0
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from module.response_times import PERCENTILI, SMJENE, raspodjela, smjena_po_satu
+
+
+def test_percentili_kao_np_percentile():
+    rng = np.random.default_rng(7)
+    vrijednosti = rng.lognormal(4, 1, 5000)
+    grupe = rng.choice(["A", "B", "C", "D"], 5000)
+    grupe[0] = "E"  # grupa s jednim alarmom
+    rez = raspodjela(vrijednosti, grupe, sla_s=120).set_index("grupa")
+
+    for g in np.unique(grupe):
+        v = vrijednosti[grupe == g]
+        red = rez.loc[g]
+        assert red["broj"] == len(v)
+        for q in PERCENTILI:
+            assert red[f"p{q}"] == pytest.approx(np.percentile(v, q))
+        assert red["max"] == pytest.approx(v.max())
+        assert red["prosjek"] == pytest.approx(v.mean())
+        assert red["prekoracenja"] == (v > 120).sum()
+
+
+def test_prazan_ulaz():
+    rez = raspodjela(np.array([]), np.array([]))
+    assert rez.empty and {"grupa", "broj", "p90", "udio_prekoracenja"} <= set(rez.columns)
+
+
+def test_smjene_pokrivaju_dan_i_prelaze_ponoc():
+    po_satu = smjena_po_satu()
+    assert len(po_satu) == 24 and "(izvan smjene)" not in set(po_satu)
+    nocna = SMJENE[-1][0]
+    assert po_satu[23] == nocna and po_satu[0] == nocna and po_satu[6] == nocna
+    assert po_satu[7] == SMJENE[0][0]
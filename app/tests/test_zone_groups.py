@@ -0,0 +1,19 @@
+from module.zone_groups import grupe_opis, grupe_sql, parse_grupe
+
+
+def test_parse_grupe_kanonski():
+    a = parse_grupe({"krilo": "B, A,A", "kat": "2,1", "stanica": ""})
+    b = parse_grupe({"kat": "1,2", "krilo": "A,B"})
+    assert a == b == (("kat", ("1", "2")), ("krilo", ("A", "B")))
+
+
+def test_parse_grupe_zanemaruje_prazno_i_nepoznato():
+    assert parse_grupe({}) == ()
+    assert parse_grupe({"kat": " , ", "naslov": "X", "kiosk": "hodnik"}) == ()
+
+
+def test_grupe_sql_i_opis():
+    grupe = parse_grupe({"stanica": "S1", "kat": "1,2"})
+    assert grupe_sql(grupe) == ("z.kat IN (?, ?) AND z.stanica IN (?)", ["1", "2", "S1"])
+    assert grupe_sql(()) == ("1", [])
+    assert grupe_opis(grupe) == "KAT 1,2 · STANICA S1"
@@ -0,0 +1,50 @@
+import random
+import sqlite3
+import time
+
+from module.zone_journal import append_transitions, compact_journal, ensure_journal, zone_state_at
+
+DAN = 86400
+
+
+def napuni(baza: str, od: int, do: int, n: int, seed: int) -> None:
+    """n nasumičnih prijelaza zona 1..8 u [od, do)."""
+    rng = random.Random(seed)
+    with sqlite3.connect(baza) as conn:
+        ensure_journal(conn)
+        for ts in sorted(rng.randrange(od, do) for _ in range(n)):
+            append_transitions(conn, [rng.randint(1, 8)], rng.randint(0, 1), 1, ts=ts)
+
+
+def test_sazimanje_cuva_stanje_nakon_reza(baza):
+    sad = int(time.time())
+    napuni(baza, sad - 60 * DAN, sad, 400, seed=1)
+    trenuci = [sad - 30 * DAN + 1, sad - 20 * DAN, sad - 5 * DAN, sad]
+    prije = [zone_state_at(baza, t) for t in trenuci]
+
+    assert compact_journal(baza, keep_days=30) > 0
+    assert [zone_state_at(baza, t) for t in trenuci] == prije
+    with sqlite3.connect(baza) as conn:
+        assert conn.execute("SELECT MIN(ts) FROM zone_journal").fetchone()[0] >= sad - 30 * DAN
+
+
+def test_uzastopna_sazimanja_nose_zone_bez_novih_prijelaza(baza):
+    sad = int(time.time())
+    napuni(baza, sad - 60 * DAN, sad - 40 * DAN, 100, seed=2)  # sve zone
+    with sqlite3.connect(baza) as conn:  # zona 1 se mijenja i kasnije
+        append_transitions(conn, [1], 1, 1, ts=sad - 25 * DAN)
+        append_transitions(conn, [1], 0, 2, ts=sad - 2 * DAN)
+    prije = zone_state_at(baza, sad)
+
+    compact_journal(baza, keep_days=35)
+    compact_journal(baza, keep_days=10)  # zone 2..8 dolaze samo iz prethodnog snapshota
+    assert zone_state_at(baza, sad) == prije
+    assert zone_state_at(baza, sad - DAN)[1] == 0
+
+
+def test_nema_starih_prijelaza(baza):
+    sad = int(time.time())
+    napuni(baza, sad - DAN, sad, 20, seed=3)
+    prije = zone_state_at(baza, sad)
+    assert compact_journal(baza, keep_days=30) == 0
+    assert zone_state_at(baza, sad) == prije